@@ -0,0 +1,223 @@
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import indicators
+from market_data import PRICE_FIELDS, YFinanceProvider, fetch_history_batch
+
+# Backtests the scripts' signal rules over whole price histories. Prices are
+# (ticker x bar) arrays and every step works on all tickers at once; the only
+# Python loop is over trades (each pass finds the next trade for every ticker),
+# never over bars.
+
+# Aligned (ticker x bar) price arrays; missing bars are NaN
+PriceArrays = namedtuple("PriceArrays", ["tickers", "dates", "open", "high", "low", "close", "volume"])
+
+RULES = ("trend", "rsi")
+LOOKAHEAD = 16  # Bars checked per pass when looking for a trade's exit
+
+
+# Helper function to turn a wide (ticker, field) frame into PriceArrays
+def price_arrays(wide, tickers=None):
+    tickers = list(tickers or dict.fromkeys(wide.columns.get_level_values(0)))
+    fields = {}
+    for field in PRICE_FIELDS:
+        columns = [(ticker, field) for ticker in tickers]
+        fields[field] = wide.reindex(columns=pd.MultiIndex.from_tuples(columns)).to_numpy(np.float64).T
+    return PriceArrays(tickers, wide.index, fields["Open"], fields["High"], fields["Low"],
+                       fields["Close"], fields["Volume"])
+
+# Downloads daily bars for many tickers in batches and aligns them
+def load_prices(tickers, provider=None, period="5y"):
+    wide = fetch_history_batch(list(tickers), provider=provider or YFinanceProvider(), period=period)
+    return price_arrays(wide, [t for t in tickers if t in wide.columns.get_level_values(0)])
+
+# Buy and Sell masks for generate_signal(): Buy above both averages, Sell below the EMA
+def trend_signals(prices, window=14):
+    close = prices.close
+    sma, ema = indicators.sma(close, window), indicators.ema(close, window)
+    with np.errstate(invalid="ignore"):
+        buy = (close > ema) & (close > sma)
+        sell = close < ema
+    return buy, sell
+
+# Buy and Sell masks for advanced_stock_analysis.analyze_stock's RSI-gated rule
+def rsi_signals(prices, window=14, min_profit=0.05):
+    close = prices.close
+    sma, ema = indicators.sma(close, window), indicators.ema(close, window)
+    rsi = indicators.rsi(close, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        potential_profit = (np.fmax(sma, ema) - close) / close * 100
+        oversold, overbought = rsi < 30, rsi > 70
+        buy = oversold | (~overbought & (close > ema) & (potential_profit > min_profit))
+        sell = ~oversold & (overbought | (close < ema))
+    return buy, sell
+
+def signals(prices, rule="trend", window=14, min_volume=0, min_profit=0.05):
+    """
+    Returns (buy, sell) boolean (ticker x bar) masks for a rule. Buys on
+    bars with less than min_volume shares traded are ignored.
+    """
+    if rule == "trend":
+        buy, sell = trend_signals(prices, window)
+    elif rule == "rsi":
+        buy, sell = rsi_signals(prices, window, min_profit)
+    else:
+        raise ValueError(f"Unknown rule {rule!r}, expected one of {RULES}")
+    with np.errstate(invalid="ignore"):
+        buy &= prices.volume >= min_volume
+    return buy, sell
+
+# Helper function to find, for every bar, the next bar at or after it where mask is set (n_bars if none)
+def _next_true(mask):
+    n_bars = mask.shape[1]
+    idx = np.where(mask, np.arange(n_bars), n_bars)
+    idx = np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+    return np.concatenate([idx, np.full((len(mask), 1), n_bars)], axis=1)
+
+# Helper function to find each trade's first bar that touches its stop or target, scanning
+# LOOKAHEAD bars at a time and never past latest_exit (returned when nothing is touched)
+def _first_exit(prices, rows, entry, latest_exit, take_profit, stop):
+    exit_bar = latest_exit.copy()
+    pending = np.arange(len(rows))
+    offset = entry + 1
+    n_bars = prices.close.shape[1]
+    while len(pending):
+        cols = np.minimum(offset[pending, None] + np.arange(LOOKAHEAD), n_bars - 1)
+        in_range = cols <= latest_exit[pending, None]
+        r = rows[pending, None]
+        with np.errstate(invalid="ignore"):
+            hit = in_range & ((prices.low[r, cols] <= stop[pending, None]) |
+                              (prices.high[r, cols] >= take_profit[pending, None]))
+        found = hit.any(axis=1)
+        exit_bar[pending[found]] = cols[found, np.argmax(hit[found], axis=1)]
+        offset[pending] += LOOKAHEAD
+        pending = pending[~found & (offset[pending] <= latest_exit[pending])]
+    return exit_bar
+
+def simulate_trades(prices, buy, sell, profit_target=10, stop_loss=10, exit_on_sell=True):
+    """
+    Enters at the close of each Buy bar when flat and exits at the take-profit
+    or stop-loss level (or the open, if it gapped past it), on a Sell signal
+    at the close, or at the last bar. When both levels are inside one bar
+    the stop is assumed to hit first. Returns a DataFrame with one row per trade.
+    """
+    n_tickers, n_bars = prices.close.shape
+    valid = ~np.isnan(prices.close)
+    last_bar = np.where(valid.any(axis=1), n_bars - 1 - np.argmax(valid[:, ::-1], axis=1), -1)
+    next_buy = _next_true(buy)
+    next_sell = _next_true(sell) if exit_on_sell else np.full((n_tickers, n_bars + 1), n_bars)
+
+    trades = []
+    cursor = np.zeros(n_tickers, dtype=np.int64)
+    rows = np.arange(n_tickers)
+    while len(rows):
+        entry = next_buy[rows, cursor[rows]]
+        open_trade = entry < last_bar[rows]  # Need at least one bar left to exit on
+        rows, entry = rows[open_trade], entry[open_trade]
+        if not len(rows):
+            break
+
+        entry_price = prices.close[rows, entry]
+        take_profit = entry_price * (1 + profit_target / 100)
+        stop = entry_price * (1 - stop_loss / 100)
+        # A trade lasts at most until the next Sell signal or the last bar
+        latest_exit = np.minimum(next_sell[rows, entry + 1], last_bar[rows])
+        exit_bar = _first_exit(prices, rows, entry, latest_exit, take_profit, stop)
+
+        # Work out why each trade closed and at what price
+        with np.errstate(invalid="ignore"):
+            stopped = prices.low[rows, exit_bar] <= stop
+            targeted = ~stopped & (prices.high[rows, exit_bar] >= take_profit)
+            exit_open = prices.open[rows, exit_bar]
+            exit_price = np.where(
+                stopped, np.where(exit_open < stop, exit_open, stop),
+                np.where(targeted, np.where(exit_open > take_profit, exit_open, take_profit),
+                         prices.close[rows, exit_bar]))
+        reason = np.where(stopped, "Stop Loss", np.where(targeted, "Take Profit",
+                          np.where(exit_bar == last_bar[rows], "End", "Sell Signal")))
+        trades.append((rows, entry, exit_bar, entry_price, exit_price, reason))
+
+        cursor[rows] = exit_bar + 1
+        rows = rows[cursor[rows] <= last_bar[rows]]
+
+    columns = ["Ticker", "Entry Date", "Exit Date", "Entry Price", "Exit Price", "Return %", "Bars Held", "Exit Reason"]
+    if not trades:
+        return pd.DataFrame(columns=columns)
+    rows, entry, exit_bar, entry_price, exit_price, reason = (np.concatenate(part) for part in zip(*trades))
+    order = np.lexsort((entry, rows))
+    rows, entry, exit_bar = rows[order], entry[order], exit_bar[order]
+    entry_price, exit_price = entry_price[order], exit_price[order]
+    return pd.DataFrame({
+        "Ticker": np.asarray(prices.tickers, dtype=object)[rows],
+        "Entry Date": prices.dates[entry],
+        "Exit Date": prices.dates[exit_bar],
+        "Entry Price": entry_price,
+        "Exit Price": exit_price,
+        "Return %": (exit_price / entry_price - 1) * 100,
+        "Bars Held": exit_bar - entry,
+        "Exit Reason": reason[order],
+    })
+
+def summarize(trades, tickers):
+    """
+    Per-ticker results (compounded return of trading each ticker with the
+    same starting capital) and the equal-weight portfolio totals.
+    """
+    growth = 1 + trades["Return %"] / 100
+    grouped = trades.assign(Growth=growth, Win=trades["Return %"] > 0).groupby("Ticker")
+    per_ticker = pd.DataFrame({
+        "Trades": grouped.size(),
+        "Win Rate %": grouped["Win"].mean() * 100,
+        "Total Return %": (grouped["Growth"].prod() - 1) * 100,
+        "Avg Trade %": grouped["Return %"].mean(),
+        "Avg Bars Held": grouped["Bars Held"].mean(),
+    }).reindex(tickers)
+    per_ticker["Trades"] = per_ticker["Trades"].fillna(0).astype(int)
+    per_ticker["Total Return %"] = per_ticker["Total Return %"].fillna(0.0)  # Untraded capital stays in cash
+
+    portfolio = {
+        "Tickers": len(tickers),
+        "Tickers Traded": int((per_ticker["Trades"] > 0).sum()),
+        "Trades": len(trades),
+        "Win Rate %": round(float((trades["Return %"] > 0).mean() * 100), 2) if len(trades) else 0.0,
+        "Avg Trade %": round(float(trades["Return %"].mean()), 2) if len(trades) else 0.0,
+        "Portfolio Return %": round(float(per_ticker["Total Return %"].mean()), 2) if len(tickers) else 0.0,
+        "Profit Factor": _profit_factor(trades["Return %"]),
+    }
+    return per_ticker, portfolio
+
+# Helper function for gross gains divided by gross losses
+def _profit_factor(returns):
+    losses = -returns[returns < 0].sum()
+    return round(float(returns[returns > 0].sum() / losses), 2) if losses else float("inf")
+
+def backtest(prices, rule="trend", window=14, min_volume=0, min_profit=0.05,
+             profit_target=10, stop_loss=10, exit_on_sell=True):
+    """
+    Runs one rule over PriceArrays and returns {"Trades", "Per Ticker", "Portfolio"}.
+    """
+    buy, sell = signals(prices, rule, window, min_volume, min_profit)
+    trades = simulate_trades(prices, buy, sell, profit_target, stop_loss, exit_on_sell)
+    per_ticker, portfolio = summarize(trades, list(prices.tickers))
+    return {"Trades": trades, "Per Ticker": per_ticker, "Portfolio": portfolio}
+
+def main():
+    from ticker_universe import universe
+
+    tickers = universe.symbols("sp500")
+    print(f"Downloading 5 years of daily bars for {len(tickers)} S&P 500 tickers...")
+    prices = load_prices(tickers, period="5y")
+
+    for rule in RULES:
+        start = time.perf_counter()
+        result = backtest(prices, rule=rule)
+        elapsed = time.perf_counter() - start
+        print(f"\n=== {rule} rule ({elapsed:.2f} s for {len(prices.tickers)} tickers x {len(prices.dates)} bars) ===")
+        for key, value in result["Portfolio"].items():
+            print(f"{key}: {value}")
+        print("\nBest tickers:")
+        print(result["Per Ticker"].sort_values("Total Return %", ascending=False).head(10).round(2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import os
+import json
+import time
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+from bar_store import BarStore, day_numbers, EPOCH, FLOAT_FIELDS
+from market_data import PRICE_FIELDS, _as_timestamp, _as_wide, period_start, quote_from_history, ticker_slice
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bar_archive")
+
+# One daily bar; packed so every record is exactly 28 bytes on disk
+RECORD = np.dtype([("day", "<i4"), ("open", "<f4"), ("high", "<f4"), ("low", "<f4"),
+                   ("close", "<f4"), ("volume", "<i8")])
+# Journal records also carry the ticker, since they arrive in any order
+JOURNAL_RECORD = np.dtype([("ticker", "S16")] + [(name, RECORD.fields[name][0]) for name in RECORD.names])
+FIELD_NAMES = dict(zip(PRICE_FIELDS, ("open", "high", "low", "close", "volume")))
+
+
+class BarArchive:
+    """
+    Daily bars for a whole universe in one memory-mapped file of fixed-width
+    records, grouped per ticker and sorted by day, with a small per-ticker
+    (offset, count) index. Every process that opens the archive shares the
+    same page-cached copy, so the Flask app and scanner workers start
+    without downloading or loading history into their own heap.
+
+    New bars are appended to a journal file and merged in on read; compact()
+    folds the journal into a fresh bars file and switches to it atomically
+    through manifest.json. Appends write whole records in append mode, so
+    several processes can journal top-ups; run compact() from one process
+    only (the daily main() job).
+
+    It has the provider methods (history/history_batch/info). With an
+    `upstream` provider, tickers that are missing or more than
+    max_stale_days behind are fetched from upstream and journaled first.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, upstream=None, max_stale_days=3):
+        self.directory = directory
+        self.upstream = upstream
+        self.max_stale_days = max_stale_days
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+        self._journal_size = -1
+        self.bars = np.zeros(0, dtype=RECORD)
+        self.index = {}  # ticker -> (offset, count) into self.bars
+        self.journal = {}  # ticker -> journal records
+        self._checked = {}  # ticker -> day it was last topped up, so quiet tickers are not refetched
+        self.refresh()
+
+    # Helper function for paths inside the archive directory
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def refresh(self):
+        """
+        Re-opens the archive if it was compacted and re-reads the journal if it grew.
+        """
+        manifest_path = self._path("manifest.json")
+        if not os.path.exists(manifest_path):
+            return
+        mtime = os.stat(manifest_path).st_mtime_ns
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+                bars_path = self._path(manifest["bars"])
+                self.bars = (np.memmap(bars_path, dtype=RECORD, mode="r")
+                             if os.path.getsize(bars_path) else np.zeros(0, dtype=RECORD))
+                with np.load(self._path(manifest["index"])) as index:
+                    self.index = {str(ticker): (int(offset), int(count)) for ticker, offset, count
+                                  in zip(index["tickers"], index["offsets"], index["counts"])}
+                self._manifest, self._manifest_mtime = manifest, mtime
+                self._journal_size = -1
+            self._read_journal()
+
+    def _read_journal(self):
+        path = self._path(self._manifest["journal"])
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size == self._journal_size:
+            return
+        count = size // JOURNAL_RECORD.itemsize  # Ignore a record that is still being written
+        records = np.fromfile(path, dtype=JOURNAL_RECORD, count=count) if count else np.zeros(0, JOURNAL_RECORD)
+        journal = {}
+        if len(records):
+            order = np.argsort(records["ticker"], kind="stable")
+            records = records[order]
+            names, starts = np.unique(records["ticker"], return_index=True)
+            for name, start, end in zip(names, starts, list(starts[1:]) + [len(records)]):
+                journal[name.decode()] = records[start:end]
+        self.journal, self._journal_size = journal, size
+
+    def tickers(self):
+        return sorted(set(self.index) | set(self.journal))
+
+    def records(self, ticker):
+        """
+        All stored bars for a ticker as a RECORD array sorted by day (journal wins on duplicates).
+        """
+        offset, count = self.index.get(ticker, (0, 0))
+        archived = self.bars[offset:offset + count]
+        journaled = self.journal.get(ticker)
+        if journaled is None:
+            return archived
+        merged = np.concatenate([np.asarray(archived), journaled[list(RECORD.names)].astype(RECORD)])
+        # Keep the last copy of each day: unique on the reversed array finds the latest writes
+        _, last = np.unique(merged["day"][::-1], return_index=True)
+        return merged[len(merged) - 1 - last]
+
+    def last_day(self, ticker):
+        bars = self.records(ticker)
+        return int(bars["day"][-1]) if len(bars) else None
+
+    def _stale(self, tickers):
+        today = (np.datetime64(datetime.date.today(), "D") - EPOCH).astype(int)
+        stale = {}
+        for ticker in tickers:
+            if self._checked.get(ticker) == today:
+                continue
+            last = self.last_day(ticker)
+            if last is None or today - last > self.max_stale_days:
+                stale[ticker] = last
+        return stale, today
+
+    def _top_up(self, tickers, period):
+        """
+        Fetches missing and stale tickers from upstream and journals them.
+        """
+        if self.upstream is None:
+            return
+        stale, today = self._stale(tickers)
+        if not stale:
+            return
+        missing = [ticker for ticker, last in stale.items() if last is None]
+        behind = [ticker for ticker, last in stale.items() if last is not None]
+        if missing:
+            self.append(self.upstream.history_batch(missing, period=period))
+        if behind:
+            start = EPOCH + np.timedelta64(min(stale[ticker] for ticker in behind), "D")
+            self.append(self.upstream.history_batch(behind, start=str(start)))
+        self._checked.update(dict.fromkeys(stale, today))
+        self.refresh()
+
+    # Helper function to cut one ticker's records to a period or date range, by day number
+    def _select(self, ticker, period, start, end):
+        bars = self.records(ticker)
+        if not len(bars):
+            return bars
+        days = bars["day"]
+        if start is not None:
+            first = np.searchsorted(days, day_numbers([_as_timestamp(start)])[0])
+            last = np.searchsorted(days, day_numbers([_as_timestamp(end)])[0]) if end is not None else len(days)
+            return bars[first:last]
+        cutoff = period_start(period, pd.Timestamp(EPOCH + np.timedelta64(int(days[-1]), "D")))
+        if cutoff is None:
+            return bars
+        return bars[np.searchsorted(days, day_numbers([cutoff])[0], side="right"):]
+
+    def history(self, ticker, period="1mo", interval="1d", start=None, end=None):
+        return ticker_slice(self.history_batch([ticker], period, interval, start, end), ticker)
+
+    def history_batch(self, tickers, period="1mo", interval="1d", start=None, end=None):
+        """
+        Builds the (ticker, field) batch frame straight from the records,
+        without a DataFrame per ticker.
+        """
+        if interval != "1d":
+            raise ValueError("The bar archive only holds daily bars")
+        tickers = list(tickers)
+        self.refresh()
+        self._top_up(tickers, "1y" if period in (None, "max") else period)
+        selected = {}
+        for ticker in tickers:
+            bars = self._select(ticker, period, start, end)
+            if len(bars):
+                selected[ticker] = bars
+        if not selected:
+            return _as_wide(None, tickers)
+        days = np.unique(np.concatenate([bars["day"] for bars in selected.values()]))
+        values = np.full((len(days), len(selected) * len(PRICE_FIELDS)), np.nan)
+        for i, bars in enumerate(selected.values()):
+            rows = np.searchsorted(days, bars["day"])
+            for j, name in enumerate(FIELD_NAMES.values()):
+                values[rows, i * len(PRICE_FIELDS) + j] = bars[name]
+        dates = pd.DatetimeIndex((EPOCH + days.astype("timedelta64[D]")).astype("datetime64[ns]"), name="Date")
+        columns = pd.MultiIndex.from_product([list(selected), PRICE_FIELDS], names=["Ticker", "Price"])
+        return pd.DataFrame(values, index=dates.tz_localize("America/New_York"), columns=columns)
+
+    def info(self, ticker):
+        return quote_from_history(self.history(ticker, period="1y"))
+
+    def bar_store(self, tickers=None):
+        """
+        Loads tickers straight from the records into a BarStore, without DataFrames.
+        """
+        self.refresh()
+        tickers = [ticker for ticker in (tickers or self.tickers()) if ticker in self.index or ticker in self.journal]
+        bars = [self.records(ticker) for ticker in tickers]
+        days = np.unique(np.concatenate([b["day"] for b in bars])) if bars else np.zeros(0, np.int32)
+        shape = (len(tickers), len(days))
+        fields = {name: np.full(shape, np.nan, dtype=np.float32) for name in FLOAT_FIELDS}
+        fields["Volume"] = np.zeros(shape, dtype=np.int64)
+        for row, records in enumerate(bars):
+            cols = np.searchsorted(days, records["day"])
+            for field in FIELD_NAMES:
+                fields[field][row, cols] = records[FIELD_NAMES[field]]
+        return BarStore(tickers, days, fields)
+
+    def append(self, data):
+        """
+        Journals bars from a batch frame with (ticker, field) columns or a
+        {ticker: history DataFrame} dict. Days already stored are replaced.
+        """
+        if isinstance(data, pd.DataFrame):
+            if data.empty:
+                return 0
+            data = {ticker: data[ticker].dropna(how="all") for ticker in dict.fromkeys(data.columns.get_level_values(0))}
+        chunks = []
+        for ticker, hist in data.items():
+            hist = hist.dropna(subset=["Close"])
+            if hist.empty:
+                continue
+            records = np.zeros(len(hist), dtype=JOURNAL_RECORD)
+            records["ticker"] = ticker.encode()
+            records["day"] = day_numbers(hist.index)
+            for field, name in FIELD_NAMES.items():
+                values = hist[field].to_numpy(np.float64)
+                records[name] = np.nan_to_num(values) if field == "Volume" else values
+            chunks.append(records)
+        if not chunks:
+            return 0
+        self._ensure_created()
+        records = np.concatenate(chunks)
+        with open(self._path(self._manifest["journal"]), "ab") as f:
+            f.write(records.tobytes())  # Whole records only, so readers never see a torn one
+        return len(records)
+
+    def _ensure_created(self):
+        if self._manifest is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_generation(0, {})
+            self.refresh()
+
+    def _write_generation(self, generation, per_ticker):
+        names = {"bars": f"bars-{generation:06d}.dat", "index": f"index-{generation:06d}.npz",
+                 "journal": f"journal-{generation:06d}.dat"}
+        tickers = sorted(per_ticker)
+        counts = np.array([len(per_ticker[ticker]) for ticker in tickers], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64) if len(counts) else counts
+        with open(self._path(names["bars"]), "wb") as f:
+            for ticker in tickers:
+                f.write(np.ascontiguousarray(per_ticker[ticker], dtype=RECORD).tobytes())
+        with open(self._path(names["index"]), "wb") as f:
+            np.savez(f, tickers=np.array(tickers, dtype=str), offsets=offsets, counts=counts)
+        open(self._path(names["journal"]), "wb").close()
+
+        manifest = dict(names, generation=generation, compacted_at=time.time())
+        tmp = self._path("manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._path("manifest.json"))  # Readers switch over in one step
+
+    def compact(self):
+        """
+        Merges the journal into a new bars file and drops the old generation.
+        Readers that still have the old files mapped keep working until they refresh.
+        """
+        self.refresh()
+        self._ensure_created()
+        old = self._manifest
+        per_ticker = {ticker: self.records(ticker) for ticker in self.tickers()}
+        self._write_generation(old["generation"] + 1, per_ticker)
+        for key in ("bars", "index", "journal"):
+            try:
+                os.remove(self._path(old[key]))
+            except FileNotFoundError:
+                pass
+        self.refresh()
+
+    def update(self, tickers, provider, period="5d", chunk_size=200):
+        """
+        Journals the latest bars for the tickers from `provider`, in batches.
+        """
+        added = 0
+        tickers = list(tickers)
+        for i in range(0, len(tickers), chunk_size):
+            added += self.append(provider.history_batch(tickers[i:i + chunk_size], period=period))
+        self.refresh()
+        return added
+
+
+def main():
+    from market_data import YFinanceProvider
+    from ticker_universe import universe
+
+    # Run once a day (e.g. from cron) to keep the archive current
+    archive = BarArchive()
+    tickers = universe.symbols("nasdaq")
+    period = "5d" if archive.tickers() else "1y"
+    print(f"Updating the bar archive for {len(tickers)} tickers ({period})...")
+    added = archive.update(tickers, YFinanceProvider(), period=period)
+    archive.compact()
+    print(f"Added {added} bars; archive holds {len(archive.tickers())} tickers, {len(archive.bars)} bars")
+
+if __name__ == "__main__":
+    main()
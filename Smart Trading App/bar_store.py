@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+FLOAT_FIELDS = ("Open", "High", "Low", "Close")
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+# Helper function to turn a bar index into int32 day numbers (days since 1970-01-01)
+def day_numbers(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)  # Keep the exchange's local calendar date
+    return ((index.normalize().values.astype("datetime64[D]") - EPOCH).astype(np.int32))
+
+
+class BarStore:
+    """
+    Compact daily bars for a whole universe. Each field is one contiguous
+    (ticker x day) array, float32 for prices and int64 for volume, sharing a
+    single int32 day-number index; `rows` maps ticker -> row and `starts`
+    holds each ticker's first bar. Missing bars are NaN (volume 0).
+    field() and view() return views into the arrays rather than copies, and
+    the indicators module accepts them directly.
+    """
+
+    def __init__(self, tickers, days, fields, starts=None):
+        self.tickers = list(tickers)
+        self.rows = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.days = np.asarray(days, dtype=np.int32)
+        self.fields = fields  # "Open"/"High"/"Low"/"Close" float32, "Volume" int64
+        if starts is None:
+            valid = ~np.isnan(fields["Close"])
+            starts = np.where(valid.any(axis=1), np.argmax(valid, axis=1), len(self.days))
+        self.starts = np.asarray(starts, dtype=np.int64)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Builds a store from {ticker: history DataFrame}; extra columns such as
+        Dividends, Stock Splits or indicator scratch columns are dropped.
+        """
+        tickers = [ticker for ticker, hist in frames.items() if not hist.empty]
+        day_sets = [day_numbers(frames[ticker].index) for ticker in tickers]
+        days = np.unique(np.concatenate(day_sets)) if day_sets else np.array([], dtype=np.int32)
+        shape = (len(tickers), len(days))
+        fields = {name: np.full(shape, np.nan, dtype=np.float32) for name in FLOAT_FIELDS}
+        fields["Volume"] = np.zeros(shape, dtype=np.int64)
+        for row, (ticker, ticker_days) in enumerate(zip(tickers, day_sets)):
+            hist = frames[ticker]
+            cols = np.searchsorted(days, ticker_days)
+            for name in FLOAT_FIELDS:
+                fields[name][row, cols] = hist[name].to_numpy(np.float32)
+            fields["Volume"][row, cols] = np.nan_to_num(hist["Volume"].to_numpy(np.float64)).astype(np.int64)
+        return cls(tickers, days, fields)
+
+    @classmethod
+    def from_wide(cls, wide):
+        """
+        Builds a store from a batch frame with (ticker, field) columns.
+        """
+        tickers = dict.fromkeys(wide.columns.get_level_values(0))
+        return cls.from_frames({ticker: wide[ticker].dropna(how="all") for ticker in tickers})
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self.rows
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.starts.nbytes + sum(array.nbytes for array in self.fields.values())
+
+    def dates(self, tz="America/New_York"):
+        index = pd.DatetimeIndex((EPOCH + self.days.astype("timedelta64[D]")).astype("datetime64[ns]"), name="Date")
+        return index.tz_localize(tz) if tz else index
+
+    def field(self, name):
+        """
+        The whole (ticker x day) array for a field, for vectorized indicators.
+        """
+        return self.fields[name]
+
+    def view(self, ticker, name="Close"):
+        """
+        One ticker's bars for a field, from its first bar on (a view, not a copy).
+        """
+        row = self.rows[ticker]
+        return self.fields[name][row, self.starts[row]:]
+
+    def matrix(self, name, tickers):
+        """
+        Rows for a contiguous run of tickers as a view; other selections are copied.
+        """
+        rows = [self.rows[ticker] for ticker in tickers]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            return self.fields[name][rows[0]:rows[-1] + 1]
+        return self.fields[name][rows]
+
+    def frame(self, ticker, tz="America/New_York"):
+        """
+        One ticker as a regular OHLCV DataFrame, for code that expects one.
+        """
+        row = self.rows[ticker]
+        start = self.starts[row]
+        return pd.DataFrame({name: self.fields[name][row, start:] for name in self.fields},
+                            index=self.dates(tz)[start:])
@@ -0,0 +1,67 @@
+import time
+import numpy as np
+import pandas as pd
+from backtest import RULES, backtest, price_arrays, signals
+from market_data import SyntheticProvider, fetch_history_batch
+
+TICKERS = 500  # About the size of the S&P 500
+YEARS = 5
+
+# The obvious per-ticker, per-bar loop, used to check the vectorized trades
+def loop_backtest(prices, buy, sell, profit_target=10, stop_loss=10):
+    trades = []
+    for i, ticker in enumerate(prices.tickers):
+        bars = np.flatnonzero(~np.isnan(prices.close[i]))
+        if not len(bars):
+            continue
+        last = bars[-1]
+        t = 0
+        while t < last:
+            if not buy[i, t]:
+                t += 1
+                continue
+            entry_price = prices.close[i, t]
+            target, stop = entry_price * (1 + profit_target / 100), entry_price * (1 - stop_loss / 100)
+            for j in range(t + 1, last + 1):
+                if prices.low[i, j] <= stop:
+                    exit_price = min(prices.open[i, j], stop)
+                elif prices.high[i, j] >= target:
+                    exit_price = max(prices.open[i, j], target)
+                elif sell[i, j] or j == last:
+                    exit_price = prices.close[i, j]
+                else:
+                    continue
+                break
+            trades.append((ticker, t, j, (exit_price / entry_price - 1) * 100))
+            t = j + 1
+    return trades
+
+def main():
+    tickers = [f"SYN{i:03d}" for i in range(TICKERS)]
+    provider = SyntheticProvider(years=YEARS)
+    prices = price_arrays(fetch_history_batch(tickers, provider=provider, period="max"), tickers)
+    print(f"Backtesting {TICKERS} tickers x {len(prices.dates)} bars ({YEARS} years)\n")
+
+    for rule in RULES:
+        start = time.perf_counter()
+        result = backtest(prices, rule=rule)
+        vectorized = time.perf_counter() - start
+
+        buy, sell = signals(prices, rule)
+        start = time.perf_counter()
+        expected = loop_backtest(prices, buy, sell)
+        looped = time.perf_counter() - start
+
+        trades = result["Trades"]
+        got = list(zip(trades["Ticker"], trades["Return %"]))
+        same = len(got) == len(expected) and np.allclose([r for _, r in got], [e[3] for e in expected]) \
+            and [t for t, _ in got] == [e[0] for e in expected]
+
+        print(f"=== {rule} rule ===")
+        print(f"Vectorized (signals + trades): {vectorized:.2f} s")
+        print(f"Per-bar loop (trades only, signals precomputed): {looped:.2f} s")
+        print(f"Trades: {len(trades)} (matches loop: {same})")
+        print(pd.Series(result["Portfolio"]).to_string(), "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from bar_archive import BarArchive
+from indicator_store import IndicatorStore
+from market_data import SyntheticProvider
+
+TICKERS = [f"SYN{i:04d}" for i in range(4000)]  # Roughly the NASDAQ listing
+SCAN = TICKERS[:500]
+LATENCY = 0.25  # Seconds per batched download of 100 tickers, on the optimistic side for yfinance
+
+# Runs in a fresh process: open the archive and run the first scan, timing both
+CHILD = """
+import sys, time, io, contextlib
+start = time.perf_counter()
+sys.path.insert(0, {here!r})
+import multi_stock_scanner
+from bar_archive import BarArchive
+imported = time.perf_counter()
+archive = BarArchive({directory!r})
+opened = time.perf_counter()
+archive.history_batch({tickers!r}, period="1y")
+loaded = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    results = multi_stock_scanner.scan_stocks({tickers!r}, provider=archive)
+done = time.perf_counter()
+errors = sum("Error" in result for result in results)
+print(imported - start, opened - imported, loaded - opened, done - loaded, errors)
+"""
+
+def build_archive(directory):
+    provider = SyntheticProvider(years=1)
+    archive = BarArchive(directory)
+    archive.update(TICKERS, provider, period="1y", chunk_size=500)
+    archive.compact()
+    return archive
+
+def network_load_seconds():
+    from market_data import fetch_history_batch
+    provider = SyntheticProvider(years=1)
+    provider.history_batch(SCAN, period="1y")  # Generate the bars up front so only latency is timed
+    provider.latency = LATENCY
+    start = time.perf_counter()
+    fetch_history_batch(SCAN, provider=provider, period="1y")
+    return time.perf_counter() - start
+
+class NaiveProvider:
+    """
+    Live provider whose daily bars have a tz-naive index, the way yf.download returned them.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def history_batch(self, tickers, **kwargs):
+        wide = self.provider.history_batch(tickers, **kwargs)
+        wide.index = wide.index.tz_localize(None)
+        return wide
+
+    # Single-ticker history stays tz-aware, as Ticker.history is
+    def history(self, ticker, **kwargs):
+        return self.provider.history(ticker, **kwargs)
+
+    def info(self, ticker):
+        return self.provider.info(ticker)
+
+class SeedLog:
+    """
+    Records every ticker a provider is asked for.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.tickers = []
+
+    def history_batch(self, tickers, **kwargs):
+        self.tickers.extend(tickers)
+        return self.provider.history_batch(tickers, **kwargs)
+
+# Seed indicators from the (New York) archive, then top up from a naive live provider a week ahead of it
+def check_naive_top_up(archive):
+    tickers = SCAN[:20]
+    live = SyntheticProvider(years=1, end="2024-11-22")
+    store = IndicatorStore(NaiveProvider(live), watchlist=tickers, seed_provider=archive)
+    store.refresh()
+    newest = live.dates[-1]
+    for ticker in tickers:
+        assert store._states[ticker].pending[0] == newest, ticker
+    print(f"Indicators seeded from the archive caught up to {newest.date()} from a tz-naive live provider")
+
+# Passing tickers from get() are capped while the watchlist stays, and an unknown ticker is not re-seeded every refresh
+def check_store_bounds(archive):
+    seeds = SeedLog(archive)
+    store = IndicatorStore(SyntheticProvider(years=1), watchlist=SCAN[:5], seed_provider=seeds, max_tickers=10)
+    for ticker in SCAN[5:55] + ["NOSUCH"]:
+        store.get(ticker)
+    for _ in range(3):
+        store.refresh()
+    assert set(store._states) == set(SCAN[:5] + SCAN[46:55]), sorted(store._states)
+    assert seeds.tickers.count("NOSUCH") == 1, "the empty seed was retried every refresh"
+    print(f"Indicator store kept {len(store._states)} tickers after 56 lookups and tried the unknown one once")
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        archive = build_archive(directory)
+        size = os.path.getsize(os.path.join(directory, archive._manifest["bars"]))
+        print(f"Built archive: {len(archive.tickers())} tickers, {len(archive.bars)} bars, "
+              f"{size / 1024 / 1024:.1f} MB in {time.perf_counter() - start:.1f} s\n")
+
+        print(f"First scan of {len(SCAN)} tickers in a fresh process (import / open / load a year / full scan):")
+        code = CHILD.format(here=here, directory=directory, tickers=SCAN)
+        for run in range(3):
+            output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+            imported, opened, loaded, scanned, errors = output.split()
+            print(f"  run {run + 1}: {float(imported):.2f} s / {float(opened) * 1000:.1f} ms / "
+                  f"{float(loaded) * 1000:.0f} ms / {float(scanned):.2f} s ({errors} errors)")
+
+        check_naive_top_up(archive)
+        check_store_bounds(archive)
+
+        seconds = network_load_seconds()
+        print(f"\nLoading the same year of bars over the network ({LATENCY * 1000:.0f} ms per 100-ticker batch): "
+              f"{seconds:.2f} s")
+
+if __name__ == "__main__":
+    main()
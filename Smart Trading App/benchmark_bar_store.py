@@ -0,0 +1,80 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import indicators
+from bar_store import BarStore
+from market_data import SyntheticProvider
+
+TICKERS = 4000  # Roughly the NASDAQ listing
+YEARS = 1
+
+# A year of bars shaped like yf.Ticker.history(): extra columns and a tz-aware index
+def yfinance_frames(provider, tickers):
+    frames = {}
+    for ticker in tickers:
+        hist = provider.history(ticker, period="1y").copy()
+        hist["Dividends"] = 0.0
+        hist["Stock Splits"] = 0.0
+        frames[ticker] = hist
+    return frames
+
+# The scratch columns the scripts add to every frame
+def add_scratch_columns(hist):
+    hist['SMA'] = hist['Close'].rolling(window=14).mean()
+    hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()
+    hist['High-Low'] = hist['High'] - hist['Low']
+    hist['High-Close'] = abs(hist['High'] - hist['Close'].shift(1))
+    hist['Low-Close'] = abs(hist['Low'] - hist['Close'].shift(1))
+    hist['True Range'] = hist[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
+
+def frames_bytes(frames):
+    return sum(int(hist.memory_usage(deep=True, index=True).sum()) for hist in frames.values())
+
+# Helper function to measure what building something allocates
+def traced(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def main():
+    provider = SyntheticProvider(years=YEARS)
+    tickers = [f"SYN{i:04d}" for i in range(TICKERS)]
+    print(f"{TICKERS} tickers x {YEARS} year of daily bars\n")
+
+    frames, frames_traced = traced(lambda: yfinance_frames(provider, tickers))
+    raw_bytes = frames_bytes(frames)
+    store, store_traced = traced(lambda: BarStore.from_frames(frames))
+    for hist in frames.values():
+        add_scratch_columns(hist)
+    scratch_bytes = frames_bytes(frames)
+
+    mb = 1024 * 1024
+    print(f"dict of DataFrames:           {raw_bytes / mb:8.1f} MB (traced {frames_traced / mb:.1f} MB)")
+    print(f"  + six scratch columns:      {scratch_bytes / mb:8.1f} MB")
+    print(f"BarStore:                     {store.nbytes / mb:8.1f} MB (traced {store_traced / mb:.1f} MB)")
+    print(f"Reduction:                    {raw_bytes / store.nbytes:.1f}x vs plain frames, "
+          f"{scratch_bytes / store.nbytes:.1f}x vs frames with scratch columns\n")
+
+    # Indicators straight off the store's arrays, with no copies of the bars
+    start = time.perf_counter()
+    close = store.field("Close")
+    sma = indicators.sma(close)
+    atr = indicators.atr(store.field("High"), store.field("Low"), close)
+    elapsed = time.perf_counter() - start
+    assert np.shares_memory(store.view(tickers[0]), close)
+
+    # float32 storage keeps indicator values within a few parts per million of float64
+    sample = tickers[:50]
+    expected_sma = np.array([frames[t]["SMA"].iloc[-1] for t in sample])
+    expected_atr = np.array([frames[t]["True Range"].rolling(14).mean().iloc[-1] for t in sample])
+    rows = [store.rows[t] for t in sample]
+    print(f"SMA/ATR for all tickers from the store: {elapsed * 1000:.0f} ms")
+    print(f"Max relative error vs float64 frames: SMA {np.max(np.abs(sma[rows, -1] / expected_sma - 1)):.1e}, "
+          f"ATR {np.max(np.abs(atr[rows, -1] / expected_atr - 1)):.1e}")
+    pd.testing.assert_index_equal(store.frame(tickers[0]).index, frames[tickers[0]].index, exact=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import time
+from fetch_stocks import iter_stocks_under
+from market_data import SyntheticProvider
+
+TICKERS = [f"SYM{i:04d}" for i in range(300)]
+LATENCY = 0.05  # Seconds per simulated request
+WORKER_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+
+def main():
+    print(f"Scanning {len(TICKERS)} tickers with {LATENCY * 1000:.0f} ms of injected latency per request...\n")
+    baseline = None
+    print(f"{'Workers':>8} {'Seconds':>9} {'Speedup':>8} {'Found':>6}")
+    for workers in WORKER_COUNTS:
+        provider = SyntheticProvider(latency=LATENCY)
+        start = time.perf_counter()
+        found = sum(1 for _ in iter_stocks_under(TICKERS, 5, workers=workers, provider=provider))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {baseline / elapsed:>7.1f}x {found:>6}")
+
+if __name__ == "__main__":
+    main()
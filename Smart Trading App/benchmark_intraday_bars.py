@@ -0,0 +1,99 @@
+import io
+import time
+import tempfile
+import contextlib
+import numpy as np
+import multi_stock_scanner
+from bar_archive import BarArchive
+from intraday_bars import IntradayBars, resample, to_bars
+from market_data import SyntheticProvider, fetch_history_batch, ticker_slice
+
+TICKERS = [f"SYN{i:04d}" for i in range(1000)]
+INTERVALS = ["1m", "5m", "15m", "1h", "1d"]
+TIGHT_BUDGET = 16 * 1024 * 1024  # Too small for five days of 1m bars for every ticker
+
+
+class CountingProvider:
+    """
+    Counts requests and bars downloaded through a provider.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.requests = 0
+        self.bars = 0
+
+    def history_batch(self, tickers, **kwargs):
+        wide = self.provider.history_batch(tickers, **kwargs)
+        self.requests += 1
+        self.bars += int(wide.xs("Close", axis=1, level=1).notna().sum().sum()) if not wide.empty else 0
+        return wide
+
+
+# Intraday scans through the bar archive get their bars from its upstream, and a repeat scan downloads nothing
+def check_archive_scans(synthetic):
+    counted = CountingProvider(synthetic)
+    with tempfile.TemporaryDirectory() as directory:
+        archive = BarArchive(directory, upstream=counted)
+        for scan in range(2):
+            before = counted.requests
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = multi_stock_scanner.scan_stocks(TICKERS[:50], provider=archive, period="5d", interval="5m")
+            errors = [result["Error"] for result in results if "Error" in result]
+            assert not errors, errors[:3]
+        assert counted.requests == before, "the second scan downloaded again"
+    print(f"Intraday scans through the bar archive: {before} requests for the first, none for the repeat")
+
+def main():
+    synthetic = SyntheticProvider()
+    print(f"{len(TICKERS)} tickers, intervals {', '.join(INTERVALS)}, last 5 days")
+    print("(times include generating the synthetic bars, so compare requests and bars downloaded)\n")
+
+    # Downloading every interval separately
+    direct = CountingProvider(synthetic)
+    start = time.perf_counter()
+    for interval in INTERVALS:
+        fetch_history_batch(TICKERS, provider=direct, period="5d", interval=interval)
+    direct_seconds = time.perf_counter() - start
+    print(f"Per-interval downloads: {direct.requests} requests, {direct.bars:,} bars, {direct_seconds:.1f} s")
+
+    # One 1m download, everything else resampled from the cache; then the same with a tight memory budget
+    for budget in (256 * 1024 * 1024, TIGHT_BUDGET):
+        counted = CountingProvider(synthetic)
+        cache = IntradayBars(counted, max_bytes=budget)
+        start = time.perf_counter()
+        wide = {interval: fetch_history_batch(TICKERS, provider=cache, period="5d", interval=interval)
+                for interval in INTERVALS}
+        cached_seconds = time.perf_counter() - start
+        stats = cache.stats()
+        print(f"Intraday cache, {budget / 1024 / 1024:.0f} MB budget: {counted.requests} requests, "
+              f"{counted.bars:,} bars, {cached_seconds:.1f} s")
+        print(f"  holding {stats['bytes'] / 1024 / 1024:.1f} MB for {stats['tickers']} tickers, "
+              f"{stats['evictions']} evictions, {stats['direct']} direct requests")
+        # However tight the budget, the cache never downloads more than fetching each interval directly
+        assert counted.requests <= direct.requests and counted.bars <= direct.bars
+
+    # The resampling step on its own
+    minute_bars = [to_bars(ticker_slice(wide["1m"], ticker)) for ticker in TICKERS]
+    start = time.perf_counter()
+    for interval in INTERVALS[1:]:
+        for bars in minute_bars:
+            resample(bars, interval)
+    print(f"Resampling 1m into {len(INTERVALS) - 1} intervals for {len(TICKERS)} tickers: "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Resampled bars match bars the provider builds for each interval
+    for interval in INTERVALS[1:]:
+        ticker = TICKERS[0]
+        got = ticker_slice(wide[interval], ticker)
+        expected = synthetic.history(ticker, period="5d", interval=interval)
+        if interval != "1d":
+            assert np.allclose(got["Close"], expected["Close"], rtol=1e-6)
+            assert (got["Volume"].to_numpy() == expected["Volume"].to_numpy()).all()
+        assert len(got) == len(expected)
+    print("Resampled bars match the provider's bars for every interval")
+
+    check_archive_scans(synthetic)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+from market_data import SyntheticProvider
+from speculative_search import first_qualifying, shuffled
+
+UNIVERSE = [f"SYN{i:04d}" for i in range(3000)]
+LATENCY = 0.05  # Seconds per simulated history download
+SEEDS = range(30)
+MAX_PRICE = 1  # Stricter than the apps' $5 so the serial loop hits more rejects
+WORKER_COUNTS = [1, 4, 8, 16]
+
+provider = SyntheticProvider(latency=LATENCY)
+
+# Same check as stock_app_v4/v5's load_if_under_5
+def probe(ticker):
+    data = provider.history(ticker, period="6mo")
+    return data if data["Close"].iloc[-1] <= MAX_PRICE else None
+
+# The original serial loop, used to check every pick
+def serial_pick(seed):
+    for ticker in shuffled(UNIVERSE, seed):
+        if probe(ticker) is not None:
+            return ticker
+    return None
+
+def main():
+    # Generate the bars up front so only the simulated latency is timed
+    provider.latency = 0.0
+    for ticker in UNIVERSE:
+        provider.history(ticker)
+    provider.latency = LATENCY
+    print(f"Time to first pick over {len(SEEDS)} seeds, {len(UNIVERSE)} tickers, "
+          f"{LATENCY * 1000:.0f} ms per probe, pick under ${MAX_PRICE}\n")
+
+    expected = {seed: serial_pick(seed) for seed in SEEDS}
+    for workers in WORKER_COUNTS:
+        times, probes, same = [], [], 0
+        for seed in SEEDS:
+            search = first_qualifying(UNIVERSE, probe, workers=workers, seed=seed)
+            times.append(search["Seconds"] * 1000)
+            probes.append(search["Probed"])
+            same += search["Item"] == expected[seed]
+        times = np.array(times)
+        print(f"{workers:>2} workers: p50 {np.percentile(times, 50):6.0f} ms, "
+              f"p90 {np.percentile(times, 90):6.0f} ms, max {times.max():6.0f} ms, "
+              f"avg probes {np.mean(probes):5.1f}, same pick as serial {same}/{len(SEEDS)}")
+        time.sleep(LATENCY)  # Let abandoned probes from the last run finish
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import os
+import io
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+import contextlib
+import numpy as np
+import multi_stock_scanner
+from benchmark_bar_archive import NaiveProvider
+from market_data import SyntheticProvider
+from ohlcv_cache import OHLCVCache
+from position_tracker import PositionTracker
+from price_index import PriceIndex
+
+# Standard performance scenarios run against the offline SyntheticProvider,
+# so results are repeatable and need no network. Each scenario reports
+# throughput, latency percentiles and peak traced memory, and is compared
+# with the saved baselines; anything worse than TOLERANCE is flagged.
+# Set UPDATE_BASELINES=1 to save the current results as the new baselines.
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+TOLERANCE = 0.25  # 25% slower, less throughput or more memory counts as a regression
+LATENCY = 0.002  # Simulated seconds per provider call
+ERROR_RATE = 0.01  # Fraction of provider calls that fail
+
+UNIVERSE = [f"SYN{i:04d}" for i in range(4000)]  # Roughly NASDAQ-sized
+
+
+class Scenario:
+    """
+    One benchmark: setup() returns state, run(state) does `items` units of
+    work once and returns the number of errors it saw, and the optional
+    teardown(state) undoes whatever setup() changed.
+    """
+
+    def __init__(self, name, setup, run, items, repeats, teardown=None):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.items = items
+        self.repeats = repeats
+        self.teardown = teardown
+
+
+def make_provider():
+    return SyntheticProvider(latency=LATENCY, error_rate=ERROR_RATE)
+
+# Single-ticker analyze: multi_stock_scanner.analyze_stock with yfinance swapped for the stand-in
+def setup_single():
+    original = multi_stock_scanner.yf
+    multi_stock_scanner.yf = make_provider()
+    return original
+
+def run_single(state):
+    result = multi_stock_scanner.analyze_stock("SYN0001")
+    return int("Error" in result)
+
+def teardown_single(original):
+    multi_stock_scanner.yf = original
+
+# 500-ticker scan through the batched scanner
+def setup_scan():
+    return make_provider()
+
+def run_scan(provider):
+    try:
+        results = multi_stock_scanner.scan_stocks(UNIVERSE[:500], provider=provider)
+    except ConnectionError:
+        return 1
+    return sum("Error" in result for result in results)
+
+# NASDAQ-wide price filter: refresh a fresh price index for the universe and query under $5
+def setup_price_filter():
+    return make_provider()
+
+def run_price_filter(provider):
+    with tempfile.TemporaryDirectory() as directory:
+        index = PriceIndex(os.path.join(directory, "index.npz"))
+        try:
+            index.refresh(UNIVERSE, provider=provider)
+        except ConnectionError:
+            return 1
+        index.query(max_price=5, min_volume=1_000_000)
+    return 0
+
+# Streaming tracker: one poll of 300 open positions plus a burst of live quotes
+def setup_tracker():
+    provider = SyntheticProvider()  # Seeding runs without latency or errors
+    tracker = PositionTracker(provider)
+    for ticker in UNIVERSE[:300]:
+        hist = provider.history(ticker, period="1y")
+        price = float(hist["Close"].iloc[-1])
+        tracker.add(ticker, price, price * 10, price / 10, history=hist)  # Levels that never trigger
+    provider.latency, provider.error_rate = LATENCY, ERROR_RATE
+    return tracker
+
+def run_tracker(tracker):
+    try:
+        tracker.tick()
+    except ConnectionError:
+        return 1
+    for position in list(tracker.positions.values()):
+        tracker.on_quote(position.ticker, position.price * 1.001)
+    return 0
+
+# Positions seeded from tz-aware history must still see bars from a tz-naive live feed (like yf.download)
+def check_naive_tracker():
+    seed = SyntheticProvider(years=1)
+    live = SyntheticProvider(years=1, end="2024-11-22")
+    tracker = PositionTracker(NaiveProvider(live))
+    for ticker in UNIVERSE[:5]:
+        hist = seed.history(ticker, period="1y")
+        price = float(hist["Close"].iloc[-1])
+        sell = float(live.history(ticker, period="5d")["Close"].iloc[-1])  # Reached on the newest live bar
+        tracker.add(ticker, price, sell, 0, history=hist)
+    with contextlib.redirect_stdout(io.StringIO()):
+        events = tracker.tick()
+    assert all(event["Event"] == "Sell" for event in events), events
+    assert not tracker.positions, f"tick() never fired for {list(tracker.positions)}"
+    print("Position tracker fires exits from a tz-naive live provider\n")
+
+# Batch downloads with a tz-naive index (like yf.download) must land on the same days as history(),
+# and a later top-up must merge onto them instead of failing
+def check_naive_cache():
+    tickers = UNIVERSE[:5]
+    with tempfile.TemporaryDirectory() as directory:
+        cache = OHLCVCache(NaiveProvider(SyntheticProvider(years=1)), directory=directory)
+        cache.history_batch(tickers, period="1y")
+        cache.ttls["1d"] = 0  # Everything stored is now stale
+        cache.provider = NaiveProvider(SyntheticProvider(years=1, end="2024-11-22"))
+        wide = cache.history_batch(tickers, period="1y")
+        for ticker in tickers:
+            hist = cache.history(ticker, period="1y")
+            assert hist.index.equals(wide.index), f"{ticker}: history() and history_batch() disagree on dates"
+            assert not hist.index.duplicated().any(), f"{ticker}: top-up duplicated bars"
+    print("OHLCV cache tops up bars from a tz-naive batch provider\n")
+
+SCENARIOS = [
+    Scenario("single_ticker_analyze", setup_single, run_single, items=1, repeats=50, teardown=teardown_single),
+    Scenario("scan_500_tickers", setup_scan, run_scan, items=500, repeats=3),
+    Scenario("nasdaq_price_filter", setup_price_filter, run_price_filter, items=len(UNIVERSE), repeats=3),
+    Scenario("streaming_tracker_300", setup_tracker, run_tracker, items=300, repeats=10),
+]
+
+
+def measure(scenario):
+    state = scenario.setup()
+    latencies, errors = [], 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # The scanners print per ticker
+            for _ in range(scenario.repeats):
+                start = time.perf_counter()
+                errors += scenario.run(state)
+                latencies.append(time.perf_counter() - start)
+
+            # One extra run under tracemalloc for peak memory; it is too slow to time with
+            tracemalloc.start()
+            scenario.run(state)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        if scenario.teardown:
+            scenario.teardown(state)
+
+    ms = np.array(latencies) * 1000
+    return {
+        "Runs": scenario.repeats,
+        "Errors": errors,
+        "Throughput (items/s)": round(scenario.items * scenario.repeats / sum(latencies), 1),
+        "p50 (ms)": round(float(np.percentile(ms, 50)), 2),
+        "p95 (ms)": round(float(np.percentile(ms, 95)), 2),
+        "p99 (ms)": round(float(np.percentile(ms, 99)), 2),
+        "Peak Memory (MB)": round(peak / 1024 / 1024, 2),
+    }
+
+# Helper function to list the ways a result is worse than its baseline
+def regressions(result, baseline):
+    found = []
+    for key in ("p50 (ms)", "p95 (ms)", "Peak Memory (MB)"):
+        if key in baseline and result[key] > baseline[key] * (1 + TOLERANCE):
+            found.append(f"{key} {baseline[key]} -> {result[key]}")
+    key = "Throughput (items/s)"
+    if key in baseline and result[key] < baseline[key] / (1 + TOLERANCE):
+        found.append(f"{key} {baseline[key]} -> {result[key]}")
+    return found
+
+def load_baselines(path=BASELINES_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baselines(results, path=BASELINES_PATH):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nBaselines saved to {path}")
+
+def main():
+    baselines = load_baselines()
+    update = os.environ.get("UPDATE_BASELINES") == "1" or not baselines
+    print(f"Synthetic provider: {LATENCY * 1000:.0f} ms latency, {ERROR_RATE:.0%} error rate\n")
+    check_naive_tracker()
+    check_naive_cache()
+
+    results, failed = {}, []
+    for scenario in SCENARIOS:
+        result = measure(scenario)
+        results[scenario.name] = result
+        print(f"=== {scenario.name} ===")
+        for key, value in result.items():
+            print(f"{key}: {value}")
+        problems = regressions(result, baselines.get(scenario.name, {}))
+        if problems:
+            failed.append(scenario.name)
+            print("REGRESSION: " + "; ".join(problems))
+        print()
+
+    if update:
+        save_baselines(results)
+    elif failed:
+        print(f"Regressions in: {', '.join(failed)}")
+        sys.exit(1)
+    else:
+        print("No regressions against the saved baselines.")
+
+if __name__ == "__main__":
+    main()
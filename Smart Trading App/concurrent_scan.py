@@ -0,0 +1,93 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+YAHOO_HOST = "query2.finance.yahoo.com"
+_DONE = object()
+
+
+class RateLimiter:
+    """
+    Token bucket per host: each host gets `rate` requests per second with
+    bursts of up to `burst`, shared by every worker thread.
+    """
+
+    def __init__(self, rate=20, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._buckets = {}  # host -> [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def acquire(self, host=YAHOO_HOST):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = [tokens - 1, now]
+                    return
+                self._buckets[host] = [tokens, now]
+                wait_for = (1 - tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class RateLimitedProvider:
+    """
+    Wraps a data provider so every upstream call waits for a token first.
+    Put it underneath the cache so cache hits are never throttled.
+    """
+
+    def __init__(self, provider, limiter, host=YAHOO_HOST):
+        self.provider = provider
+        self.limiter = limiter
+        self.host = host
+
+    def history(self, *args, **kwargs):
+        self.limiter.acquire(self.host)
+        return self.provider.history(*args, **kwargs)
+
+    def history_batch(self, *args, **kwargs):
+        self.limiter.acquire(self.host)
+        return self.provider.history_batch(*args, **kwargs)
+
+    def info(self, *args, **kwargs):
+        self.limiter.acquire(self.host)
+        return self.provider.info(*args, **kwargs)
+
+
+def scan_concurrently(items, work, max_workers=8):
+    """
+    Runs work(item) on a thread pool and yields (item, result) pairs as soon
+    as each one finishes. At most 2 * max_workers calls are queued at a time,
+    so huge ticker lists are not submitted all at once. Exceptions raised by
+    work are yielded in place of the result. Queued calls are cancelled if
+    the caller stops iterating early.
+    """
+    items = iter(items)
+    pending = {}
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit_more():
+        while len(pending) < 2 * max_workers:
+            item = next(items, _DONE)
+            if item is _DONE:
+                return
+            pending[pool.submit(work, item)] = item
+
+    try:
+        submit_more()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                yield item, result
+            submit_more()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
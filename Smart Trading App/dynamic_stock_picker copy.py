@@ -1,13 +1,13 @@
 import yfinance as yf
 import random
-import pandas as pd
+from indicators import calculate_atr
+from ticker_universe import universe
 
 # Fetch live stock universe dynamically (replace with API/screener for broader scope)
 def fetch_stock_universe():
     try:
         # Example: S&P 500 tickers dataset; replace with a market-wide dataset
-        stock_universe = pd.read_csv('https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv')
-        tickers = stock_universe['Symbol'].tolist()
+        tickers = universe.symbols("sp500")
 
         # Remove problematic tickers with special characters
         valid_tickers = [ticker for ticker in tickers if "." not in ticker and "$" not in ticker]
@@ -17,15 +17,6 @@ def fetch_stock_universe():
         print(f"Error fetching stock universe: {e}")
         return []
 
-# Helper function to calculate ATR (volatility)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None
-
 # Analyze one stock
 def analyze_stock(ticker):
     try:
@@ -1,6 +1,7 @@
 import yfinance as yf
 import pandas as pd
 import random
+from indicators import calculate_atr
 
 # Function to dynamically fetch random stocks under $5
 def get_dynamic_penny_stocks():
@@ -12,15 +13,6 @@ def get_dynamic_penny_stocks():
     random.shuffle(all_stocks)  # Randomize the selection
     return all_stocks[:10]  # Return the first 10 stocks as a random subset
 
-# Helper function to calculate volatility (ATR)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None
-
 # Function to determine buy, hold, or sell
 def generate_signal(current_price, sma, ema):
     if current_price < ema:
@@ -1,27 +1,6 @@
 import yfinance as yf
 import pandas as pd
-
-# Helper function to calculate ATR (volatility)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None
-
-# Helper function to calculate RSI
-def calculate_rsi(data, window=14):
-    delta = data['Close'].diff(1)
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-
-    avg_gain = gain.rolling(window=window).mean()
-    avg_loss = loss.rolling(window=window).mean()
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.iloc[-1] if not rsi.isna().all() else None
+from indicators import calculate_atr, calculate_rsi
 
 # Analyze a stock
 def analyze_stock(ticker, min_volume=1000000, min_profit=0.05):
@@ -1,7 +1,32 @@
-import yfinance as yf
-import pandas as pd
+from concurrent_scan import RateLimiter, RateLimitedProvider, scan_concurrently
+from market_data import YFinanceProvider
+from ohlcv_cache import OHLCVCache
+from price_index import price_index
+from ticker_universe import universe
 
-def fetch_all_stocks(max_price):
+# Bars are kept on disk between runs; only new bars are downloaded,
+# and those downloads share one per-host rate limit across all workers
+history_cache = OHLCVCache(RateLimitedProvider(YFinanceProvider(), RateLimiter(rate=20)))
+
+# Fetch one ticker's latest close, or None if it has no usable data
+def fetch_latest_price(ticker, provider=None):
+    data = (provider or history_cache).history(ticker, period="1d")
+    if data.empty:
+        return None  # Skip invalid or inactive stocks
+    return data["Close"].iloc[-1]
+
+def iter_stocks_under(tickers, max_price, workers=16, provider=None):
+    """
+    Checks tickers on a pool of `workers` threads and yields each stock at or
+    under max_price as soon as its price arrives.
+    """
+    for ticker, live_price in scan_concurrently(tickers, lambda t: fetch_latest_price(t, provider), workers):
+        if isinstance(live_price, Exception) or live_price is None:
+            continue
+        if live_price <= max_price:
+            yield {"Ticker": ticker, "Price": round(live_price, 2)}
+
+def fetch_all_stocks(max_price, workers=16, use_index=True):
     """
     Dynamically fetch all valid stock prices from NASDAQ and filter by a maximum price.
     """
@@ -9,33 +34,31 @@ def fetch_all_stocks(max_price):
 
     # Step 1: Get NASDAQ tickers dynamically
     try:
-        nasdaq_url = "https://datahub.io/core/nasdaq-listings/r/nasdaq-listed-symbols.csv"
-        tickers = pd.read_csv(nasdaq_url)["Symbol"].tolist()
+        tickers = universe.symbols("nasdaq")
     except Exception as e:
         print("Error fetching NASDAQ stock tickers:", e)
         return
 
-    # Step 2: Fetch and filter stocks
-    results = []
-    for ticker in tickers:
+    # Step 2: Answer from the bulk-refreshed price index, or probe each ticker
+    results = None
+    if use_index:
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="1d")
-            if data.empty:
-                continue  # Skip invalid or inactive stocks
-            
-            live_price = data["Close"].iloc[-1]
-            if live_price <= max_price:
-                results.append({"Ticker": ticker, "Price": round(live_price, 2)})
-        except Exception:
-            continue
+            price_index.refresh_if_stale(tickers)
+            results = price_index.query(max_price=max_price, among=tickers)
+        except Exception as e:
+            print(f"Price index unavailable, checking tickers one by one: {e}")
+    if results is None:
+        results = iter_stocks_under(tickers, max_price, workers=workers)
+
+    # Step 3: Display stocks as they come in
+    found = 0
+    for result in results:
+        if not found:
+            print(f"Stocks under ${max_price}:")
+        found += 1
+        print(f"- {result['Ticker']}: ${result['Price']:.2f}")
 
-    # Step 3: Display results
-    if results:
-        print(f"Stocks under ${max_price}:")
-        for result in results:
-            print(f"- {result['Ticker']}: ${result['Price']}")
-    else:
+    if not found:
         print("No valid stocks found in the given price range.")
 
 # Run the script
@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import OrderedDict
+from market_data import YFinanceProvider, _to_tz, fetch_history_batch, ticker_slice
+from streaming_indicators import IndicatorState
+
+
+class IndicatorStore:
+    """
+    Latest SMA/EMA/ATR/RSI for a watchlist of tickers, kept current by a
+    background thread. New tickers are seeded from a year of daily bars;
+    after that each refresh pulls the last few days in one batched request
+    and feeds only the new bars into each ticker's streaming state.
+    get() is a dict lookup, so web routes never download history.
+    Pass a `seed_provider` such as a BarArchive to seed from local history;
+    new tickers are then topped up from `provider` straight away.
+    The watchlist is always kept; of the other tickers asked for through
+    get(), only the `max_tickers` most recent are. Tickers whose seed comes
+    back empty are not tried again for `retry_after` seconds.
+    """
+
+    def __init__(self, provider=None, watchlist=(), window=14, refresh_interval=60, seed_period="1y",
+                 seed_provider=None, max_tickers=500, retry_after=900):
+        self.provider = provider or YFinanceProvider()
+        self.seed_provider = seed_provider or self.provider
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self.seed_period = seed_period
+        self.max_tickers = max_tickers
+        self.retry_after = retry_after
+        self._states = {}
+        self._snapshots = {}  # ticker -> latest values, replaced wholesale on every update
+        self._watchlist = frozenset(watchlist)
+        self._recent = OrderedDict()  # Other tickers asked for through get(), least recently asked first
+        self._retry_at = {}  # ticker -> time.monotonic() after which an empty seed is tried again
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def get(self, ticker):
+        """
+        Returns the latest indicator values, or None while the ticker is
+        still being seeded (it is queued for the next refresh if needed).
+        """
+        snapshot = self._snapshots.get(ticker)
+        if ticker in self._watchlist:
+            return snapshot
+        with self._lock:
+            new = ticker not in self._recent
+            self._recent[ticker] = None
+            self._recent.move_to_end(ticker)
+            while len(self._recent) > self.max_tickers:
+                self._recent.popitem(last=False)  # Its state is dropped on the next refresh
+        if snapshot is None and new:
+            self._wake.set()
+        return snapshot
+
+    def update_bar(self, ticker, timestamp, high, low, close):
+        state = self._states.get(ticker)
+        if state is None:
+            return None
+        snapshot = state.update(timestamp, high, low, close)
+        self._snapshots[ticker] = dict(snapshot)
+        return snapshot
+
+    def _seed(self, tickers):
+        wide = fetch_history_batch(tickers, provider=self.seed_provider, period=self.seed_period)
+        for ticker in tickers:
+            hist = ticker_slice(wide, ticker)
+            if hist.empty:
+                self._retry_at[ticker] = time.monotonic() + self.retry_after
+                continue
+            self._retry_at.pop(ticker, None)
+            state = IndicatorState(self.window)
+            snapshot = state.seed(hist)
+            self._states[ticker] = state
+            self._snapshots[ticker] = dict(snapshot)
+
+    def _top_up(self, tickers):
+        wide = fetch_history_batch(tickers, provider=self.provider, period="5d")
+        for ticker in tickers:
+            state = self._states[ticker]
+            hist = ticker_slice(wide, ticker)
+            if state.pending is not None:
+                since = state.pending[0]
+                hist.index = _to_tz(hist.index, since.tzinfo)  # The seed may come from a source with another timezone
+                hist = hist[hist.index >= since]  # Bars we already have are skipped
+            for timestamp, bar in hist.iterrows():
+                self.update_bar(ticker, timestamp, float(bar["High"]), float(bar["Low"]), float(bar["Close"]))
+
+    # Helper function to drop tickers that are neither on the watchlist nor asked for recently
+    def _prune(self, wanted):
+        for ticker in [ticker for ticker in self._states if ticker not in wanted]:
+            del self._states[ticker]
+            self._snapshots.pop(ticker, None)
+        for ticker in [ticker for ticker in self._retry_at if ticker not in wanted]:
+            del self._retry_at[ticker]
+
+    def refresh(self):
+        with self._lock:
+            wanted = list(self._watchlist) + [ticker for ticker in self._recent if ticker not in self._watchlist]
+        self._prune(set(wanted))
+        now = time.monotonic()
+        new = [ticker for ticker in wanted if ticker not in self._states and self._retry_at.get(ticker, 0) <= now]
+        known = [ticker for ticker in wanted if ticker in self._states]
+        if new:
+            self._seed(new)
+            if self.seed_provider is not self.provider:
+                known += [ticker for ticker in new if ticker in self._states]  # Catch up past the archive
+        if known:
+            self._top_up(known)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Indicator refresh failed: {e}")
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="indicator-store", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
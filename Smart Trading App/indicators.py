@@ -0,0 +1,91 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Shared indicator math. Every function takes 1-D (time) or 2-D
+# (ticker x time) arrays, works along the last axis and never mutates its input.
+
+# Helper function to turn Series/DataFrame columns or lists into float arrays
+# (float32 and float64 arrays are used as they are, without a copy)
+def _as_array(values):
+    values = np.asarray(values)
+    return values if values.dtype in (np.float32, np.float64) else values.astype(np.float64)
+
+# Rolling mean that is NaN until `window` values are available, like pandas rolling(window).mean()
+def rolling_mean(values, window=14):
+    values = _as_array(values)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        out[..., window - 1:] = sliding_window_view(values, window, axis=-1).mean(axis=-1, dtype=np.float64)
+    return out
+
+# Simple Moving Average
+def sma(close, window=14):
+    return rolling_mean(close, window)
+
+# Exponential Moving Average, same as pandas ewm(span=span, adjust=False).mean()
+def ema(close, span=14):
+    close = _as_array(close)
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    out = np.empty(close.shape)
+    weighted = close[..., 0].copy()
+    old_wt = np.ones(close.shape[:-1])
+    out[..., 0] = weighted
+    # Loops over bars only; all tickers advance together
+    for t in range(1, close.shape[-1]):
+        cur = close[..., t]
+        observed = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        update = started & observed
+        blended = (old_wt * weighted + alpha * np.where(observed, cur, 0.0)) / (old_wt + alpha)
+        weighted = np.where(update, blended, weighted)
+        old_wt = np.where(update, 1.0, old_wt)
+        # First observation seeds the average
+        weighted = np.where(~started & observed, cur, weighted)
+        out[..., t] = weighted
+    return out
+
+# True Range: largest of High-Low, |High-prev Close| and |Low-prev Close|
+def true_range(high, low, close):
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[..., 1:] = close[..., :-1]
+    with np.errstate(invalid="ignore"):
+        tr = np.fmax(high - low, np.abs(high - prev_close))
+        return np.fmax(tr, np.abs(low - prev_close))
+
+# Average True Range (volatility)
+def atr(high, low, close, window=14):
+    return rolling_mean(true_range(high, low, close), window)
+
+# Relative Strength Index over simple rolling averages of gains and losses
+def rsi(close, window=14):
+    close = _as_array(close)
+    delta = np.full(close.shape, np.nan)
+    delta[..., 1:] = np.diff(close, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        rs = rolling_mean(gain, window) / rolling_mean(loss, window)
+        return 100 - (100 / (1 + rs))
+
+# Helper function to read the latest non-NaN value per ticker (NaN when there is none)
+def last_valid(values):
+    values = _as_array(values)
+    valid = ~np.isnan(values)
+    idx = values.shape[-1] - 1 - np.argmax(valid[..., ::-1], axis=-1)
+    latest = np.take_along_axis(values, np.expand_dims(idx, -1), axis=-1)[..., 0]
+    return np.where(valid.any(axis=-1), latest, np.nan)
+
+
+# Drop-in helpers for the per-ticker scripts; they read the price columns
+# and return the latest value without adding columns to `data`.
+
+def calculate_atr(data, window=14):
+    values = atr(data['High'], data['Low'], data['Close'], window)
+    return float(values[-1]) if not np.isnan(values).all() else None
+
+def calculate_rsi(data, window=14):
+    values = rsi(data['Close'], window)
+    return float(values[-1]) if not np.isnan(values).all() else None
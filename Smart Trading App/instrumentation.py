@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import bisect
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scan_metrics")
+
+# Histogram bucket upper bounds in seconds, from half a millisecond to a minute
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_NO_OP = nullcontext()
+
+
+class StageHistogram:
+    """
+    Count, total and bucketed durations for one stage.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last slot is +Inf
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "mean_seconds": round(self.total / self.count, 6) if self.count else 0.0,
+            "max_seconds": round(self.max, 6),
+            "buckets": {str(bound): n for bound, n in zip(list(BUCKETS) + ["+Inf"], self.buckets)},
+        }
+
+
+class Instrumentation:
+    """
+    Stage timers and counters for the scanners. Wrap work in
+    `with instruments.stage("fetch.history"):` or decorate it with
+    @instruments.timed("compute.indicators"). While disabled, stage() hands
+    back a shared no-op context and timed() calls straight through, so the
+    hooks can stay in the code. Set SCAN_METRICS=1 to enable timing and
+    SCAN_PROFILE=1 to also dump a cProfile file per scan run.
+    """
+
+    def __init__(self, enabled=False, profile=False, directory=METRICS_DIR):
+        self.enabled = enabled or profile
+        self.profile = profile
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = StageHistogram()
+            histogram.observe(seconds)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def stage(self, name):
+        return self._timer(name) if self.enabled else _NO_OP
+
+    def timed(self, name):
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self._timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def run(self, name):
+        """
+        Times a whole scan as stage `name`; with profiling on, the run is
+        also recorded with cProfile and saved to <directory>/<name>-<time>.prof.
+        """
+        if not self.enabled:
+            yield
+            return
+        profiler = cProfile.Profile() if self.profile else None
+        if profiler:
+            profiler.enable()
+        try:
+            with self._timer(name):
+                yield
+        finally:
+            if profiler:
+                profiler.disable()
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+                profiler.dump_stats(path)
+                print(f"Profile saved to {path} (view with: python -m pstats {path})")
+
+    def to_json(self):
+        with self._lock:
+            return {
+                "stages": {name: histogram.to_dict() for name, histogram in sorted(self.stages.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP scan_stage_seconds Time spent in each scan stage.",
+            "# TYPE scan_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(list(BUCKETS) + ["+Inf"], histogram.buckets):
+                    cumulative += n
+                    lines.append(f'scan_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'scan_stage_seconds_sum{{stage="{name}"}} {histogram.total:.6f}')
+                lines.append(f'scan_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+            lines.append("# HELP scan_events_total Counted scan events.")
+            lines.append("# TYPE scan_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'scan_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """
+        Prints a per-stage summary and writes scan_metrics.json and
+        scan_metrics.prom. Does nothing while disabled.
+        """
+        if not self.enabled:
+            return
+        metrics = self.to_json()
+        print("\n=== Scan Timings ===")
+        for name, stage in metrics["stages"].items():
+            print(f"{name:<22} {stage['count']:>5} calls, {stage['total_seconds']:8.3f} s total, "
+                  f"{stage['mean_seconds'] * 1000:8.2f} ms mean, {stage['max_seconds'] * 1000:8.2f} ms max")
+        for name, value in metrics["counters"].items():
+            print(f"{name:<22} {value:>5}")
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "scan_metrics.json"), "w") as f:
+            json.dump(metrics, f, indent=2)
+        with open(os.path.join(self.directory, "scan_metrics.prom"), "w") as f:
+            f.write(self.to_prometheus())
+        print(f"Metrics saved to {self.directory}")
+
+
+class InstrumentedProvider:
+    """
+    Wraps a market-data provider so each call is timed as a fetch stage.
+    """
+
+    def __init__(self, provider, instruments):
+        self.provider = provider
+        self.instruments = instruments
+
+    def history(self, ticker, **kwargs):
+        with self.instruments.stage("fetch.history"):
+            return self.provider.history(ticker, **kwargs)
+
+    def history_batch(self, tickers, **kwargs):
+        self.instruments.count("tickers_requested", len(tickers))
+        with self.instruments.stage("fetch.history_batch"):
+            return self.provider.history_batch(tickers, **kwargs)
+
+    def info(self, ticker):
+        with self.instruments.stage("fetch.info"):
+            return self.provider.info(ticker)
+
+
+# Shared instance, switched on with the SCAN_METRICS / SCAN_PROFILE environment variables
+instruments = Instrumentation(
+    enabled=os.environ.get("SCAN_METRICS") == "1",
+    profile=os.environ.get("SCAN_PROFILE") == "1",
+)
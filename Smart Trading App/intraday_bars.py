@@ -0,0 +1,340 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from market_data import PRICE_FIELDS, PERIOD_OFFSETS, YFinanceProvider, _as_timestamp, _as_wide, period_start
+from ohlcv_cache import DEFAULT_TTLS
+
+TZ = "America/New_York"
+NS_PER_MINUTE = 60 * 10**9
+SESSION_OPEN = 9 * 60 + 30  # Minutes after midnight; intraday bars line up with the 9:30 open
+SESSION_MINUTES = 390  # 9:30 to 16:00
+
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60, "1d": 1440}
+
+# Base intervals that get downloaded, finest first, and how far back Yahoo serves each
+BASE_LOOKBACK = {
+    "1m": pd.Timedelta(days=7),
+    "5m": pd.Timedelta(days=60),
+    "60m": pd.Timedelta(days=730),
+}
+
+# One bar; time is the exchange's wall-clock time in nanoseconds
+BAR = np.dtype([("time", "<i8"), ("open", "<f4"), ("high", "<f4"), ("low", "<f4"),
+                ("close", "<f4"), ("volume", "<i8")])
+FIELD_NAMES = dict(zip(PRICE_FIELDS, ("open", "high", "low", "close", "volume")))
+
+
+# Helper function to turn a bar DataFrame into BAR records
+def to_bars(hist):
+    hist = hist.dropna(subset=["Close"])
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_convert(TZ).tz_localize(None)
+    bars = np.zeros(len(hist), dtype=BAR)
+    bars["time"] = index.asi8
+    for field, name in FIELD_NAMES.items():
+        values = hist[field].to_numpy(np.float64)
+        bars[name] = np.nan_to_num(values) if field == "Volume" else values
+    return bars
+
+# Helper function to turn BAR records back into a tz-aware DataFrame
+def to_frame(bars):
+    index = pd.DatetimeIndex(bars["time"].astype("datetime64[ns]"), name="Datetime").tz_localize(TZ)
+    return pd.DataFrame({field: bars[name] for field, name in FIELD_NAMES.items()}, index=index)
+
+def resample(bars, interval):
+    """
+    Aggregates sorted bars into coarser ones with one pass of reduceat;
+    intraday buckets start at the 9:30 open, daily ones at midnight.
+    """
+    minutes = INTERVAL_MINUTES[interval]
+    width = minutes * NS_PER_MINUTE
+    offset = 0 if interval == "1d" else (SESSION_OPEN % minutes) * NS_PER_MINUTE
+    if not len(bars):
+        return bars
+    buckets = (bars["time"] - offset) // width
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.concatenate([starts[1:], [len(bars)]]) - 1
+    out = np.empty(len(starts), dtype=BAR)
+    out["time"] = buckets[starts] * width + offset
+    out["open"] = bars["open"][starts]
+    out["high"] = np.maximum.reduceat(bars["high"], starts)
+    out["low"] = np.minimum.reduceat(bars["low"], starts)
+    out["close"] = bars["close"][ends]
+    out["volume"] = np.add.reduceat(bars["volume"], starts)
+    return out
+
+# Helper function to turn a user-supplied date into exchange wall-clock nanoseconds
+def _wall_clock(value):
+    return _as_timestamp(value).tz_convert(TZ).tz_localize(None).value
+
+# First bar time (wall-clock ns) a request needs; periods count back from the newest bar's day
+def wanted_from(last_time, period, start):
+    if start is not None:
+        return _wall_clock(start)
+    day_after = pd.Timestamp(last_time).normalize() + pd.Timedelta(days=1)
+    first = period_start(period, day_after)
+    return np.iinfo(np.int64).min if first is None else first.value
+
+
+class IntradayBars:
+    """
+    In-memory intraday bar cache. Each ticker's finest usable base interval
+    (1m, then 5m, then 60m, depending on how far back the request reaches)
+    is downloaded once; coarser intervals such as 15m, 1h or 1d are
+    resampled from it and kept until new bars arrive. Stale tickers only
+    download the bars since their last one, live minute bars can be merged
+    in with append(), and the least recently used tickers are dropped once
+    the cache grows past max_bytes. Requests no base can serve, or whose
+    base bars would not fit in max_bytes, go straight to the provider. It
+    has the provider methods, so it can stand in for one.
+    """
+
+    def __init__(self, provider=None, bases=("1m", "5m", "60m"), ttls=None, max_bytes=256 * 1024 * 1024):
+        self.provider = provider or YFinanceProvider()
+        self.bases = bases
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.top_ups = 0
+        self.evictions = 0
+        self.direct = 0
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (ticker, base) -> {"bars", "covered_from", "fetched_at", "derived"}
+        self._evicted = set()  # Keys dropped for memory; they are only cached again when they fit
+
+    # Helper function to find how far back a request reaches, or None for periods like "max"
+    @staticmethod
+    def _reach(period, start):
+        if start is not None:
+            return pd.Timestamp.now(tz=TZ) - _as_timestamp(start)
+        if period in PERIOD_OFFSETS:
+            now = pd.Timestamp.now()
+            return now - (now - PERIOD_OFFSETS[period])
+        return None
+
+    def base_for(self, interval, period="1d", start=None):
+        """
+        The finest base interval that divides `interval` and reaches back far enough, or None.
+        """
+        minutes = INTERVAL_MINUTES.get(interval)
+        reach = self._reach(period, start)
+        if minutes is None or reach is None:
+            return None
+        for base in self.bases:
+            if minutes % INTERVAL_MINUTES[base] == 0 and reach <= BASE_LOOKBACK[base]:
+                return base
+        return None
+
+    # Upper bound on the bytes one ticker's base bars take for a request (full sessions every calendar day)
+    def _estimate(self, base, period, start):
+        days = max(1, int(np.ceil(self._reach(period, start) / pd.Timedelta(days=1))))
+        return days * -(-SESSION_MINUTES // INTERVAL_MINUTES[base]) * BAR.itemsize
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    # Helper function to size an entry, derived intervals included
+    @staticmethod
+    def _size(entry):
+        return entry["bars"].nbytes + sum(bars.nbytes for bars in entry["derived"].values())
+
+    def _put(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= self._size(old)
+            self._entries[key] = entry
+            self._evicted.discard(key)
+            self.nbytes += self._size(entry)
+            self._evict()
+
+    # Drops least recently used entries past max_bytes; the newest one always stays. Call with the lock held.
+    def _evict(self):
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            key, evicted = self._entries.popitem(last=False)
+            self._evicted.add(key)
+            self.nbytes -= self._size(evicted)
+            self.evictions += 1
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    # Decide how a cached entry can answer a request: "hit", "top_up" or "miss"
+    def _plan(self, entry, base, period, start):
+        if entry is None or not len(entry["bars"]):
+            return "miss"
+        if entry["covered_from"] > wanted_from(entry["bars"]["time"][-1], period, start):
+            return "miss"
+        if time.time() - entry["fetched_at"] < self.ttls.get(base, 60):
+            return "hit"
+        return "top_up"
+
+    @staticmethod
+    def _merge(stored, fresh):
+        if stored is None or not len(stored):
+            return fresh
+        if not len(fresh):
+            return stored
+        # Fresh bars replace everything from their first bar on, including a partial last bar
+        keep = stored[stored["time"] < fresh["time"][0]]
+        return np.concatenate([keep, fresh])
+
+    def _store(self, ticker, base, entry, fresh, period, start):
+        bars = self._merge(entry["bars"] if entry else None, to_bars(fresh))
+        if not len(bars):
+            return None
+        covered_from = entry["covered_from"] if entry else wanted_from(bars["time"][-1], period, start)
+        # Drop bars the provider could no longer serve anyway, so memory stays bounded
+        cutoff = bars["time"][-1] - BASE_LOOKBACK[base].value
+        if bars["time"][0] < cutoff:
+            bars = bars[bars["time"] >= cutoff]
+            covered_from = max(covered_from, cutoff)
+        entry = {"bars": bars, "covered_from": covered_from, "fetched_at": time.time(), "derived": {}}
+        self._put((ticker, base), entry)
+        return entry
+
+    def _serve(self, ticker, base, entry, interval, period, start, end):
+        if interval == base or INTERVAL_MINUTES[interval] == INTERVAL_MINUTES[base]:
+            bars = entry["bars"]
+        else:
+            bars = entry["derived"].get(interval)
+            if bars is None:
+                resampled = resample(entry["bars"], interval)
+                # Another thread may have resampled it meanwhile; only the stored copy is counted
+                with self._lock:
+                    bars = entry["derived"].setdefault(interval, resampled)
+                    if bars is resampled and self._entries.get((ticker, base)) is entry:
+                        self.nbytes += bars.nbytes
+                        self._evict()
+        if len(bars):
+            first = np.searchsorted(bars["time"], wanted_from(bars["time"][-1], period, start))
+            last = len(bars) if end is None else np.searchsorted(bars["time"], _wall_clock(end))
+            bars = bars[first:last]
+        return to_frame(bars)
+
+    def history(self, ticker, period="1d", interval="5m", start=None, end=None):
+        wide = self.history_batch([ticker], period=period, interval=interval, start=start, end=end)
+        if ticker not in wide.columns.get_level_values(0):
+            return pd.DataFrame(columns=PRICE_FIELDS)
+        return wide[ticker].dropna(how="all")
+
+    def history_batch(self, tickers, period="1d", interval="5m", start=None, end=None):
+        """
+        Serves cached tickers from memory and groups the rest into as few
+        base-interval provider requests as possible. Missing tickers are
+        fetched at the requested interval instead when the base bars for the
+        whole request would not fit in max_bytes, or when the ticker was
+        evicted before and there is still no room: caching it again would
+        only evict bars the next request downloads again.
+        """
+        base = self.base_for(interval, period, start)
+        if base is None:
+            self._count("direct")
+            return self.provider.history_batch(tickers, period=period, interval=interval, start=start, end=end)
+
+        frames = {}
+        misses = []
+        top_ups = {}  # first day to re-fetch -> tickers
+        entries = {}
+        for ticker in tickers:
+            entry = self._get((ticker, base))
+            plan = self._plan(entry, base, period, start)
+            if plan == "hit":
+                self._count("hits")
+                entries[ticker] = entry
+            elif plan == "top_up":
+                self._count("top_ups")
+                entries[ticker] = entry
+                day = pd.Timestamp(entry["bars"]["time"][-1]).date()
+                top_ups.setdefault(day, []).append(ticker)
+            else:
+                self._count("misses")
+                misses.append(ticker)
+
+        # Under memory pressure a cached base would only push out bars that get downloaded again,
+        # so those misses fetch just the requested interval, like a plain provider call
+        direct = []
+        if misses:
+            estimate = self._estimate(base, period, start)
+            with self._lock:
+                if len(tickers) * estimate > self.max_bytes:
+                    direct = list(misses)
+                else:
+                    # Evicted tickers are cached again only if all of them fit without evicting anything
+                    evicted = [ticker for ticker in misses if (ticker, base) in self._evicted]
+                    if self.nbytes + len(evicted) * estimate > self.max_bytes:
+                        direct = evicted
+        if direct:
+            self._count("direct")
+            wide = _as_wide(self.provider.history_batch(direct, period=period, interval=interval, start=start, end=end),
+                            direct)
+            fetched = set(wide.columns.get_level_values(0))
+            for ticker in direct:
+                bars = to_bars(wide[ticker]) if ticker in fetched else None
+                if bars is not None and len(bars):
+                    frames[ticker] = to_frame(bars)  # Same index form as the cached tickers
+            misses = [ticker for ticker in misses if ticker not in set(direct)]
+
+        requests = [(misses, {"period": period, "start": start}, None)] if misses else []
+        requests += [(group, {"start": day}, "stored") for day, group in top_ups.items()]
+        for group, kwargs, stored in requests:
+            wide = _as_wide(self.provider.history_batch(group, interval=base, **kwargs), group)
+            fetched = set(wide.columns.get_level_values(0))
+            for ticker in group:
+                fresh = wide[ticker] if ticker in fetched else pd.DataFrame(columns=PRICE_FIELDS)
+                entry = self._store(ticker, base, entries.get(ticker) if stored else None, fresh, period, start)
+                if entry is not None:
+                    entries[ticker] = entry
+
+        for ticker in tickers:
+            if ticker in entries:
+                hist = self._serve(ticker, base, entries[ticker], interval, period, start, end)
+                if not hist.empty:
+                    frames[ticker] = hist
+        frames = {ticker: frames[ticker] for ticker in tickers if ticker in frames}  # Request order
+        return _as_wide(pd.concat(frames, axis=1) if frames else None, list(tickers))
+
+    def append(self, ticker, hist, base="1m"):
+        """
+        Merges newly completed bars (e.g. from a live feed) into a cached ticker.
+        Tickers that are not cached yet are left for the next request to download.
+        """
+        entry = self._get((ticker, base))
+        if entry is None:
+            return False
+        bars = self._merge(entry["bars"], to_bars(hist))
+        fetched_at = entry["fetched_at"]
+        self._put((ticker, base), {"bars": bars, "covered_from": entry["covered_from"],
+                                   "fetched_at": fetched_at, "derived": {}})
+        return True
+
+    def info(self, ticker):
+        return self.provider.info(ticker)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.top_ups
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "top_ups": self.top_ups,
+                "direct": self.direct,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "tickers": len(self._entries),
+                "bytes": self.nbytes,
+            }
+
+
+# Shared instance for the analyzers' intraday intervals
+intraday = IntradayBars()
@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import random
+import zlib
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Map yfinance period strings to how far back they reach
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+# Helper function to find the first timestamp covered by a period
+def period_start(period, end):
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=end.year, month=1, day=1, tz=end.tz)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return end - PERIOD_OFFSETS[period]
+
+# Helper function to compare user-supplied dates with tz-aware bar indexes
+def _as_timestamp(value):
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("America/New_York") if ts.tz is None else ts
+
+# Helper function to put a bar index in a timezone; naive indexes (yf.download's daily bars) are exchange time
+def _to_tz(index, tz="America/New_York"):
+    index = pd.DatetimeIndex(index)
+    if tz is None:
+        return index.tz_localize(None) if index.tz is not None else index
+    return index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+
+# Helper function to trim bars to a period ending at the last bar
+def slice_period(hist, period):
+    if hist.empty:
+        return hist
+    start = period_start(period, hist.index[-1])
+    if start is None:
+        return hist
+    return hist[hist.index > start]
+
+# Helper function to pull one ticker's bars out of a wide (ticker, field) frame
+def ticker_slice(wide, ticker):
+    if wide.empty or ticker not in wide.columns.get_level_values(0):
+        return pd.DataFrame(columns=PRICE_FIELDS)
+    hist = wide[ticker]
+    return hist.dropna(how="all")
+
+# Helper function to make sure a batch frame is keyed by (ticker, field)
+def _as_wide(data, tickers):
+    if data is None or data.empty:
+        return pd.DataFrame(columns=pd.MultiIndex.from_tuples([], names=["Ticker", "Price"]))
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+    elif data.columns.get_level_values(0).isin(PRICE_FIELDS).all():
+        # yfinance returns (field, ticker) unless grouped by ticker
+        data = data.swaplevel(axis=1)
+    data.columns = data.columns.set_names(["Ticker", "Price"])
+    return data
+
+
+class YFinanceProvider:
+    """
+    Live data source backed by Yahoo Finance.
+    """
+
+    def history(self, ticker, period="1mo", interval="1d", start=None, end=None):
+        import yfinance as yf
+        if start is not None:
+            return yf.Ticker(ticker).history(start=start, end=end, interval=interval)
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+    def history_batch(self, tickers, period="1mo", interval="1d", start=None, end=None):
+        import yfinance as yf
+        kwargs = {"start": start, "end": end} if start is not None else {"period": period}
+        data = yf.download(
+            tickers,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+            **kwargs,
+        )
+        if not data.empty:
+            data.index = _to_tz(data.index)  # Same New York index as history() and the other providers
+        return _as_wide(data, tickers)
+
+    def info(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+
+class CSVFixtureProvider:
+    """
+    Offline data source that replays recorded bars from <TICKER>.csv files.
+    Optional quote fields can be stored next to them in <TICKER>.json.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _load(self, ticker):
+        path = os.path.join(self.directory, f"{ticker}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=PRICE_FIELDS)
+        hist = pd.read_csv(path, index_col=0)
+        hist.index = pd.to_datetime(hist.index, utc=True).tz_convert("America/New_York")
+        return hist[PRICE_FIELDS]
+
+    def history(self, ticker, period="1mo", interval="1d", start=None, end=None):
+        if interval != "1d":
+            raise ValueError("Fixtures only contain daily bars")
+        hist = self._load(ticker)
+        if start is not None:
+            hist = hist[hist.index >= _as_timestamp(start)]
+            if end is not None:
+                hist = hist[hist.index < _as_timestamp(end)]
+            return hist
+        return slice_period(hist, period)
+
+    def history_batch(self, tickers, period="1mo", interval="1d", start=None, end=None):
+        frames = {}
+        for ticker in tickers:
+            hist = self.history(ticker, period=period, interval=interval, start=start, end=end)
+            if not hist.empty:
+                frames[ticker] = hist
+        if not frames:
+            return _as_wide(None, tickers)
+        return _as_wide(pd.concat(frames, axis=1), tickers)
+
+    def info(self, ticker):
+        path = os.path.join(self.directory, f"{ticker}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return quote_from_history(self.history(ticker, period="1y"))
+
+
+class SyntheticProvider:
+    """
+    Deterministic stand-in that generates random-walk daily bars per ticker
+    and sleeps `latency` seconds per call to mimic a network round trip.
+    Intraday intervals are built from minute bars that walk from each
+    session's open to its close.
+    A seeded `error_rate` fraction of calls raise ConnectionError. The same
+    ticker and seed always give the same bars. Ticker() returns an object
+    shaped like yf.Ticker, so the provider can stand in for the yf module.
+    """
+
+    def __init__(self, latency=0.0, seed=0, end="2024-11-15", years=2, error_rate=0.0):
+        self.latency = latency
+        self.seed = seed
+        self.error_rate = error_rate
+        self._errors = random.Random(seed)
+        self.dates = pd.bdate_range(end=end, periods=252 * years, tz="America/New_York", name="Date")
+        self._bars = {}
+
+    def _generate(self, ticker):
+        if ticker not in self._bars:
+            rng = np.random.default_rng([zlib.crc32(ticker.encode()), self.seed])
+            n = len(self.dates)
+            start_price = np.exp(rng.uniform(np.log(0.5), np.log(500)))
+            close = start_price * np.exp(np.cumsum(rng.normal(0.0002, 0.025, n)))
+            open_ = close * (1 + rng.normal(0, 0.008, n))
+            spread = np.abs(rng.normal(0, 0.01, n))
+            self._bars[ticker] = pd.DataFrame({
+                "Open": open_,
+                "High": np.maximum(open_, close) * (1 + spread),
+                "Low": np.minimum(open_, close) * (1 - spread),
+                "Close": close,
+                "Volume": rng.lognormal(np.log(1_500_000), 1.0, n).astype(np.int64),
+            }, index=self.dates)
+        return self._bars[ticker]
+
+    def _slice(self, ticker, period, start, end):
+        hist = self._generate(ticker)
+        if start is not None:
+            hist = hist[hist.index >= _as_timestamp(start)]
+            if end is not None:
+                hist = hist[hist.index < _as_timestamp(end)]
+            return hist
+        return slice_period(hist, period)
+
+    # Helper function to build one ticker's minute bars for the given daily sessions
+    def _minutes(self, ticker, daily):
+        if daily.empty:
+            return pd.DataFrame(columns=PRICE_FIELDS)
+        t = np.arange(1, 391) / 390
+        walks, spreads, weights = [], [], []
+        for day in daily.index:
+            rng = np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, day.toordinal()])
+            walks.append(np.cumsum(rng.normal(0, 0.025 / np.sqrt(390), 390)))
+            spreads.append(np.abs(rng.normal(0, 0.0005, 390)))
+            weights.append(1 + 4 * (t - 0.5) ** 2 * rng.random(390))  # Busier near the open and close
+        walk, spread, weight = np.array(walks), np.array(spreads), np.array(weights)
+        first = np.log(daily["Open"].to_numpy())[:, None]
+        last = np.log(daily["Close"].to_numpy())[:, None]
+        close = np.exp(first + (last - first) * t + walk - t * walk[:, -1:])  # Pinned to each day's open and close
+        open_ = np.concatenate([np.exp(first), close[:, :-1]], axis=1)
+        volume = daily["Volume"].to_numpy()[:, None] * weight / weight.sum(axis=1, keepdims=True)
+        index = (daily.index.tz_localize(None).values[:, None] + np.timedelta64(570, "m")
+                 + np.arange(390).astype("timedelta64[m]")).ravel()
+        return pd.DataFrame({
+            "Open": open_.ravel(),
+            "High": (np.maximum(open_, close) * (1 + spread)).ravel(),
+            "Low": (np.minimum(open_, close) * (1 - spread)).ravel(),
+            "Close": close.ravel(),
+            "Volume": volume.astype(np.int64).ravel(),
+        }, index=pd.DatetimeIndex(index, name="Datetime").tz_localize(daily.index.tz))
+
+    def _intraday(self, ticker, interval, period, start, end):
+        first_day = None if start is None else _as_timestamp(start).normalize()
+        minutes = self._minutes(ticker, self._slice(ticker, period, first_day, end))
+        if start is not None:
+            minutes = minutes[minutes.index >= _as_timestamp(start)]
+        if end is not None:
+            minutes = minutes[minutes.index < _as_timestamp(end)]
+        if interval == "1m" or minutes.empty:
+            return minutes
+        width = int(interval.rstrip("mh")) * (60 if interval.endswith("h") else 1)
+        bars = minutes.resample(f"{width}min", offset=f"{570 % width}min").agg(
+            {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+        return bars.dropna(subset=["Close"])
+
+    # Helper function to simulate the round trip and the occasional failed request
+    def _call(self):
+        time.sleep(self.latency)
+        if self.error_rate and self._errors.random() < self.error_rate:
+            raise ConnectionError("Synthetic provider error")
+
+    def history(self, ticker, period="1mo", interval="1d", start=None, end=None):
+        self._call()
+        if interval != "1d":
+            return self._intraday(ticker, interval, period, start, end)
+        return self._slice(ticker, period, start, end)
+
+    def history_batch(self, tickers, period="1mo", interval="1d", start=None, end=None):
+        self._call()
+        if interval != "1d":
+            frames = {ticker: self._intraday(ticker, interval, period, start, end) for ticker in tickers}
+        else:
+            frames = {ticker: self._slice(ticker, period, start, end) for ticker in tickers}
+        return _as_wide(pd.concat(frames, axis=1) if frames else None, tickers)
+
+    def info(self, ticker):
+        self._call()
+        hist = self._generate(ticker)
+        quote = quote_from_history(hist)
+        quote.update({
+            "symbol": ticker,
+            "previousClose": float(hist["Close"].iloc[-2]),
+            "fiftyDayAverage": float(hist["Close"].iloc[-50:].mean()),
+            "twoHundredDayAverage": float(hist["Close"].iloc[-200:].mean()),
+            "marketCap": int(quote["regularMarketPrice"] * (zlib.crc32(ticker.encode()) % 900 + 100) * 1_000_000),
+            "beta": 1.0,
+        })
+        return quote
+
+    def Ticker(self, ticker):  # Named like yf.Ticker on purpose
+        return SyntheticTicker(self, ticker)
+
+
+class SyntheticTicker:
+    """
+    yf.Ticker look-alike backed by a SyntheticProvider.
+    """
+
+    def __init__(self, provider, ticker):
+        self.provider = provider
+        self.ticker = ticker
+
+    def history(self, period="1mo", interval="1d", start=None, end=None):
+        return self.provider.history(self.ticker, period=period, interval=interval, start=start, end=end)
+
+    @property
+    def info(self):
+        return self.provider.info(self.ticker)
+
+
+# Helper function to build .info-style quote fields from daily bars
+def quote_from_history(hist):
+    if hist.empty:
+        return {}
+    return {
+        "regularMarketPrice": float(hist["Close"].iloc[-1]),
+        "regularMarketVolume": int(hist["Volume"].iloc[-1]),
+        "dayHigh": float(hist["High"].iloc[-1]),
+        "dayLow": float(hist["Low"].iloc[-1]),
+        "fiftyTwoWeekHigh": float(slice_period(hist, "1y")["High"].max()),
+        "fiftyTwoWeekLow": float(slice_period(hist, "1y")["Low"].min()),
+    }
+
+
+def fetch_history_batch(tickers, provider=None, period="1mo", interval="1d", chunk_size=100):
+    """
+    Downloads bars for many tickers in chunked multi-symbol requests and
+    returns one wide frame with (ticker, field) columns.
+    """
+    provider = provider or YFinanceProvider()
+    frames = []
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        data = provider.history_batch(chunk, period=period, interval=interval)
+        if not data.empty:
+            frames.append(data)
+    if not frames:
+        return _as_wide(None, tickers)
+    return pd.concat(frames, axis=1)
@@ -1,14 +1,10 @@
 import yfinance as yf
 import pandas as pd
-
-# Helper function to calculate volatility (ATR)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None  # Return the latest ATR value
+from market_data import YFinanceProvider, fetch_history_batch, quote_from_history, slice_period, ticker_slice
+from instrumentation import InstrumentedProvider, instruments
+from bar_archive import BarArchive
+from intraday_bars import IntradayBars, intraday
+from indicators import calculate_atr
 
 # Function to determine buy, hold, or sell
 def generate_signal(current_price, sma, ema):
@@ -22,51 +18,60 @@ def generate_signal(current_price, sma, ema):
         return "Hold"
 
 # Function to fetch and analyze stock data
-def analyze_stock(ticker, period="1mo"):
+def analyze_stock(ticker, period="1mo", interval="1d"):
     try:
         # Fetch historical data
         stock = yf.Ticker(ticker)
-        hist = stock.history(period=period, interval="1d")
+        if interval == "1d":
+            hist = stock.history(period=period, interval="1d")
+        else:
+            # Intraday bars are resampled from the finest cached interval instead of downloaded per interval
+            hist = intraday.history(ticker, period=period, interval=interval)
         
         if hist.empty:
-            return {"Error": f"No data found for {ticker} in the period {period}"}
-        
-        # Calculate SMA and EMA
-        hist['SMA'] = hist['Close'].rolling(window=14).mean()  # Simple Moving Average
-        hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()  # Exponential Moving Average
-        
-        # Calculate ATR for volatility
-        atr = calculate_atr(hist)
+            return {"Ticker": ticker, "Error": f"No data found for {ticker} in the period {period}"}
 
         # Fetch live data
         live_data = stock.info
-        current_price = live_data.get('regularMarketPrice', live_data.get('ask', 'N/A'))
-        ath = live_data.get('fiftyTwoWeekHigh', 'N/A')
-        atl = live_data.get('fiftyTwoWeekLow', 'N/A')
-        volume = live_data.get('regularMarketVolume', 'N/A')
-
-        # Generate buy/hold/sell signal
-        signal = generate_signal(current_price, hist['SMA'].iloc[-1], hist['EMA'].iloc[-1])
-
-        # Generate insights
-        insights = {
-            "Ticker": ticker,
-            "Current Price": current_price,
-            "SMA": round(hist['SMA'].iloc[-1], 2) if not hist['SMA'].isna().all() else 'N/A',
-            "EMA": round(hist['EMA'].iloc[-1], 2) if not hist['EMA'].isna().all() else 'N/A',
-            "Volatility (ATR)": round(atr, 2) if atr else 'N/A',
-            "52-Week High (ATH)": ath,
-            "52-Week Low (ATL)": atl,
-            "Volume": volume,
-            "Trend": "Bullish" if signal == "Buy" else "Bearish" if signal == "Sell" else "Neutral",
-            "Signal": signal
-        }
-        return insights
+        return analyze_history(ticker, hist, live_data)
     except Exception as e:
-        return {"Error": str(e)}
+        return {"Ticker": ticker, "Error": str(e)}
+
+# Function to turn price history and live quote fields into insights
+def analyze_history(ticker, hist, live_data):
+    # Calculate SMA and EMA without touching the caller's frame
+    close = hist['Close']
+    sma_series = close.rolling(window=14).mean()  # Simple Moving Average
+    ema_series = close.ewm(span=14, adjust=False).mean()  # Exponential Moving Average
+
+    # Calculate ATR for volatility
+    atr = calculate_atr(hist)
+
+    current_price = live_data.get('regularMarketPrice', live_data.get('ask', 'N/A'))
+    ath = live_data.get('fiftyTwoWeekHigh', 'N/A')
+    atl = live_data.get('fiftyTwoWeekLow', 'N/A')
+    volume = live_data.get('regularMarketVolume', 'N/A')
+
+    # Generate buy/hold/sell signal
+    signal = generate_signal(current_price, sma_series.iloc[-1], ema_series.iloc[-1])
+
+    # Generate insights
+    insights = {
+        "Ticker": ticker,
+        "Current Price": current_price,
+        "SMA": round(sma_series.iloc[-1], 2) if not sma_series.isna().all() else 'N/A',
+        "EMA": round(ema_series.iloc[-1], 2) if not ema_series.isna().all() else 'N/A',
+        "Volatility (ATR)": round(atr, 2) if atr else 'N/A',
+        "52-Week High (ATH)": ath,
+        "52-Week Low (ATL)": atl,
+        "Volume": volume,
+        "Trend": "Bullish" if signal == "Buy" else "Bearish" if signal == "Sell" else "Neutral",
+        "Signal": signal
+    }
+    return insights
 
-# Function to scan multiple stocks
-def scan_stocks(tickers):
+# Function to scan multiple stocks one request per ticker
+def scan_stocks_serial(tickers):
     results = []
     for ticker in tickers:
         print(f"Analyzing {ticker}...")
@@ -74,25 +79,92 @@ def scan_stocks(tickers):
         results.append(result)
     return results
 
-# Example usage with a list of tickers
-tickers_to_scan = ['AAPL', 'TSLA', 'MSFT', 'GOOGL']  # Add more tickers here
-analysis_results = scan_stocks(tickers_to_scan)
+# Intraday bar caches kept across scans, keyed on the provider behind them and whether scans are instrumented
+_intraday_caches = {}
 
-# Display results
-for result in analysis_results:
-    if "Error" in result:
-        print(f"Error with {result['Ticker']}: {result['Error']}")
-    else:
-        print("\n=== Stock Analysis ===")
-        for key, value in result.items():
-            print(f"{key}: {value}")
-
-# Best actionable signal (if needed for priority)
-buy_signals = [stock for stock in analysis_results if stock.get("Signal") == "Buy"]
-if buy_signals:
-    best_pick = max(buy_signals, key=lambda x: x.get("Volume", 0))  # Prioritize by volume
-    print("\n=== Recommended Stock to Trade ===")
-    for key, value in best_pick.items():
-        print(f"{key}: {value}")
-else:
-    print("\nNo strong Buy signals found in the current scan.")
+# Helper function to find the long-lived intraday cache for a scan's provider
+def intraday_cache(provider=None):
+    if isinstance(provider, BarArchive):
+        provider = provider.upstream  # The archive only holds daily bars
+    if provider is None and not instruments.enabled:
+        return intraday  # Shared with analyze_stock
+    key = (provider, instruments.enabled)
+    if key not in _intraday_caches:
+        source = provider or YFinanceProvider()
+        if instruments.enabled:
+            source = InstrumentedProvider(source, instruments)  # Intraday downloads show up in the scan metrics
+        _intraday_caches.setdefault(key, IntradayBars(source))
+    return _intraday_caches[key]
+
+# Function to scan multiple stocks from chunked multi-ticker downloads
+def scan_stocks(tickers, provider=None, period="1mo", chunk_size=100, interval="1d"):
+    """
+    Pulls a year of bars for every ticker in a few batched requests, reads the
+    live quote fields off the latest bar and runs the analysis on the last
+    `period` of each ticker's slice, so no per-ticker .info call is needed.
+    Intraday intervals are analyzed on bars from the provider's intraday
+    cache, which is kept between scans; a BarArchive's intraday bars come
+    from its upstream provider.
+    """
+    with instruments.run("scan_stocks"):
+        bars_cache = intraday_cache(provider) if interval != "1d" else None
+        if instruments.enabled:
+            provider = InstrumentedProvider(provider or YFinanceProvider(), instruments)
+        with instruments.stage("fetch"):
+            wide = fetch_history_batch(tickers, provider=provider, period="1y", chunk_size=chunk_size)
+            if interval != "1d":
+                bars = fetch_history_batch(tickers, provider=bars_cache, period=period, interval=interval,
+                                           chunk_size=chunk_size)
+        results = []
+        for ticker in tickers:
+            print(f"Analyzing {ticker}...")
+            year = ticker_slice(wide, ticker)
+            hist = slice_period(year, period) if interval == "1d" else ticker_slice(bars, ticker)
+            if year.empty or hist.empty:
+                instruments.count("no_data")
+                results.append({"Ticker": ticker, "Error": f"No data found for {ticker} in the period {period}"})
+                continue
+            quote = quote_from_history(year)
+            if interval != "1d":
+                quote["regularMarketPrice"] = float(hist["Close"].iloc[-1])  # Latest intraday close
+            try:
+                with instruments.stage("compute"):
+                    results.append(analyze_history(ticker, hist, quote))
+            except Exception as e:
+                instruments.count("errors")
+                results.append({"Ticker": ticker, "Error": str(e)})
+    return results
+
+# Main function
+def main():
+    # Example usage with a list of tickers
+    tickers_to_scan = ['AAPL', 'TSLA', 'MSFT', 'GOOGL']  # Add more tickers here
+    # History comes from the local bar archive; only missing or stale tickers are downloaded
+    archive = BarArchive(upstream=YFinanceProvider())
+    analysis_results = scan_stocks(tickers_to_scan, provider=archive)
+
+    with instruments.stage("render"):
+        # Display results
+        for result in analysis_results:
+            if "Error" in result:
+                print(f"Error with {result['Ticker']}: {result['Error']}")
+            else:
+                print("\n=== Stock Analysis ===")
+                for key, value in result.items():
+                    print(f"{key}: {value}")
+
+        # Best actionable signal (if needed for priority)
+        buy_signals = [stock for stock in analysis_results if stock.get("Signal") == "Buy"]
+        if buy_signals:
+            best_pick = max(buy_signals, key=lambda x: x.get("Volume", 0))  # Prioritize by volume
+            print("\n=== Recommended Stock to Trade ===")
+            for key, value in best_pick.items():
+                print(f"{key}: {value}")
+        else:
+            print("\nNo strong Buy signals found in the current scan.")
+
+    instruments.report()
+
+# Run the app
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from market_data import PRICE_FIELDS, YFinanceProvider, _to_tz, period_start
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ohlcv_cache")
+
+# How long stored bars are served before the newest bars are topped up (seconds)
+DEFAULT_TTLS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "1h": 3600,
+    "1d": 3600,
+    "1wk": 6 * 3600,
+    "1mo": 24 * 3600,
+}
+
+
+class OHLCVCache:
+    """
+    On-disk bar cache with one columnar .npz file per ticker and interval.
+    Fresh files are served as-is, stale ones only download the bars after
+    the last stored one, and the least recently used files are evicted once
+    the cache grows past max_bytes. It has the same history/history_batch/info
+    methods as the providers, so it can stand in for one anywhere.
+    """
+
+    def __init__(self, provider=None, directory=CACHE_DIR, ttls=None, max_bytes=512 * 1024 * 1024):
+        self.provider = provider or YFinanceProvider()
+        self.directory = directory
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.top_ups = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._files = {}  # path -> [size, last access]
+        self._load_file_table()
+
+    def _load_file_table(self):
+        if not os.path.isdir(self.directory):
+            return
+        for interval in os.listdir(self.directory):
+            folder = os.path.join(self.directory, interval)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith(".npz"):
+                    path = os.path.join(folder, name)
+                    stat = os.stat(path)
+                    self._files[path] = [stat.st_size, stat.st_mtime]
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.directory, interval, f"{ticker}.npz")
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return None, None
+        try:
+            with np.load(path) as stored:
+                index = pd.to_datetime(stored["index"], utc=True).tz_convert(str(stored["tz"]))
+                hist = pd.DataFrame({field: stored[field] for field in PRICE_FIELDS}, index=index)
+                meta = {"fetched_at": float(stored["fetched_at"]), "covered_from": int(stored["covered_from"])}
+        except Exception:
+            return None, None  # Treat unreadable files as missing
+        hist.index.name = "Date"
+        return hist, meta
+
+    def _write(self, path, hist, covered_from):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        index = hist.index if hist.index.tz is not None else _to_tz(hist.index)  # Naive daily bars are exchange days
+        columns = {field: hist[field].to_numpy(dtype=np.float64) for field in PRICE_FIELDS}
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                index=index.tz_convert("UTC").asi8,
+                tz=np.array(str(index.tz)),
+                fetched_at=np.array(time.time()),
+                covered_from=np.array(covered_from, dtype=np.int64),
+                **columns,
+            )
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._files[path] = [os.path.getsize(path), time.time()]
+        self._evict(keep=path)
+
+    def _touch(self, path):
+        with self._lock:
+            if path in self._files:
+                self._files[path][1] = time.time()
+
+    def _evict(self, keep=None):
+        with self._lock:
+            total = sum(size for size, _ in self._files.values())
+            if total <= self.max_bytes:
+                return
+            # Oldest access first
+            for path, (size, _) in sorted(self._files.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                del self._files[path]
+                total -= size
+                self.evictions += 1
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    # Decide how a stored file can answer a request: "hit", "top_up" or "miss"
+    def _plan(self, stored, meta, period, start, interval):
+        if stored is None or stored.empty:
+            return "miss"
+        if meta["covered_from"] > self._wanted_from(stored, period, start):
+            return "miss"
+        if time.time() - meta["fetched_at"] < self.ttls.get(interval, 3600):
+            return "hit"
+        return "top_up"
+
+    # First bar (as UTC nanoseconds) a request needs; periods count back from the newest bar
+    @staticmethod
+    def _wanted_from(hist, period, start):
+        if start is not None:
+            ts = pd.Timestamp(start)
+            ts = ts.tz_localize(hist.index.tz if len(hist) else "UTC") if ts.tz is None else ts
+            return ts.value
+        first = period_start(period, hist.index[-1]) if len(hist) else None
+        return np.iinfo(np.int64).min if first is None else first.value
+
+    @staticmethod
+    def _merge(stored, fresh):
+        fresh = fresh[[field for field in PRICE_FIELDS if field in fresh.columns]].dropna(how="all")
+        if stored is None or stored.empty:
+            if fresh.index.tz is None and len(fresh):
+                fresh.index = _to_tz(fresh.index)  # Naive daily bars are New York days, not UTC midnights
+            return fresh
+        if fresh.empty:
+            return stored
+        if fresh.index.tz != stored.index.tz:
+            fresh.index = _to_tz(fresh.index, stored.index.tz)
+        merged = pd.concat([stored, fresh])
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    def _serve(self, hist, period, start, end):
+        if hist.empty:
+            return hist
+        if start is not None:
+            hist = hist[hist.index.asi8 >= self._wanted_from(hist, period, start)]
+        elif period != "max":
+            hist = hist[hist.index.asi8 > self._wanted_from(hist, period, start)]
+        if end is not None:
+            ts = pd.Timestamp(end)
+            hist = hist[hist.index < (ts.tz_localize(hist.index.tz) if ts.tz is None else ts)]
+        return hist
+
+    # Store fetched bars; a miss records how far back the file now reaches
+    def _store(self, ticker, interval, stored, meta, fresh, period, start):
+        hist = self._merge(stored, fresh)
+        if hist.empty:
+            return hist
+        covered_from = meta["covered_from"] if meta else self._wanted_from(hist, period, start)
+        self._write(self._path(ticker, interval), hist, covered_from)
+        return hist
+
+    def history(self, ticker, period="1mo", interval="1d", start=None, end=None):
+        path = self._path(ticker, interval)
+        stored, meta = self._read(path)
+        plan = self._plan(stored, meta, period, start, interval)
+
+        if plan == "hit":
+            self._count("hits")
+            self._touch(path)
+            return self._serve(stored, period, start, end)
+
+        if plan == "top_up":
+            self._count("top_ups")
+            # Re-fetch the last stored bar too, it may have been incomplete
+            fresh = self.provider.history(ticker, interval=interval, start=stored.index[-1].date())
+        else:
+            self._count("misses")
+            fresh = self.provider.history(ticker, period=period, interval=interval, start=start)
+            stored, meta = None, None
+
+        hist = self._store(ticker, interval, stored, meta, fresh, period, start)
+        return self._serve(hist, period, start, end)
+
+    def history_batch(self, tickers, period="1mo", interval="1d", start=None, end=None):
+        """
+        Serves fresh tickers from disk and groups the rest into as few
+        multi-ticker provider requests as possible.
+        """
+        frames = {}
+        misses = []
+        top_ups = {}  # first day to re-fetch -> tickers
+        stale = {}
+
+        for ticker in tickers:
+            path = self._path(ticker, interval)
+            stored, meta = self._read(path)
+            plan = self._plan(stored, meta, period, start, interval)
+            if plan == "hit":
+                self._count("hits")
+                self._touch(path)
+                frames[ticker] = self._serve(stored, period, start, end)
+            elif plan == "top_up":
+                self._count("top_ups")
+                stale[ticker] = (stored, meta)
+                top_ups.setdefault(stored.index[-1].date(), []).append(ticker)
+            else:
+                self._count("misses")
+                misses.append(ticker)
+
+        requests = [(misses, {"period": period, "start": start})] if misses else []
+        requests += [(group, {"start": day}) for day, group in top_ups.items()]
+        for group, kwargs in requests:
+            wide = self.provider.history_batch(group, interval=interval, **kwargs)
+            fetched = set(wide.columns.get_level_values(0))
+            for ticker in group:
+                fresh = wide[ticker] if ticker in fetched else pd.DataFrame(columns=PRICE_FIELDS)
+                stored, meta = stale.get(ticker, (None, None))
+                hist = self._store(ticker, interval, stored, meta, fresh, period, start)
+                if not hist.empty:
+                    frames[ticker] = self._serve(hist, period, start, end)
+
+        if not frames:
+            return pd.DataFrame(columns=pd.MultiIndex.from_tuples([], names=["Ticker", "Price"]))
+        wide = pd.concat(frames, axis=1)
+        wide.columns = wide.columns.set_names(["Ticker", "Price"])
+        return wide
+
+    def info(self, ticker):
+        return self.provider.info(ticker)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.top_ups
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "top_ups": self.top_ups,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "files": len(self._files),
+                "bytes": sum(size for size, _ in self._files.values()),
+            }
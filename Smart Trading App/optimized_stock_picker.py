@@ -1,80 +1,83 @@
 import yfinance as yf
 import random
+from indicators import calculate_atr
+from screening_pipeline import ScreeningPipeline
+from speculative_search import first_qualifying
 
 # Define a smaller, predefined list of potential penny stocks
 PENNY_STOCKS = ['AMC', 'BB', 'NOK', 'SNDL', 'PLTR', 'AAL', 'CCL', 'F', 'UAL', 'GME']
 
-# Helper function to calculate ATR (volatility)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None
-
-# Analyze one stock
+# Analyze one stock, checking the cheap quote filters before downloading history
 def analyze_stock(ticker):
     try:
         stock = yf.Ticker(ticker)
         live_data = stock.info
         current_price = live_data.get('regularMarketPrice', 0)
+        volume = live_data.get('regularMarketVolume', 0)
 
         # Validate basic criteria before proceeding
         if current_price > 5 or current_price <= 0:  # Skip invalid stocks
             return None
+        if volume < 1000000:  # Skip low-volume stocks
+            return None
 
         # Fetch historical data for further analysis
         hist = stock.history(period="1mo", interval="1d")
         if hist.empty:
             return None
 
-        # Calculate SMA, EMA, ATR
-        hist['SMA'] = hist['Close'].rolling(window=14).mean()
-        hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()
-        atr = calculate_atr(hist)
-
-        volume = live_data.get('regularMarketVolume', 0)
-        if volume < 1000000:  # Skip low-volume stocks
-            return None
+        return analyze_history(ticker, hist, {"Price": current_price, "Volume": volume})
+    except Exception as e:
+        print(f"Error analyzing {ticker}: {e}")
+        return None
 
-        sma = hist['SMA'].iloc[-1]
-        ema = hist['EMA'].iloc[-1]
+# Turn a stock's history and quote into a recommendation, or None if it has no upside
+def analyze_history(ticker, hist, quote):
+    current_price, volume = quote["Price"], quote["Volume"]
 
-        # Calculate potential profit
-        target_price = max(sma, ema)
-        potential_profit = round(target_price - current_price, 2)
+    # Calculate SMA, EMA, ATR
+    sma = hist['Close'].rolling(window=14).mean().iloc[-1]
+    ema = hist['Close'].ewm(span=14, adjust=False).mean().iloc[-1]
+    atr = calculate_atr(hist)
 
-        if potential_profit <= 0:  # Skip stocks with no profit potential
-            return None
+    # Calculate potential profit
+    target_price = max(sma, ema)
+    potential_profit = round(target_price - current_price, 2)
 
-        return {
-            "Ticker": ticker,
-            "Current Price": current_price,
-            "SMA": round(sma, 2),
-            "EMA": round(ema, 2),
-            "ATR (Volatility)": round(atr, 2) if atr else 'N/A',
-            "Volume": volume,
-            "Signal": "Buy",
-            "Target Price": round(target_price, 2),
-            "Potential Profit": f"${potential_profit} per share"
-        }
-    except Exception as e:
-        print(f"Error analyzing {ticker}: {e}")
+    if potential_profit <= 0:  # Skip stocks with no profit potential
         return None
 
+    return {
+        "Ticker": ticker,
+        "Current Price": current_price,
+        "SMA": round(sma, 2),
+        "EMA": round(ema, 2),
+        "ATR (Volatility)": round(atr, 2) if atr else 'N/A',
+        "Volume": volume,
+        "Signal": "Buy",
+        "Target Price": round(target_price, 2),
+        "Potential Profit": f"${potential_profit} per share"
+    }
+
 # Main function to pick one stock
 def main():
-    random.shuffle(PENNY_STOCKS)  # Shuffle to randomize the selection
+    # Price and volume are screened in bulk; history is only fetched for the survivors
+    pipeline = ScreeningPipeline(max_price=5, min_volume=1000000)
+    try:
+        results = pipeline.run(PENNY_STOCKS, analyze_history)
+        pipeline.print_stats()
+    except Exception as e:
+        print(f"Screening failed, probing the stocks directly: {e}")
+        # Several shuffled stocks are probed at once; the first valid one in shuffled order wins
+        search = first_qualifying(PENNY_STOCKS, analyze_stock, workers=4)
+        results = [search["Result"]] if search["Result"] is not None else []
 
-    for ticker in PENNY_STOCKS:
-        print(f"Analyzing {ticker}...")
-        result = analyze_stock(ticker)
-        if result:  # Stop at the first valid stock
-            print("\n=== Recommended Stock to Trade ===")
-            for key, value in result.items():
-                print(f"{key}: {value}")
-            return
+    if results:
+        result = random.choice(results)
+        print("\n=== Recommended Stock to Trade ===")
+        for key, value in result.items():
+            print(f"{key}: {value}")
+        return
 
     print("No strong Buy signals found among the selected stocks.")
 
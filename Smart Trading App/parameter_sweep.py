@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import hashlib
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest import PriceArrays, signals, simulate_trades, summarize
+
+# Sweeps the hard-coded strategy settings (indicator window, volume and
+# profit filters, take-profit and stop-loss levels) through backtest.py on
+# a process pool. Price arrays are placed in shared memory once and every
+# worker maps them instead of receiving its own pickled copy.
+
+DEFAULT_GRID = {
+    "rule": ["trend", "rsi"],
+    "window": [10, 14, 20, 30],
+    "min_volume": [0, 500_000, 1_000_000, 2_000_000],
+    "min_profit": [0.05, 0.5, 1.0, 2.0],
+    "profit_target": [5, 10, 15, 20],
+    "stop_loss": [5, 10, 15],
+}
+SIGNAL_PARAMS = ("rule", "window", "min_volume", "min_profit")
+RESULT_FIELDS = ("Trades", "Win Rate %", "Avg Trade %", "Portfolio Return %", "Profit Factor")
+CHECKPOINT_PATH = "sweep_checkpoint.jsonl"
+RESULTS_PATH = "sweep_results.csv"
+
+
+# Every combination in the grid; combinations sharing signal settings are kept together
+def grid_params(grid=DEFAULT_GRID):
+    keys = list(SIGNAL_PARAMS) + [key for key in grid if key not in SIGNAL_PARAMS]
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+# A seeded random sample of the grid, for when the full grid is too large
+def random_params(grid=DEFAULT_GRID, samples=100, seed=0):
+    combos = grid_params(grid)
+    picked = random.Random(seed).sample(combos, min(samples, len(combos)))
+    return sorted(picked, key=lambda params: [str(params[key]) for key in SIGNAL_PARAMS])
+
+# Helper function to give a parameter set a stable key for checkpoints
+def params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+# Helper function to identify the price data a checkpoint was computed on
+def prices_fingerprint(prices):
+    digest = hashlib.sha1()
+    digest.update(json.dumps([list(prices.tickers), list(prices.close.shape)]).encode())
+    digest.update(pd.DatetimeIndex(prices.dates).asi8.tobytes())
+    digest.update(np.ascontiguousarray(prices.close).tobytes())
+    return digest.hexdigest()
+
+
+class SharedPrices:
+    """
+    Copies PriceArrays into one shared memory block (fields x tickers x bars)
+    that worker processes attach to by name.
+    """
+
+    FIELDS = ("open", "high", "low", "close", "volume")
+
+    def __init__(self, prices):
+        stacked = np.stack([getattr(prices, field) for field in self.FIELDS])
+        self.shape = stacked.shape
+        self.block = shared_memory.SharedMemory(create=True, size=stacked.nbytes)
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.block.buf)[:] = stacked
+        self.tickers = list(prices.tickers)
+        self.dates = prices.dates
+
+    def handle(self):
+        return self.block.name, self.shape, self.tickers, self.dates
+
+    def close(self):
+        self.block.close()
+        self.block.unlink()
+
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+def _init_worker(handle):
+    name, shape, tickers, dates = handle
+    block = shared_memory.SharedMemory(name=name)
+    stacked = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+    _worker["block"] = block  # Keep the mapping alive for the life of the worker
+    _worker["prices"] = PriceArrays(tickers, dates, *stacked)
+    _worker["signals"] = (None, None)
+
+def evaluate(params):
+    """
+    Backtests one parameter set in a worker and returns its summary.
+    """
+    prices = _worker["prices"]
+    signal_key = tuple(params[key] for key in SIGNAL_PARAMS)
+    # Neighbouring tasks usually share signal settings, so reuse the last masks
+    if _worker["signals"][0] != signal_key:
+        _worker["signals"] = (signal_key, signals(prices, params["rule"], params["window"],
+                                                  params["min_volume"], params["min_profit"]))
+    buy, sell = _worker["signals"][1]
+    trades = simulate_trades(prices, buy, sell, params["profit_target"], params["stop_loss"])
+    _, portfolio = summarize(trades, prices.tickers)
+    return {"Params": params, **{field: portfolio[field] for field in RESULT_FIELDS}}
+
+# Helper function to read results already saved by an interrupted run on the same prices
+def load_checkpoint(path=CHECKPOINT_PATH, fingerprint=None):
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if header.get("Prices") != fingerprint:
+                print(f"{path} was written for other price data, starting over")
+                return done
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue  # Partly written last line
+                done[params_key(result["Params"])] = result
+    return done
+
+def sweep(prices, params_list, workers=None, checkpoint=CHECKPOINT_PATH, chunk_size=4):
+    """
+    Evaluates every parameter set on a process pool and returns their
+    results in the order of `params_list`. Each result is appended to
+    `checkpoint` as it finishes, and sets already in the checkpoint are
+    skipped, so an interrupted sweep picks up where it stopped. The
+    checkpoint records a fingerprint of `prices` and is started over when
+    the prices differ.
+    """
+    fingerprint = prices_fingerprint(prices)
+    done = load_checkpoint(checkpoint, fingerprint) if checkpoint else {}
+    todo = [params for params in params_list if params_key(params) not in done]
+    print(f"{len(params_list)} parameter sets, {len(params_list) - len(todo)} already done")
+    if not todo:
+        return [done[params_key(params)] for params in params_list]
+
+    shared = SharedPrices(prices)
+    # Nothing usable in the checkpoint: start it over under this fingerprint
+    out = open(checkpoint, "a" if done else "w") if checkpoint else None
+    if out and not done:
+        out.write(json.dumps({"Prices": fingerprint}) + "\n")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.handle(),)) as pool:
+            # Small batches of neighbouring sets keep signal reuse high and IPC low
+            batches = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+            futures = [pool.submit(_evaluate_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                for result in future.result():
+                    done[params_key(result["Params"])] = result
+                    if out:
+                        out.write(json.dumps(result) + "\n")
+                if out:
+                    out.flush()
+    finally:
+        if out:
+            out.close()
+        shared.close()
+    return [done[params_key(params)] for params in params_list]
+
+def _evaluate_batch(batch):
+    return [evaluate(params) for params in batch]
+
+def rank_results(results, rank_by="Portfolio Return %", min_trades=1):
+    """
+    Flattens results into one DataFrame sorted best first.
+    """
+    rows = [{**result["Params"], **{field: result[field] for field in RESULT_FIELDS}}
+            for result in results if result["Trades"] >= min_trades]
+    ranked = pd.DataFrame(rows)
+    if ranked.empty:
+        return ranked
+    return ranked.sort_values(rank_by, ascending=False, ignore_index=True)
+
+# Writes the ranked table with rounded floats to keep the file small
+def save_results(ranked, path=RESULTS_PATH):
+    ranked.round(3).to_csv(path, index_label="Rank")
+    print(f"Ranked results saved to {path}!")
+
+def main():
+    from backtest import load_prices
+    from ticker_universe import universe
+
+    tickers = universe.symbols("sp500")
+    print(f"Downloading 5 years of daily bars for {len(tickers)} S&P 500 tickers...")
+    prices = load_prices(tickers, period="5y")
+
+    start = time.perf_counter()
+    results = sweep(prices, grid_params(), workers=os.cpu_count())
+    print(f"Sweep finished in {time.perf_counter() - start:.1f} s on {os.cpu_count()} cores")
+
+    ranked = rank_results(results)
+    save_results(ranked)
+    print(ranked.head(10).to_string())
+
+if __name__ == "__main__":
+    main()
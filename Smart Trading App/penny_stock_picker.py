@@ -1,22 +1,26 @@
 import yfinance as yf
 import pandas as pd
+from indicators import calculate_atr
+from instrumentation import instruments
+from intraday_bars import intraday
+from price_index import price_index
+from ticker_universe import universe
+
+# Function to get random stocks under $5 from the NASDAQ price index
+def get_penny_stocks(limit=10, min_volume=1000000):
+    try:
+        price_index.refresh_if_stale(universe.symbols("nasdaq"))
+        picks = price_index.sample(limit, max_price=5, min_volume=min_volume)
+        if picks:
+            return [pick["Ticker"] for pick in picks]
+    except Exception as e:
+        print(f"Price index unavailable, using the default list: {e}")
 
-# Function to get random stocks under $5 using Yahoo Finance's stock screener
-def get_penny_stocks():
     penny_stocks = [
         'AMC', 'BB', 'CCL', 'F', 'GME', 'NOK', 'SNDL', 'PLTR', 'AAL', 'UAL'
     ]
     return penny_stocks
 
-# Helper function to calculate volatility (ATR)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None
-
 # Function to determine buy, hold, or sell
 def generate_signal(current_price, sma, ema):
     if current_price < ema:
@@ -35,20 +39,27 @@ def calculate_potential_profit(current_price, sma, ema):
     return target_price, potential_profit
 
 # Function to fetch and analyze stock data
-def analyze_stock(ticker, period="1mo", min_volume=1000000):
+def analyze_stock(ticker, period="1mo", min_volume=1000000, interval="1d"):
     try:
         stock = yf.Ticker(ticker)
-        hist = stock.history(period=period, interval="1d")
+        with instruments.stage("fetch.history"):
+            if interval == "1d":
+                hist = stock.history(period=period, interval="1d")
+            else:
+                # Intraday bars are resampled from the finest cached interval instead of downloaded per interval
+                hist = intraday.history(ticker, period=period, interval=interval)
         if hist.empty:
             return None
 
         # Calculate SMA, EMA, ATR
-        hist['SMA'] = hist['Close'].rolling(window=14).mean()
-        hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()
-        atr = calculate_atr(hist)
+        with instruments.stage("compute.indicators"):
+            hist['SMA'] = hist['Close'].rolling(window=14).mean()
+            hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()
+            atr = calculate_atr(hist)
 
         # Fetch live data
-        live_data = stock.info
+        with instruments.stage("fetch.info"):
+            live_data = stock.info
         current_price = live_data.get('regularMarketPrice', live_data.get('ask', 0))
         if current_price > 5:  # Skip stocks above $5
             return None
@@ -82,27 +93,34 @@ def analyze_stock(ticker, period="1mo", min_volume=1000000):
 
 # Function to pick the best stock
 def pick_best_stock():
-    tickers = get_penny_stocks()
-    best_stock = None
-
-    for ticker in tickers:
-        print(f"Analyzing {ticker}...")
-        result = analyze_stock(ticker)
-        if result and result["Signal"] == "Buy":  # Prioritize Buy signals
-            if not best_stock or result["Potential Profit"] > best_stock["Potential Profit"]:  # Compare by profit
-                best_stock = result
+    with instruments.run("pick_best_stock"):
+        with instruments.stage("screen"):
+            tickers = get_penny_stocks()
+        best_stock = None
+
+        for ticker in tickers:
+            print(f"Analyzing {ticker}...")
+            result = analyze_stock(ticker)
+            if result is None:
+                instruments.count("rejected")
+            elif result["Signal"] == "Buy":  # Prioritize Buy signals
+                if not best_stock or result["Potential Profit"] > best_stock["Potential Profit"]:  # Compare by profit
+                    best_stock = result
 
     return best_stock
 
 # Main function
 def main():
     best_stock = pick_best_stock()
-    if best_stock:
-        print("\n=== Recommended Stock to Trade ===")
-        for key, value in best_stock.items():
-            print(f"{key}: {value}")
-    else:
-        print("No strong Buy signals found among penny stocks.")
+    with instruments.stage("render"):
+        if best_stock:
+            print("\n=== Recommended Stock to Trade ===")
+            for key, value in best_stock.items():
+                print(f"{key}: {value}")
+        else:
+            print("No strong Buy signals found among penny stocks.")
+
+    instruments.report()
 
 # Run the app
 if __name__ == "__main__":
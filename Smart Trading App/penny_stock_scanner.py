@@ -1,5 +1,7 @@
 import yfinance as yf
 import pandas as pd
+from indicators import calculate_atr
+from instrumentation import instruments
 
 # Function to get random stocks under $5 using Yahoo Finance's stock screener
 def get_penny_stocks():
@@ -9,15 +11,6 @@ def get_penny_stocks():
     ]
     return penny_stocks
 
-# Helper function to calculate volatility (ATR)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None  # Return the latest ATR value
-
 # Function to determine buy, hold, or sell
 def generate_signal(current_price, sma, ema):
     if current_price < ema:
@@ -34,20 +27,23 @@ def analyze_stock(ticker, period="1mo"):
     try:
         # Fetch historical data
         stock = yf.Ticker(ticker)
-        hist = stock.history(period=period, interval="1d")
+        with instruments.stage("fetch.history"):
+            hist = stock.history(period=period, interval="1d")
         
         if hist.empty:
             return {"Error": f"No data found for {ticker} in the period {period}"}
         
-        # Calculate SMA and EMA
-        hist['SMA'] = hist['Close'].rolling(window=14).mean()  # Simple Moving Average
-        hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()  # Exponential Moving Average
-        
-        # Calculate ATR for volatility
-        atr = calculate_atr(hist)
+        with instruments.stage("compute.indicators"):
+            # Calculate SMA and EMA
+            hist['SMA'] = hist['Close'].rolling(window=14).mean()  # Simple Moving Average
+            hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()  # Exponential Moving Average
+
+            # Calculate ATR for volatility
+            atr = calculate_atr(hist)
 
         # Fetch live data
-        live_data = stock.info
+        with instruments.stage("fetch.info"):
+            live_data = stock.info
         current_price = live_data.get('regularMarketPrice', live_data.get('ask', 'N/A'))
         ath = live_data.get('fiftyTwoWeekHigh', 'N/A')
         atl = live_data.get('fiftyTwoWeekLow', 'N/A')
@@ -75,32 +71,38 @@ def analyze_stock(ticker, period="1mo"):
 
 # Function to scan stocks under $5
 def scan_penny_stocks():
-    tickers = get_penny_stocks()
-    results = []
-    for ticker in tickers:
-        print(f"Analyzing {ticker}...")
-        result = analyze_stock(ticker)
-        results.append(result)
+    with instruments.run("scan_penny_stocks"):
+        tickers = get_penny_stocks()
+        results = []
+        for ticker in tickers:
+            print(f"Analyzing {ticker}...")
+            result = analyze_stock(ticker)
+            if "Error" in result:
+                instruments.count("errors")
+            results.append(result)
     return results
 
 # Analyze penny stocks
 analysis_results = scan_penny_stocks()
 
-# Display results
-for result in analysis_results:
-    if "Error" in result:
-        print(f"Error with {result['Ticker']}: {result['Error']}")
-    else:
-        print("\n=== Stock Analysis ===")
-        for key, value in result.items():
+with instruments.stage("render"):
+    # Display results
+    for result in analysis_results:
+        if "Error" in result:
+            print(f"Error with {result['Ticker']}: {result['Error']}")
+        else:
+            print("\n=== Stock Analysis ===")
+            for key, value in result.items():
+                print(f"{key}: {value}")
+
+    # Best actionable signal (if needed for priority)
+    buy_signals = [stock for stock in analysis_results if stock.get("Signal") == "Buy"]
+    if buy_signals:
+        best_pick = max(buy_signals, key=lambda x: x.get("Volume", 0))  # Prioritize by volume
+        print("\n=== Recommended Stock to Trade ===")
+        for key, value in best_pick.items():
             print(f"{key}: {value}")
+    else:
+        print("\nNo strong Buy signals found in the current scan.")
 
-# Best actionable signal (if needed for priority)
-buy_signals = [stock for stock in analysis_results if stock.get("Signal") == "Buy"]
-if buy_signals:
-    best_pick = max(buy_signals, key=lambda x: x.get("Volume", 0))  # Prioritize by volume
-    print("\n=== Recommended Stock to Trade ===")
-    for key, value in best_pick.items():
-        print(f"{key}: {value}")
-else:
-    print("\nNo strong Buy signals found in the current scan.")
+instruments.report()
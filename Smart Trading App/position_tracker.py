@@ -0,0 +1,126 @@
+import time
+from market_data import YFinanceProvider, _to_tz, fetch_history_batch, ticker_slice
+from streaming_indicators import IndicatorState
+
+
+class Position:
+    """
+    One open position with its sell/stop-loss levels and running indicators.
+    """
+
+    def __init__(self, ticker, buy_price, sell_price, stop_loss, window=14):
+        self.ticker = ticker
+        self.buy_price = buy_price
+        self.sell_price = sell_price
+        self.stop_loss = stop_loss
+        self.state = IndicatorState(window, wilder=True)
+
+    @property
+    def price(self):
+        return self.state.snapshot["Close"] if self.state.snapshot else None
+
+    def check(self):
+        """
+        Returns "Sell", "Stop Loss" or None for the latest price.
+        """
+        price = self.price
+        if price is None:
+            return None
+        if price >= self.sell_price:
+            return "Sell"
+        if price <= self.stop_loss:
+            return "Stop Loss"
+        return None
+
+
+class PositionTracker:
+    """
+    Watches many open positions from one loop. Each poll downloads the last
+    few daily bars for every open ticker in one batched request and feeds
+    only bars newer than the last one seen into O(1) indicator updaters, so
+    nothing is re-read from a year of history. Live quotes can be pushed in
+    between polls with on_quote().
+    """
+
+    def __init__(self, provider=None, window=14, poll_period="5d"):
+        self.provider = provider or YFinanceProvider()
+        self.window = window
+        self.poll_period = poll_period
+        self.positions = {}  # ticker -> Position
+
+    def add(self, ticker, buy_price, sell_price, stop_loss, history=None):
+        """
+        Opens a position. Pass the bars you already have as `history` to
+        warm up the indicators without another download.
+        """
+        position = Position(ticker, buy_price, sell_price, stop_loss, self.window)
+        if history is not None and not history.empty:
+            position.state.seed(history)
+        self.positions[ticker] = position
+        return position
+
+    def _close(self, position, event):
+        del self.positions[position.ticker]
+        result = {
+            "Ticker": position.ticker,
+            "Event": event,
+            "Price": position.price,
+            "Buy Price": position.buy_price,
+            "Return %": (position.price / position.buy_price - 1) * 100,
+        }
+        if event == "Sell":
+            print(f"{position.ticker} hit the sell price of ${position.sell_price:.2f}! Time to sell!")
+        else:
+            print(f"{position.ticker} hit the stop-loss price of ${position.stop_loss:.2f}. Time to exit!")
+        return result
+
+    def on_quote(self, ticker, price):
+        """
+        Applies a live price to an open position; returns the exit event if one fired.
+        """
+        position = self.positions.get(ticker)
+        if position is None or position.state.update_price(price) is None:
+            return None
+        event = position.check()
+        return self._close(position, event) if event else None
+
+    def tick(self):
+        """
+        Polls new bars for every open position and returns the exits that fired.
+        """
+        if not self.positions:
+            return []
+        wide = fetch_history_batch(list(self.positions), provider=self.provider, period=self.poll_period)
+        events = []
+        for ticker, position in list(self.positions.items()):
+            hist = ticker_slice(wide, ticker)
+            if hist.empty:
+                if position.price is None:
+                    print(f"Error: No price data found for {ticker}. Stock may be delisted or inactive.")
+                    del self.positions[ticker]
+                continue
+            pending = position.state.pending
+            if pending is not None:
+                hist.index = _to_tz(hist.index, pending[0].tzinfo)  # Seed history may use another timezone
+                hist = hist[hist.index >= pending[0]]  # Only the forming bar and anything newer
+            position.state.seed(hist)
+            event = position.check()
+            if event:
+                events.append(self._close(position, event))
+        return events
+
+    def run(self, poll_interval=60):
+        """
+        Polls until every position has exited.
+        """
+        while self.positions:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error tracking positions: {e}")
+            if not self.positions:
+                break
+            for position in self.positions.values():
+                if position.price is not None:
+                    print(f"{position.ticker} current price: ${position.price:.2f}. Holding...")
+            time.sleep(poll_interval)
@@ -0,0 +1,152 @@
+import os
+import time
+import numpy as np
+from market_data import fetch_history_batch
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_index.npz")
+
+
+class PriceIndex:
+    """
+    Latest close, volume and recent change for a whole ticker universe,
+    kept sorted by price. "Under $N" questions become a binary search plus
+    a slice instead of one network round trip per ticker.
+    """
+
+    def __init__(self, path=INDEX_PATH, max_age=3600):
+        self.path = path
+        self.max_age = max_age
+        self.tickers = np.array([], dtype=str)
+        self.prices = np.array([], dtype=np.float64)
+        self.volumes = np.array([], dtype=np.int64)
+        self.changes = np.array([], dtype=np.float64)
+        self.updated = np.array([], dtype=np.float64)
+        self.missing = {}  # ticker -> when it last came back without data
+        self._positions = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as stored:
+                self._set(stored["tickers"], stored["prices"], stored["volumes"], stored["changes"], stored["updated"])
+                self.missing = dict(zip(stored["missing"].tolist(), stored["missing_at"].tolist()))
+        except Exception:
+            pass  # A broken index is simply rebuilt on the next refresh
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, tickers=self.tickers, prices=self.prices, volumes=self.volumes,
+                     changes=self.changes, updated=self.updated,
+                     missing=np.array(list(self.missing), dtype=str),
+                     missing_at=np.array(list(self.missing.values()), dtype=np.float64))
+        os.replace(tmp_path, self.path)
+
+    def _set(self, tickers, prices, volumes, changes, updated):
+        order = np.argsort(prices, kind="stable")
+        self.tickers = np.asarray(tickers, dtype=str)[order]
+        self.prices = np.asarray(prices, dtype=np.float64)[order]
+        self.volumes = np.asarray(volumes, dtype=np.int64)[order]
+        self.changes = np.asarray(changes, dtype=np.float64)[order]
+        self.updated = np.asarray(updated, dtype=np.float64)[order]
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers.tolist())}
+
+    def stale_tickers(self, tickers):
+        """
+        Returns the tickers whose entry is missing or older than max_age.
+        """
+        now = time.time()
+        stale = []
+        for ticker in tickers:
+            i = self._positions.get(ticker)
+            if i is not None:
+                if now - self.updated[i] > self.max_age:
+                    stale.append(ticker)
+            elif now - self.missing.get(ticker, 0.0) > self.max_age:
+                stale.append(ticker)
+        return stale
+
+    def refresh(self, tickers, provider=None, chunk_size=200):
+        """
+        Re-prices the given tickers from a few batched 5-day downloads and
+        merges them into the index; other entries are left alone.
+        """
+        tickers = list(tickers)
+        wide = fetch_history_batch(tickers, provider=provider, period="5d", chunk_size=chunk_size)
+        now = time.time()
+        if wide.empty:
+            self.missing.update((ticker, now) for ticker in tickers)
+            self._save()
+            return
+        closes = wide.xs("Close", axis=1, level=1).sort_index()
+        volumes = wide.xs("Volume", axis=1, level=1).sort_index()
+        last_close = closes.ffill().iloc[-1]
+        first_close = closes.bfill().iloc[0]
+        last_volume = volumes.ffill().iloc[-1].reindex(last_close.index)
+        valid = (last_close.notna() & last_volume.notna()).to_numpy()
+
+        fresh = closes.columns.to_numpy(dtype=str)[valid]
+        keep = ~np.isin(self.tickers, fresh)
+        self._set(
+            np.concatenate([self.tickers[keep], fresh]),
+            np.concatenate([self.prices[keep], last_close.to_numpy()[valid]]),
+            np.concatenate([self.volumes[keep], last_volume.to_numpy()[valid]]),
+            np.concatenate([self.changes[keep], (last_close / first_close - 1).to_numpy()[valid]]),
+            np.concatenate([self.updated[keep], np.full(len(fresh), now)]),
+        )
+        found = set(fresh.tolist())
+        for ticker in tickers:
+            if ticker in found:
+                self.missing.pop(ticker, None)
+            else:
+                self.missing[ticker] = now
+        self._save()
+
+    def refresh_if_stale(self, tickers, provider=None):
+        stale = self.stale_tickers(tickers)
+        if stale:
+            self.refresh(stale, provider=provider)
+
+    def _matching(self, max_price=None, min_price=None, min_volume=None, among=None):
+        lo = 0 if min_price is None else np.searchsorted(self.prices, min_price, side="left")
+        hi = len(self.prices) if max_price is None else np.searchsorted(self.prices, max_price, side="right")
+        positions = np.arange(lo, hi)
+        if min_volume is not None:
+            positions = positions[self.volumes[lo:hi] >= min_volume]
+        if among is not None:
+            positions = positions[np.isin(self.tickers[positions], list(among))]
+        return positions
+
+    def _row(self, i):
+        return {
+            "Ticker": str(self.tickers[i]),
+            "Price": float(self.prices[i]),
+            "Volume": int(self.volumes[i]),
+            "Change": float(self.changes[i]),
+        }
+
+    def query(self, max_price=None, min_price=None, min_volume=None, among=None):
+        """
+        Returns every indexed stock in the price range (cheapest first),
+        optionally with a minimum volume or limited to a set of tickers.
+        """
+        return [self._row(i) for i in self._matching(max_price, min_price, min_volume, among)]
+
+    def sample(self, k=1, max_price=None, min_price=None, min_volume=None, among=None, rng=None):
+        """
+        Picks up to k random stocks from the qualifying slice.
+        """
+        positions = self._matching(max_price, min_price, min_volume, among)
+        rng = rng or np.random.default_rng()
+        chosen = rng.choice(positions, size=min(k, len(positions)), replace=False)
+        return [self._row(i) for i in chosen]
+
+    def get(self, ticker):
+        i = self._positions.get(ticker)
+        return None if i is None else self._row(i)
+
+
+# One shared index per process
+price_index = PriceIndex()
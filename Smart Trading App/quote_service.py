@@ -0,0 +1,111 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from market_data import YFinanceProvider
+
+
+class QuoteCache:
+    """
+    Small in-memory cache of .info quotes. Entries expire after `ttl`
+    seconds and the least recently used one is dropped past max_entries.
+    """
+
+    def __init__(self, ttl=15, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # ticker -> (stored at, quote)
+        self._lock = threading.Lock()
+
+    def get(self, ticker):
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[ticker]
+                return None
+            self._entries.move_to_end(ticker)
+            return entry[1]
+
+    def put(self, ticker, quote):
+        with self._lock:
+            self._entries[ticker] = (time.monotonic(), quote)
+            self._entries.move_to_end(ticker)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class QuoteService:
+    """
+    Fetches quotes for the web app. Concurrent requests for the same ticker
+    share one upstream call (the first caller fetches, the rest wait on its
+    future), and results are kept briefly in a QuoteCache. Safe to call
+    from any number of request threads.
+    """
+
+    def __init__(self, provider=None, ttl=15, max_entries=1024, coalesce=True, cache=True, workers=16):
+        self.provider = provider or YFinanceProvider()
+        self.cache = QuoteCache(ttl, max_entries) if cache else None
+        self.coalesce = coalesce
+        self._in_flight = {}  # ticker -> Future
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quote-fetch")
+        self.metrics = {"requests": 0, "cache_hits": 0, "coalesced": 0, "upstream_calls": 0, "errors": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def _fetch(self, ticker):
+        self._count("upstream_calls")
+        try:
+            quote = self.provider.info(ticker)
+            if self.cache:
+                self.cache.put(ticker, quote)  # Cache before releasing the in-flight slot
+            return quote
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            if self.coalesce:
+                with self._lock:
+                    self._in_flight.pop(ticker, None)
+
+    # Returns the quote if cached, otherwise a Future shared by everyone asking right now
+    def _lookup(self, ticker):
+        self._count("requests")
+        if self.cache:
+            quote = self.cache.get(ticker)
+            if quote is not None:
+                self._count("cache_hits")
+                return quote, None
+        if not self.coalesce:
+            return None, self._pool.submit(self._fetch, ticker)
+        with self._lock:
+            future = self._in_flight.get(ticker)
+            if future is not None:
+                self.metrics["coalesced"] += 1
+                return None, future
+            future = Future()
+            self._in_flight[ticker] = future
+        self._pool.submit(self._resolve, future, ticker)
+        return None, future
+
+    def _resolve(self, future, ticker):
+        try:
+            future.set_result(self._fetch(ticker))
+        except Exception as e:
+            future.set_exception(e)
+
+    def get(self, ticker):
+        quote, future = self._lookup(ticker)
+        return quote if future is None else future.result()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics)
+        lookups = stats["requests"] or 1
+        stats["cache_hit_rate"] = round(stats["cache_hits"] / lookups, 3)
+        stats["coalesce_rate"] = round(stats["coalesced"] / lookups, 3)
+        return stats
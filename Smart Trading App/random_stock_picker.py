@@ -1,28 +1,21 @@
 import yfinance as yf
 import random
-import pandas as pd
+from indicators import calculate_atr
+from screening_pipeline import ScreeningPipeline
+from speculative_search import first_qualifying
+from ticker_universe import universe
 
 # Fetch live stock universe dynamically
 def fetch_stock_universe():
     try:
         # Replace with a live stock database or API in the future
-        stock_universe = pd.read_csv('https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv')
-        tickers = stock_universe['Symbol'].tolist()
+        tickers = universe.symbols("sp500")
         random.shuffle(tickers)  # Shuffle for randomness
         return tickers
     except Exception as e:
         print(f"Error fetching stock universe: {e}")
         return []
 
-# Helper function to calculate ATR (volatility)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None
-
 # Generate buy, hold, or sell signals
 def generate_signal(current_price, sma, ema):
     if current_price < ema:
@@ -40,18 +33,10 @@ def calculate_potential_profit(current_price, sma, ema):
     potential_profit = round(target_price - current_price, 2)
     return target_price, potential_profit
 
-# Analyze stock data
+# Analyze stock data, checking the cheap quote filters before downloading history
 def analyze_stock(ticker, period="1mo", min_volume=1000000):
     try:
         stock = yf.Ticker(ticker)
-        hist = stock.history(period=period, interval="1d")
-        if hist.empty:
-            return None
-
-        # Calculate SMA, EMA, ATR
-        hist['SMA'] = hist['Close'].rolling(window=14).mean()
-        hist['EMA'] = hist['Close'].ewm(span=14, adjust=False).mean()
-        atr = calculate_atr(hist)
 
         # Fetch live data
         live_data = stock.info
@@ -63,33 +48,45 @@ def analyze_stock(ticker, period="1mo", min_volume=1000000):
         if volume < min_volume:  # Skip low-volume stocks
             return None
 
-        sma = hist['SMA'].iloc[-1]
-        ema = hist['EMA'].iloc[-1]
-
-        # Generate buy/hold/sell signal
-        signal = generate_signal(current_price, sma, ema)
-
-        # Calculate potential profit
-        target_price, potential_profit = calculate_potential_profit(current_price, sma, ema)
-
-        if potential_profit <= 0:  # Skip stocks with no profit potential
+        hist = stock.history(period=period, interval="1d")
+        if hist.empty:
             return None
 
-        return {
-            "Ticker": ticker,
-            "Current Price": current_price,
-            "SMA": round(sma, 2),
-            "EMA": round(ema, 2),
-            "ATR (Volatility)": round(atr, 2) if atr else 'N/A',
-            "Volume": volume,
-            "Signal": signal,
-            "Target Price": round(target_price, 2),
-            "Potential Profit": f"${potential_profit} per share"
-        }
+        return analyze_history(ticker, hist, {"Price": current_price, "Volume": volume})
     except Exception as e:
         print(f"Error analyzing {ticker}: {e}")
         return None
 
+# Turn a stock's history and quote into a recommendation, or None if it has no upside
+def analyze_history(ticker, hist, quote):
+    current_price, volume = quote["Price"], quote["Volume"]
+
+    # Calculate SMA, EMA, ATR
+    sma = hist['Close'].rolling(window=14).mean().iloc[-1]
+    ema = hist['Close'].ewm(span=14, adjust=False).mean().iloc[-1]
+    atr = calculate_atr(hist)
+
+    # Generate buy/hold/sell signal
+    signal = generate_signal(current_price, sma, ema)
+
+    # Calculate potential profit
+    target_price, potential_profit = calculate_potential_profit(current_price, sma, ema)
+
+    if potential_profit <= 0:  # Skip stocks with no profit potential
+        return None
+
+    return {
+        "Ticker": ticker,
+        "Current Price": current_price,
+        "SMA": round(sma, 2),
+        "EMA": round(ema, 2),
+        "ATR (Volatility)": round(atr, 2) if atr else 'N/A',
+        "Volume": volume,
+        "Signal": signal,
+        "Target Price": round(target_price, 2),
+        "Potential Profit": f"${potential_profit} per share"
+    }
+
 # Main function to pick and recommend one stock
 def main():
     stock_universe = fetch_stock_universe()
@@ -97,14 +94,23 @@ def main():
         print("No stock universe available.")
         return
 
-    # Iterate through shuffled tickers until we find a valid penny stock
-    for ticker in stock_universe:
-        best_stock = analyze_stock(ticker)
-        if best_stock:  # Stop at the first valid recommendation
-            print("\n=== Recommended Stock to Trade ===")
-            for key, value in best_stock.items():
-                print(f"{key}: {value}")
-            return
+    # Screen the whole universe on price and volume first; history only for survivors
+    pipeline = ScreeningPipeline(max_price=5, min_volume=1000000)
+    try:
+        results = pipeline.run(stock_universe, analyze_history)
+        pipeline.print_stats()
+    except Exception as e:
+        print(f"Screening failed, probing stocks directly: {e}")
+        # Several stocks are probed at once; the first valid one in shuffled order wins
+        search = first_qualifying(stock_universe, analyze_stock, shuffle=False)
+        results = [search["Result"]] if search["Result"] is not None else []
+
+    if results:
+        best_stock = random.choice(results)
+        print("\n=== Recommended Stock to Trade ===")
+        for key, value in best_stock.items():
+            print(f"{key}: {value}")
+        return
 
     print("No strong Buy signals found among random stocks.")
 
@@ -0,0 +1,140 @@
+import os
+import time
+import atexit
+import threading
+import datetime
+import numpy as np
+import pandas as pd
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recommendation_log")
+PRICE_COLUMNS = ["Current Price", "Buy Price", "Sell Price", "Stop Loss"]
+
+
+class RecommendationLog:
+    """
+    Buffered, date-partitioned log of stock recommendations. Rows are kept in
+    memory and written as one columnar .npz part file per flush under
+    <directory>/<YYYY-MM-DD>/, so nothing is ever rewritten. A flush happens
+    once max_rows rows are buffered or the oldest one is max_age seconds old,
+    and on exit.
+    """
+
+    def __init__(self, directory=LOG_DIR, max_rows=500, max_age=30):
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._rows = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._parts = 0
+        atexit.register(self.flush)
+
+    def append(self, ticker, current_price, buy_price, sell_price, stop_loss, timestamp=None):
+        row = (timestamp or time.time(), ticker, current_price, buy_price, sell_price, stop_loss)
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.max_rows
+            if len(self._rows) == 1 and not full:
+                # First row in an empty buffer starts the age clock
+                self._timer = threading.Timer(self.max_age, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not rows:
+                return 0
+            self._parts += 1
+            part = self._parts
+        # Rows can span midnight, so split them by day
+        days = {}
+        for row in rows:
+            days.setdefault(_day(row[0]), []).append(row)
+        for day, day_rows in days.items():
+            self._write(day, day_rows, part)
+        return len(rows)
+
+    def _write(self, day, rows, part):
+        folder = os.path.join(self.directory, day)
+        os.makedirs(folder, exist_ok=True)
+        times, tickers, *prices = zip(*rows)
+        columns = {"Time": np.array(times, dtype=np.float64), "Ticker": np.array(tickers, dtype=str)}
+        for name, values in zip(PRICE_COLUMNS, prices):
+            columns[name] = np.array(values, dtype=np.float64)
+        name = f"part-{time.time_ns()}-{os.getpid()}-{part}.npz"
+        tmp = os.path.join(folder, name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp, os.path.join(folder, name))  # Readers never see half-written parts
+
+    def compact(self, day):
+        """
+        Merges one day's part files into a single file.
+        """
+        folder = os.path.join(self.directory, day)
+        parts = sorted(name for name in os.listdir(folder) if name.endswith(".npz"))
+        if len(parts) < 2:
+            return
+        frames = [_load_part(os.path.join(folder, name)) for name in parts]
+        merged = pd.concat(frames, ignore_index=True).sort_values("Time", kind="stable")
+        rows = list(merged[["Time", "Ticker"] + PRICE_COLUMNS].itertuples(index=False, name=None))
+        self._write(day, rows, "compacted")
+        for name in parts:
+            os.remove(os.path.join(folder, name))
+
+
+# Helper function to name the (UTC) day partition a timestamp belongs to
+def _day(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).date().isoformat()
+
+# Helper function to load a part file, optionally only the rows for some tickers
+def _load_part(path, tickers=None):
+    with np.load(path) as part:
+        keep = slice(None)
+        if tickers is not None:
+            keep = np.isin(part["Ticker"], list(tickers))
+            if not keep.any():
+                return None  # Price columns are never read for parts without a match
+        columns = {"Time": part["Time"][keep], "Ticker": part["Ticker"][keep]}
+        for name in PRICE_COLUMNS:
+            columns[name] = part[name][keep]
+    return pd.DataFrame(columns)
+
+def read_recommendations(tickers=None, start=None, end=None, directory=LOG_DIR):
+    """
+    Returns logged recommendations as a DataFrame, optionally only for some
+    tickers and for UTC days between start and end (dates or "YYYY-MM-DD",
+    inclusive). Day folders outside the range are not opened.
+    """
+    columns = ["Time", "Ticker"] + PRICE_COLUMNS
+    if not os.path.isdir(directory):
+        return pd.DataFrame(columns=columns)
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    first = str(start)[:10] if start is not None else None
+    last = str(end)[:10] if end is not None else None
+
+    frames = []
+    for day in sorted(os.listdir(directory)):
+        if (first and day < first) or (last and day > last):
+            continue
+        folder = os.path.join(directory, day)
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".npz"):
+                frame = _load_part(os.path.join(folder, name), tickers)
+                if frame is not None and len(frame):
+                    frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    log = pd.concat(frames, ignore_index=True).sort_values("Time", kind="stable", ignore_index=True)
+    log["Time"] = pd.to_datetime(log["Time"], unit="s", utc=True)
+    return log
+
+# Shared log used by the trading scripts
+recommendation_log = RecommendationLog()
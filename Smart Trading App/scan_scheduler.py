@@ -0,0 +1,130 @@
+import time
+import random
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, time as clock
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = clock(9, 30)
+MARKET_CLOSE = clock(16, 0)
+
+Snapshot = namedtuple("Snapshot", ["version", "value", "published_at"])
+
+
+class RecommendationStore:
+    """
+    Holds the latest published value as one immutable snapshot. Writers
+    swap in a new snapshot under a lock; readers just read the attribute,
+    so the web route never waits on the scanner.
+    """
+
+    def __init__(self, initial=None):
+        self._snapshot = Snapshot(0, initial, time.time())
+        self._write_lock = threading.Lock()
+
+    def publish(self, value):
+        with self._write_lock:
+            self._snapshot = Snapshot(self._snapshot.version + 1, value, time.time())
+            return self._snapshot
+
+    def latest(self):
+        return self._snapshot
+
+
+# Regular NYSE/NASDAQ session, weekdays only (exchange holidays are not tracked)
+def market_is_open(now=None):
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+# Seconds until the next regular session opens
+def seconds_until_open(now=None):
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    opening = now.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0)
+    if now >= opening:
+        opening += timedelta(days=1)
+    while opening.weekday() >= 5:
+        opening += timedelta(days=1)
+    return (opening - now).total_seconds()
+
+
+class ScanScheduler:
+    """
+    Runs scan() on a background thread every `interval` seconds and
+    publishes each result to the store. Outside market hours it sleeps until
+    the open (checking at least every closed_interval seconds). Failed scans
+    back off exponentially with jitter, up to max_backoff. Only one scan
+    runs at a time, even if trigger() is called while one is in flight.
+    """
+
+    def __init__(self, scan, store, interval=300, market_hours_only=True,
+                 closed_interval=1800, retry_after=15, max_backoff=900):
+        self.scan = scan
+        self.store = store
+        self.interval = interval
+        self.market_hours_only = market_hours_only
+        self.closed_interval = closed_interval
+        self.retry_after = retry_after
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.last_error = None
+        self.runs = 0
+        self._in_flight = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """
+        Runs one scan unless another is already in flight. Returns True if
+        a scan ran and succeeded.
+        """
+        if not self._in_flight.acquire(blocking=False):
+            return False
+        try:
+            result = self.scan()
+            self.store.publish(result)
+            self.failures = 0
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"Scan failed ({self.failures} in a row): {e}")
+            return False
+        finally:
+            self.runs += 1
+            self._in_flight.release()
+
+    def next_delay(self):
+        if self.failures:
+            backoff = min(self.max_backoff, self.retry_after * 2 ** (self.failures - 1))
+            return backoff * random.uniform(0.5, 1.5)
+        if self.market_hours_only and not market_is_open():
+            return min(self.closed_interval, max(seconds_until_open(), 1))
+        return self.interval
+
+    def _loop(self):
+        # Always publish one result at startup, even when the market is closed
+        self.run_once()
+        while not self._stop.wait(self.next_delay()):
+            if self.market_hours_only and not market_is_open() and not self.failures:
+                continue
+            self.run_once()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scan-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def trigger(self):
+        """
+        Starts an extra scan right away without waiting for it to finish.
+        """
+        threading.Thread(target=self.run_once, daemon=True).start()
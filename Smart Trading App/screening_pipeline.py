@@ -0,0 +1,124 @@
+import time
+from market_data import YFinanceProvider, fetch_history_batch, ticker_slice
+from price_index import price_index as shared_price_index
+
+
+class _MeteredProvider:
+    """
+    Wraps a provider and adds up the in-memory size of every frame it returns.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.bytes = 0
+
+    def _measure(self, frame):
+        self.bytes += int(frame.memory_usage(deep=True).sum())
+        return frame
+
+    def history(self, ticker, **kwargs):
+        return self._measure(self.provider.history(ticker, **kwargs))
+
+    def history_batch(self, tickers, **kwargs):
+        return self._measure(self.provider.history_batch(tickers, **kwargs))
+
+    def info(self, ticker):
+        return self.provider.info(ticker)
+
+
+class ScreeningPipeline:
+    """
+    Screens a universe in cheapest-first stages:
+      1. Quote    - price/volume limits checked for every ticker against the
+                    bulk-refreshed price index (a few batched 5-day requests)
+      2. History  - one batched history download, only for the survivors
+      3. Analyze  - the caller's analyze(ticker, hist, quote) on each survivor;
+                    it returns a result dict or None to reject
+    stats() reports how many tickers each stage dropped, the bytes of bar
+    data it pulled, and the history bytes the quote stage avoided.
+    """
+
+    def __init__(self, max_price=5, min_price=0, min_volume=1_000_000, period="1mo",
+                 provider=None, index=None):
+        self.max_price = max_price
+        self.min_price = min_price
+        self.min_volume = min_volume
+        self.period = period
+        self.provider = provider or YFinanceProvider()
+        self.index = index or shared_price_index
+        self.stages = []
+
+    def _record(self, stage, tickers_in, tickers_out, fetched, started):
+        self.stages.append({
+            "Stage": stage,
+            "Tickers In": tickers_in,
+            "Tickers Out": tickers_out,
+            "Eliminated": tickers_in - tickers_out,
+            "Bytes Fetched": fetched,
+            "Seconds": round(time.perf_counter() - started, 3),
+        })
+
+    def quote_stage(self, tickers):
+        started = time.perf_counter()
+        metered = _MeteredProvider(self.provider)
+        self.index.refresh_if_stale(tickers, provider=metered)
+        quotes = [quote for quote in self.index.query(self.max_price, min_volume=self.min_volume, among=tickers)
+                  if quote["Price"] > self.min_price]
+        self._record("Quote", len(tickers), len(quotes), metered.bytes, started)
+        return quotes
+
+    def history_stage(self, quotes):
+        started = time.perf_counter()
+        metered = _MeteredProvider(self.provider)
+        tickers = [quote["Ticker"] for quote in quotes]
+        wide = fetch_history_batch(tickers, provider=metered, period=self.period) if tickers else None
+        histories = []
+        for quote in quotes:
+            hist = ticker_slice(wide, quote["Ticker"]) if wide is not None else None
+            if hist is not None and not hist.empty:
+                histories.append((quote, hist))
+        self._record("History", len(quotes), len(histories), metered.bytes, started)
+        return histories
+
+    def analyze_stage(self, histories, analyze):
+        started = time.perf_counter()
+        results = []
+        for quote, hist in histories:
+            try:
+                result = analyze(quote["Ticker"], hist, quote)
+            except Exception as e:
+                print(f"Error analyzing {quote['Ticker']}: {e}")
+                result = None
+            if result:
+                results.append(result)
+        self._record("Analyze", len(histories), len(results), 0, started)
+        return results
+
+    def run(self, tickers, analyze):
+        """
+        Runs every stage over the tickers and returns the analyze() results.
+        """
+        self.stages = []
+        quotes = self.quote_stage(list(tickers))
+        histories = self.history_stage(quotes)
+        return self.analyze_stage(histories, analyze)
+
+    def stats(self):
+        stages = [dict(stage) for stage in self.stages]
+        by_name = {stage["Stage"]: stage for stage in stages}
+        history = by_name.get("History")
+        # Each ticker dropped by the quote stage saved one history download
+        if history and history["Tickers Out"] and "Quote" in by_name:
+            per_ticker = history["Bytes Fetched"] / history["Tickers In"]
+            by_name["Quote"]["Bytes Avoided"] = int(by_name["Quote"]["Eliminated"] * per_ticker)
+        return stages
+
+    def print_stats(self):
+        print("\n=== Screening Stages ===")
+        for stage in self.stats():
+            line = (f"{stage['Stage']:<8} {stage['Tickers In']:>6} in -> {stage['Tickers Out']:>6} out "
+                    f"({stage['Eliminated']} eliminated), {stage['Bytes Fetched'] / 1024:.1f} KB fetched, "
+                    f"{stage['Seconds']:.2f} s")
+            if "Bytes Avoided" in stage:
+                line += f", ~{stage['Bytes Avoided'] / 1024:.1f} KB of history avoided"
+            print(line)
@@ -0,0 +1,73 @@
+import time
+import random
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Parallel version of the pickers' "shuffle, then probe until one qualifies"
+# loop. Up to `workers` candidates are probed at once, ahead of the one the
+# serial loop would be on, and the winner is still the first qualifying
+# ticker in the shuffled order, so a given seed always gives the same pick.
+
+
+# Helper function to give the same order for the same seed (seed=None is random each run)
+def shuffled(items, seed=None):
+    order = list(items)
+    random.Random(seed).shuffle(order)
+    return order
+
+# Helper function so a failed probe counts as a reject, like the serial loops' `continue`
+def _safe_probe(probe, item):
+    try:
+        return probe(item)
+    except Exception:
+        return None
+
+def first_qualifying(items, probe, workers=8, seed=None, shuffle=True):
+    """
+    Shuffles the items with `seed` and returns the earliest one, in that
+    order, for which probe(item) returns something other than None. Once a
+    match is found nothing after it is started and queued probes are cancelled.
+    Returns {"Item", "Result", "Position", "Probed", "Cancelled", "Seconds"};
+    Item and Result are None when nothing qualifies.
+    """
+    started = time.perf_counter()
+    order = shuffled(items, seed) if shuffle else list(items)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative-probe")
+    in_flight = {}  # future -> position in the order
+    best, best_result = None, None
+    next_position = probed = cancelled = 0
+    try:
+        while True:
+            # Keep `workers` probes running, never past the best match so far
+            limit = len(order) if best is None else best
+            while next_position < limit and len(in_flight) < workers:
+                future = pool.submit(_safe_probe, probe, order[next_position])
+                in_flight[future] = next_position
+                next_position += 1
+            if not in_flight:
+                break  # Everything before the winner (or everything) has been checked
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                position = in_flight.pop(future)
+                probed += 1
+                result = future.result()
+                if result is not None and (best is None or position < best):
+                    best, best_result = position, result
+
+            if best is not None:
+                # Later candidates can no longer win
+                for future, position in list(in_flight.items()):
+                    if position > best:
+                        cancelled += future.cancel()
+                        del in_flight[future]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        "Item": order[best] if best is not None else None,
+        "Result": best_result,
+        "Position": best,
+        "Probed": probed,
+        "Cancelled": cancelled,
+        "Seconds": round(time.perf_counter() - started, 3),
+    }
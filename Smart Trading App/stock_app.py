@@ -1,5 +1,8 @@
-import yfinance as yf
-import pandas as pd  # Add this line to fix the issue
+from ohlcv_cache import OHLCVCache
+from ticker_universe import universe
+
+# Bars are kept on disk between runs; only new bars are downloaded
+history_cache = OHLCVCache()
 
 def fetch_stocks_under_5():
     """
@@ -10,16 +13,14 @@ def fetch_stocks_under_5():
 
     # Use a broad dataset of tickers (e.g., NASDAQ-listed stocks)
     try:
-        nasdaq_url = "https://datahub.io/core/nasdaq-listings/r/nasdaq-listed-symbols.csv"
-        tickers = pd.read_csv(nasdaq_url)["Symbol"].tolist()
+        tickers = universe.symbols("nasdaq")
     except Exception as e:
         print(f"Error fetching stock tickers: {e}")
         return
 
     for ticker in tickers:
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="6mo")  # Analyze last 6 months
+            data = history_cache.history(ticker, period="6mo")  # Analyze last 6 months
 
             if data.empty:
                 continue  # Skip stocks with no data
@@ -1,101 +1,77 @@
-import yfinance as yf
-import pandas as pd
-import random
-import time
+from ohlcv_cache import OHLCVCache
+from position_tracker import PositionTracker
+from recommendation_log import recommendation_log
+from speculative_search import first_qualifying
+from ticker_universe import universe
+
+# Bars are kept on disk between runs; only new bars are downloaded
+history_cache = OHLCVCache()
+
+# Open positions are polled together and only new bars are downloaded
+tracker = PositionTracker()
 
 def save_recommendation(ticker, current_price, buy_price, sell_price, stop_loss):
     """
-    Saves the recommended stock and its details to a CSV file.
+    Saves the recommended stock and its details to the recommendation log.
     """
-    data = {
-        "Ticker": [ticker],
-        "Current Price": [current_price],
-        "Buy Price": [buy_price],
-        "Sell Price": [sell_price],
-        "Stop Loss": [stop_loss]
-    }
-    df = pd.DataFrame(data)
-    file_name = "stock_recommendations.csv"
     try:
-        df.to_csv(file_name, mode="a", header=not pd.io.common.file_exists(file_name), index=False)
-        print(f"Recommendation saved to {file_name}!")
+        recommendation_log.append(ticker, current_price, buy_price, sell_price, stop_loss)
+        print("Recommendation saved to the recommendation log!")
     except Exception as e:
         print(f"Error saving recommendation: {e}")
 
-def track_stock_performance(ticker, buy_price, sell_price, stop_loss):
+def track_stock_performance(ticker, buy_price, sell_price, stop_loss, history=None):
     """
     Monitors the stock to check if it hits the sell or stop-loss price.
     """
     print(f"Tracking {ticker}...")
-    stock = yf.Ticker(ticker)
-    while True:
-        try:
-            data = stock.history(period="1y")
-            if data.empty:
-                print(f"Error: No price data found for {ticker}. Stock may be delisted or inactive.")
-                break  # Exit tracking if no data is found
-            
-            current_price = data["Close"].iloc[-1]
+    tracker.add(ticker, buy_price, sell_price, stop_loss, history=history)
+    tracker.run(poll_interval=60)  # Check every minute
 
-            if current_price >= sell_price:
-                print(f"{ticker} hit the sell price of ${sell_price:.2f}! Time to sell!")
-                break
-            elif current_price <= stop_loss:
-                print(f"{ticker} hit the stop-loss price of ${stop_loss:.2f}. Time to exit!")
-                break
-            else:
-                print(f"{ticker} current price: ${current_price:.2f}. Holding...")
-        except Exception as e:
-            print(f"Error tracking {ticker}: {e}")
-            break  # Exit tracking on persistent errors
-        
-        time.sleep(60)  # Check every minute
+# Returns the ticker's bars if it last closed at $5 or less, otherwise None
+def load_if_under_5(ticker, period):
+    data = history_cache.history(ticker, period=period)
+    if data.empty or data["Close"].iloc[-1] > 5:
+        return None
+    return data
 
-def fetch_random_stock_under_5(profit_target=10, stop_loss_percent=10):
+def fetch_random_stock_under_5(profit_target=10, stop_loss_percent=10, seed=None, workers=8):
     """
     Dynamically scans the market for stocks under $5 and recommends a random one.
     """
     print(f"Scanning the market for a random stock under $5 with a {profit_target}% profit target...\n")
 
     try:
-        nasdaq_url = "https://datahub.io/core/nasdaq-listings/r/nasdaq-listed-symbols.csv"
-        tickers = pd.read_csv(nasdaq_url)["Symbol"].tolist()
-        random.shuffle(tickers)  # Shuffle tickers to ensure randomness
+        tickers = universe.symbols("nasdaq")
     except Exception as e:
         print(f"Error fetching stock tickers: {e}")
         return
 
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="1y")
-
-            if data.empty:
-                continue
+    # Probe several shuffled tickers at once; the pick is still the first one under $5 in shuffled order
+    search = first_qualifying(tickers, lambda ticker: load_if_under_5(ticker, "1y"), workers=workers, seed=seed)
+    if search["Item"] is None:
+        print("No stocks under $5 found.")
+        return
 
-            live_price = data["Close"].iloc[-1]
-            if live_price <= 5:
-                recent_low = data["Low"].min()
-                support_level = recent_low + (live_price - recent_low) * 0.2
+    ticker, data = search["Item"], search["Result"]
+    live_price = data["Close"].iloc[-1]
 
-                buy_price = max(live_price, support_level)
-                sell_price = buy_price * (1 + profit_target / 100)
-                stop_loss_price = buy_price * (1 - stop_loss_percent / 100)
+    recent_low = data["Low"].min()
+    support_level = recent_low + (live_price - recent_low) * 0.2
 
-                print(f"Recommended Stock: {ticker}")
-                print(f"Current Price: ${live_price:.2f}")
-                print(f"Historical Support Level: ${support_level:.2f}")
-                print(f"Recommended Buy Price: ${buy_price:.2f}")
-                print(f"Recommended Sell Price: ${sell_price:.2f}")
-                print(f"Stop Loss Price: ${stop_loss_price:.2f}")
+    buy_price = max(live_price, support_level)
+    sell_price = buy_price * (1 + profit_target / 100)
+    stop_loss_price = buy_price * (1 - stop_loss_percent / 100)
 
-                save_recommendation(ticker, live_price, buy_price, sell_price, stop_loss_price)
-                track_stock_performance(ticker, buy_price, sell_price, stop_loss_price)
-                return
-        except Exception as e:
-            continue
+    print(f"Recommended Stock: {ticker}")
+    print(f"Current Price: ${live_price:.2f}")
+    print(f"Historical Support Level: ${support_level:.2f}")
+    print(f"Recommended Buy Price: ${buy_price:.2f}")
+    print(f"Recommended Sell Price: ${sell_price:.2f}")
+    print(f"Stop Loss Price: ${stop_loss_price:.2f}")
 
-    print("No stocks under $5 found.")
+    save_recommendation(ticker, live_price, buy_price, sell_price, stop_loss_price)
+    track_stock_performance(ticker, buy_price, sell_price, stop_loss_price, history=data)
 
 if __name__ == "__main__":
     fetch_random_stock_under_5(profit_target=10, stop_loss_percent=10)
@@ -1,4 +1,4 @@
-import yfinance as yf
+from price_index import price_index
 
 def find_stock(max_price):
     # List of stocks to analyze
@@ -8,30 +8,26 @@ def find_stock(max_price):
 
     print(f"Analyzing stocks under ${max_price}...\n")
 
-    for ticker in stocks:
-        stock = yf.Ticker(ticker)
-        try:
-            # Fetch recent price data
-            data = stock.history(period="5d")
-            live_price = data["Close"].iloc[-1]  # Most recent close price
-            previous_close = data["Close"].iloc[0]  # Oldest close price in the range
+    # Latest prices come from the bulk-refreshed price index
+    try:
+        price_index.refresh_if_stale(stocks)
+    except Exception as e:
+        print(f"Error refreshing prices: {e}")
 
-            if live_price <= max_price:
-                # Calculate potential gain
-                potential_gain = (live_price - previous_close) / previous_close
+    for stock in price_index.query(max_price=max_price, among=stocks):
+        live_price = stock["Price"]  # Most recent close price
+        potential_gain = stock["Change"]  # Change since the oldest close in the last 5 days
 
-                # Find the best stock
-                if potential_gain > highest_potential:
-                    highest_potential = potential_gain
-                    best_stock = {
-                        "ticker": ticker,
-                        "live_price": round(live_price, 2),
-                        "potential_gain": round(potential_gain * 100, 2),
-                        "buy_price": round(live_price, 2),
-                        "sell_price": round(live_price * 1.05, 2),  # Example: 5% target gain
-                    }
-        except Exception as e:
-            print(f"Error fetching {ticker}: {e}")
+        # Find the best stock
+        if potential_gain > highest_potential:
+            highest_potential = potential_gain
+            best_stock = {
+                "ticker": stock["Ticker"],
+                "live_price": round(live_price, 2),
+                "potential_gain": round(potential_gain * 100, 2),
+                "buy_price": round(live_price, 2),
+                "sell_price": round(live_price * 1.05, 2),  # Example: 5% target gain
+            }
 
     # Display recommendation
     if best_stock:
@@ -0,0 +1,235 @@
+import math
+from collections import deque
+
+# Constant-time indicator updaters that give the same values as indicators.py
+# when fed the same bars one at a time. Each has update(), which commits a
+# finished bar, and peek(), which shows the value a still-forming bar would
+# give without changing any state.
+
+NAN = float("nan")
+
+
+class RollingMean:
+    """
+    Mean of the last `window` values; NaN until the window is full.
+    """
+
+    RESYNC_EVERY = 10000  # Re-add the window now and then so float drift can't build up
+
+    def __init__(self, window=14):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._updates = 0
+
+    def _total_with(self, value):
+        oldest = self.values[0] if len(self.values) == self.window else 0.0
+        return self.total - oldest + value
+
+    def peek(self, value):
+        if len(self.values) + 1 < self.window:
+            return NAN
+        return self._total_with(value) / self.window
+
+    def update(self, value):
+        self.total = self._total_with(value)
+        self.values.append(value)
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+        return self.value
+
+    @property
+    def value(self):
+        return self.total / self.window if len(self.values) == self.window else NAN
+
+
+class EMA:
+    """
+    Same as pandas ewm(span=span, adjust=False).mean().
+    """
+
+    def __init__(self, span=14):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def peek(self, value):
+        if math.isnan(self.value):
+            return value
+        return (1 - self.alpha) * self.value + self.alpha * value
+
+    def update(self, value):
+        self.value = self.peek(value)
+        return self.value
+
+
+class ATR:
+    """
+    Rolling mean of the True Range, like indicators.atr.
+    """
+
+    def __init__(self, window=14):
+        self.mean = RollingMean(window)
+        self.prev_close = NAN
+
+    def _true_range(self, high, low):
+        if math.isnan(self.prev_close):
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def peek(self, high, low, close):
+        return self.mean.peek(self._true_range(high, low))
+
+    def update(self, high, low, close):
+        self.mean.update(self._true_range(high, low))
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self):
+        return self.mean.value
+
+
+class RSI:
+    """
+    RSI over simple rolling means of gains and losses, like indicators.rsi.
+    """
+
+    def __init__(self, window=14):
+        self.gains = RollingMean(window)
+        self.losses = RollingMean(window)
+        self.prev_close = NAN
+
+    def _moves(self, close):
+        delta = 0.0 if math.isnan(self.prev_close) else close - self.prev_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if math.isnan(avg_gain) or math.isnan(avg_loss) or (avg_gain == 0 and avg_loss == 0):
+            return NAN
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def peek(self, close):
+        gain, loss = self._moves(close)
+        return self._rsi(self.gains.peek(gain), self.losses.peek(loss))
+
+    def update(self, close):
+        gain, loss = self._moves(close)
+        self.gains.update(gain)
+        self.losses.update(loss)
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self):
+        return self._rsi(self.gains.value, self.losses.value)
+
+
+class WilderRSI:
+    """
+    Wilder's RSI: the first average is a simple mean of `window` moves,
+    after that each new move is blended in with weight 1/window.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.moves = 0
+        self.prev_close = NAN
+
+    def _averages(self, close):
+        if math.isnan(self.prev_close):
+            return self.avg_gain, self.avg_loss, self.moves
+        delta = close - self.prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        moves = self.moves + 1
+        if moves <= self.window:
+            # Running sums until the first full window, then Wilder smoothing
+            avg_gain, avg_loss = self.avg_gain + gain, self.avg_loss + loss
+            if moves == self.window:
+                avg_gain, avg_loss = avg_gain / self.window, avg_loss / self.window
+        else:
+            avg_gain = (self.avg_gain * (self.window - 1) + gain) / self.window
+            avg_loss = (self.avg_loss * (self.window - 1) + loss) / self.window
+        return avg_gain, avg_loss, moves
+
+    def _rsi(self, avg_gain, avg_loss, moves):
+        if moves < self.window:
+            return NAN
+        return RSI._rsi(avg_gain, avg_loss)
+
+    def peek(self, close):
+        return self._rsi(*self._averages(close))
+
+    def update(self, close):
+        self.avg_gain, self.avg_loss, self.moves = self._averages(close)
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self):
+        return self._rsi(self.avg_gain, self.avg_loss, self.moves)
+
+
+class IndicatorState:
+    """
+    SMA, EMA, ATR and RSI for one ticker. Finished bars are committed; the
+    newest bar stays pending and can be replaced as it updates during the
+    day, so a bar with the same timestamp never gets counted twice.
+    Pass wilder=True for Wilder-smoothed RSI instead of the simple one.
+    """
+
+    def __init__(self, window=14, wilder=False):
+        self.sma = RollingMean(window)
+        self.ema = EMA(window)
+        self.atr = ATR(window)
+        self.rsi = WilderRSI(window) if wilder else RSI(window)
+        self.pending = None  # (timestamp, high, low, close)
+        self.bars = 0
+        self.snapshot = None
+
+    def _commit(self, high, low, close):
+        self.sma.update(close)
+        self.ema.update(close)
+        self.atr.update(high, low, close)
+        self.rsi.update(close)
+
+    def update(self, timestamp, high, low, close):
+        if self.pending is not None:
+            if timestamp < self.pending[0]:
+                return self.snapshot  # Older than what we have already seen
+            if timestamp > self.pending[0]:
+                self._commit(*self.pending[1:])
+                self.bars += 1
+        self.pending = (timestamp, high, low, close)
+        self.snapshot = {
+            "Time": timestamp,
+            "Close": close,
+            "SMA": self.sma.peek(close),
+            "EMA": self.ema.peek(close),
+            "ATR": self.atr.peek(high, low, close),
+            "RSI": self.rsi.peek(close),
+        }
+        return self.snapshot
+
+    def update_price(self, price):
+        """
+        Folds a live quote into the pending bar (widening its high/low).
+        """
+        if self.pending is None:
+            return None
+        timestamp, high, low, _ = self.pending
+        return self.update(timestamp, max(high, price), min(low, price), price)
+
+    def seed(self, hist):
+        """
+        Replays a history DataFrame (High/Low/Close columns) bar by bar.
+        """
+        for timestamp, high, low, close in zip(hist.index, hist["High"], hist["Low"], hist["Close"]):
+            if not math.isnan(close):
+                self.update(timestamp, float(high), float(low), float(close))
+        return self.snapshot
@@ -0,0 +1,123 @@
+import io
+import os
+import gzip
+import json
+import time
+import bisect
+import threading
+import pandas as pd
+import requests
+
+UNIVERSE_URLS = {
+    "nasdaq": "https://datahub.io/core/nasdaq-listings/r/nasdaq-listed-symbols.csv",
+    "sp500": "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/master/data/constituents.csv",
+}
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ticker_universe.json.gz")
+
+
+class TickerUniverse:
+    """
+    Keeps the NASDAQ and S&P 500 symbol lists in a small gzipped JSON
+    snapshot. Lists are re-checked once refresh_interval has passed, using
+    ETag/Last-Modified so an unchanged list costs a 304 and no download.
+    If the network is down the last snapshot keeps being served.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH, refresh_interval=24 * 3600, urls=None):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.urls = dict(UNIVERSE_URLS, **(urls or {}))
+        self._lock = threading.Lock()
+        self._lists = self._load()
+        self._sets = {}
+
+    def _load(self):
+        try:
+            with gzip.open(self.path, "rt") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump(self._lists, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, name, force=False):
+        """
+        Re-downloads one list if it is stale (or force is set). Returns True
+        when the stored symbols changed.
+        """
+        with self._lock:
+            entry = self._lists.get(name)
+            if entry and not force and time.time() - entry["checked_at"] < self.refresh_interval:
+                return False
+
+            headers = {}
+            if entry and entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry and entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+            try:
+                response = requests.get(self.urls[name], headers=headers, timeout=10)
+                if response.status_code == 304:
+                    entry["checked_at"] = time.time()
+                    self._save()
+                    return False
+                response.raise_for_status()
+                symbols = pd.read_csv(io.StringIO(response.text))["Symbol"].dropna().astype(str).tolist()
+            except Exception as e:
+                if not entry:
+                    raise
+                print(f"Could not refresh the {name} list, using the saved copy: {e}")
+                entry["checked_at"] = time.time()  # Don't retry on every call while offline
+                return False
+
+            changed = not entry or entry["symbols"] != sorted(set(symbols))
+            self._lists[name] = {
+                "symbols": sorted(set(symbols)),
+                "checked_at": time.time(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self._sets.pop(name, None)
+            self._save()
+            return changed
+
+    def symbols(self, name="nasdaq"):
+        """
+        Returns a fresh, sorted copy of a list so callers can shuffle it.
+        """
+        self.refresh(name)
+        return list(self._lists[name]["symbols"])
+
+    def contains(self, symbol, name="nasdaq"):
+        self.refresh(name)
+        if name not in self._sets:
+            self._sets[name] = frozenset(self._lists[name]["symbols"])
+        return symbol in self._sets[name]
+
+    def with_prefix(self, prefix, name="nasdaq"):
+        self.refresh(name)
+        symbols = self._lists[name]["symbols"]
+        start = bisect.bisect_left(symbols, prefix)
+        end = bisect.bisect_left(symbols, prefix + "\uffff")
+        return symbols[start:end]
+
+    def filter(self, name="nasdaq", exclude_special=False, predicate=None):
+        """
+        Returns the symbols that pass the filters; exclude_special drops
+        class shares and units such as BRK.B or ABR$D.
+        """
+        symbols = self.symbols(name)
+        if exclude_special:
+            symbols = [s for s in symbols if "." not in s and "$" not in s]
+        if predicate:
+            symbols = [s for s in symbols if predicate(s)]
+        return symbols
+
+
+# One shared instance so every scanner in a process reads the same snapshot
+universe = TickerUniverse()
@@ -1,14 +1,6 @@
 import yfinance as yf
 import pandas as pd
-
-# Helper function to calculate volatility (ATR)
-def calculate_atr(data):
-    data['High-Low'] = data['High'] - data['Low']
-    data['High-Close'] = abs(data['High'] - data['Close'].shift(1))
-    data['Low-Close'] = abs(data['Low'] - data['Close'].shift(1))
-    data['True Range'] = data[['High-Low', 'High-Close', 'Low-Close']].max(axis=1)
-    data['ATR'] = data['True Range'].rolling(window=14).mean()
-    return data['ATR'].iloc[-1] if not data['ATR'].isna().all() else None  # Return the latest ATR value
+from indicators import calculate_atr
 
 # Function to determine buy, hold, or sell
 def generate_signal(current_price, sma, ema):
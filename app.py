@@ -1,8 +1,13 @@
 from flask import Flask, request, jsonify
+from flask.helpers import get_debug_flag
+import os
+import queue
+import concurrent.futures
 import cv2
 import numpy as np
-from deepface import DeepFace
 import mediapipe as mp
+from batch_inference import BatchWorker, EmotionModel
+from face_tracking import image_face
 
 app = Flask(__name__)
 
@@ -20,6 +25,27 @@ product_recommendations = {
     'fear': ['Deep Purple Lipstick - NARS', 'Violet Eyeshadow - Anastasia Beverly Hills']
 }
 
+# Emotion inference runs on a micro-batching worker, so concurrent uploads share one forward pass.
+# Past max_queue waiting images, /analyze answers 503 instead of queueing more.
+emotion_model = EmotionModel()
+emotion_worker = BatchWorker(emotion_model.predict_batch, max_batch=16, max_wait_ms=10, max_queue=64)
+INFERENCE_TIMEOUT = 10  # Seconds a request waits for its batch
+DEBUG = True  # Debug mode (with the reloader) when started with python app.py
+
+# Function to load the emotion model and run it once before serving, so the first upload is not slow
+def start_inference():
+    emotion_worker.start(warm_up=np.zeros((96, 96, 3), dtype=np.uint8))
+
+# Helper function to spot the debug reloader's parent process, which only watches files and never serves
+def is_reloader_parent():
+    reloading = DEBUG if __name__ == '__main__' else get_debug_flag()
+    return reloading and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+# Warm the model while the app is created (python app.py, flask run, gunicorn).
+# EMOTION_WARM_UP=0 skips it, e.g. for load tests that swap in another model.
+if os.environ.get('EMOTION_WARM_UP', '1') != '0' and not is_reloader_parent():
+    start_inference()
+
 # Analyze emotion and return recommendations
 @app.route('/analyze', methods=['POST'])
 def analyze():
@@ -28,9 +54,18 @@ def analyze():
         image_file = request.files['image']
         image = cv2.imdecode(np.frombuffer(image_file.read(), np.uint8), cv2.IMREAD_COLOR)
 
-        # Analyze emotion
-        analysis = DeepFace.analyze(image, actions=['emotion'], enforce_detection=False)
-        emotion = analysis[0]['dominant_emotion'] if isinstance(analysis, list) else analysis['dominant_emotion']
+        # Crop the face here, then let the worker batch it with other uploads
+        emotion_worker.start()  # No-op once warmed up at startup
+        face = image_face(image)
+        try:
+            future = emotion_worker.submit(face)
+        except queue.Full:
+            return jsonify({'error': 'Server busy, please try again shortly'}), 503
+        try:
+            emotion = future.result(timeout=INFERENCE_TIMEOUT)['dominant_emotion']
+        except concurrent.futures.TimeoutError:
+            future.cancel()  # Still queued: the worker drops it instead of running the model for nobody
+            return jsonify({'error': 'Emotion analysis timed out, please try again shortly'}), 504
 
         # Get product recommendations
         recommendations = product_recommendations.get(emotion, [])
@@ -44,4 +79,4 @@ def analyze():
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=DEBUG)
@@ -0,0 +1,190 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import cv2
+import numpy as np
+
+# Output order of DeepFace's emotion model
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+
+class BatchWorker:
+    """
+    Micro-batching worker for a model that is cheaper per item in batches.
+    Callers submit() one item and get a Future; a single worker thread takes
+    the first waiting item, keeps collecting until it has `max_batch` items
+    or `max_wait_ms` has passed, runs predict_batch(items) once and resolves
+    every future with its own result. At most `max_queue` items may wait:
+    submit() raises queue.Full past that, so callers can shed load. Items
+    whose future was cancelled while waiting (a caller that gave up) are
+    dropped from their batch.
+    """
+
+    def __init__(self, predict_batch, max_batch=16, max_wait_ms=10, max_queue=64):
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.metrics = {"requests": 0, "rejected": 0, "cancelled": 0, "batches": 0, "items": 0, "errors": 0,
+                        "model_seconds": 0.0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.metrics[name] += amount
+
+    def submit(self, item):
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self._count("rejected")
+            raise
+        self._count("requests")
+        return future
+
+    # Helper function to wait for the first item, then gather more until the batch is full or the wait is up
+    def _gather(self):
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, batch):
+        # Futures cancelled while queued (their caller gave up) are dropped; the rest are marked running
+        live = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        self._count("cancelled", len(batch) - len(live))
+        if not live:
+            return
+        items = [item for item, _ in live]
+        start = time.perf_counter()
+        try:
+            results = self.predict_batch(items)
+        except Exception as e:
+            self._count("errors")
+            for _, future in live:
+                future.set_exception(e)
+            return
+        finally:
+            self._count("model_seconds", time.perf_counter() - start)
+        self._count("batches")
+        self._count("items", len(live))
+        for (_, future), result in zip(live, results):
+            future.set_result(result)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            batch = self._gather()
+            if batch:
+                self._run(batch)
+
+    def start(self, warm_up=None):
+        """
+        Starts the worker thread (once). With `warm_up`, runs the model on
+        that item first, so the first request does not pay for loading it.
+        """
+        with self._start_lock:
+            if self._thread is not None:
+                return self
+            if warm_up is not None:
+                self.predict_batch([warm_up])
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="batch-inference", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._start_lock:
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout=2)
+                self._thread = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics)
+        stats["mean_batch"] = round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+
+# Helper function to turn one row of model scores into DeepFace's result shape
+def emotion_result(scores):
+    percent = 100 * scores / scores.sum()
+    return {
+        'dominant_emotion': EMOTION_LABELS[int(np.argmax(scores))],
+        'emotion': {label: round(float(value), 2) for label, value in zip(EMOTION_LABELS, percent)},
+    }
+
+
+class EmotionModel:
+    """
+    DeepFace's emotion CNN called directly on a batch of cropped BGR faces,
+    instead of one DeepFace.analyze call per image. preprocess() repeats
+    what DeepFace.analyze(detector_backend='skip') does to the face it is
+    given, so results match the single-image path.
+    """
+
+    def __init__(self):
+        self.model = None
+
+    def load(self):
+        if self.model is None:
+            from deepface.models.demography.Emotion import EmotionClient
+            self.model = EmotionClient().model
+        return self.model
+
+    @staticmethod
+    def preprocess(face):
+        """
+        Scales to 0..1, fits the face into 224x224 keeping its aspect ratio
+        (zero padded, centred), then converts to grayscale and resizes to
+        48x48. Both resizes are linear, as in DeepFace.
+        """
+        face = face.astype(np.float32) / 255
+        factor = min(224 / face.shape[0], 224 / face.shape[1])
+        face = cv2.resize(face, (int(face.shape[1] * factor), int(face.shape[0] * factor)))
+        pad_y, pad_x = 224 - face.shape[0], 224 - face.shape[1]
+        face = cv2.copyMakeBorder(face, pad_y // 2, pad_y - pad_y // 2, pad_x // 2, pad_x - pad_x // 2,
+                                  cv2.BORDER_CONSTANT, value=0)
+        if face.shape[:2] != (224, 224):
+            face = cv2.resize(face, (224, 224))
+        gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (48, 48))[..., None]
+
+    def predict_batch(self, faces):
+        batch = np.stack([self.preprocess(face) for face in faces])
+        scores = np.asarray(self.load()(batch, training=False))
+        return [emotion_result(row) for row in scores]
+
+
+class SyntheticEmotionModel:
+    """
+    Stand-in for EmotionModel when TensorFlow is not available. Each call
+    costs `call_ms` plus `image_ms` per face, which is how a small CNN
+    behaves on CPU (a fixed cost per forward pass, a smaller one per image).
+    Scores come from the face pixels, so results are repeatable.
+    """
+
+    def __init__(self, call_ms=20, image_ms=2):
+        self.call_ms = call_ms
+        self.image_ms = image_ms
+
+    def predict_batch(self, faces):
+        time.sleep((self.call_ms + self.image_ms * len(faces)) / 1000)
+        batch = np.stack([EmotionModel.preprocess(face) for face in faces])
+        means = batch.reshape(len(faces), -1).mean(axis=1)
+        scores = np.exp(-((np.arange(len(EMOTION_LABELS)) / len(EMOTION_LABELS) - means[:, None]) ** 2) * 20)
+        return [emotion_result(row) for row in scores]
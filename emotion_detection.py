@@ -1,5 +1,8 @@
-from deepface import DeepFace
+import argparse
 import cv2
+import numpy as np
+from emotion_pipeline import EmotionPipeline, draw_readout, open_source
+from face_tracking import TrackedEmotion
 
 # Define emotion-to-makeup mapping
 makeup_styles = {
@@ -11,77 +14,120 @@ makeup_styles = {
     'fear': 'Cool tones with defined contour'
 }
 
+# Custom looks picked with the number keys
+custom_looks = {
+    ord('1'): 'Bright and radiant look with highlighter',
+    ord('2'): 'Soft, neutral tones with minimal contour',
+    ord('3'): 'Smoky eyes and bold eyeliner',
+    ord('4'): 'Shimmery eyeshadow with a subtle glow',
+}
+
 # Function to get makeup style based on emotion
 def get_makeup_style(emotion):
     return makeup_styles.get(emotion, 'Natural look')  # Default to "Natural look" if emotion not in dictionary
 
-# Initialize webcam
-cap = cv2.VideoCapture(0)
+# Function to draw the emotion, makeup style and instructions on a frame
+def draw_overlay(frame, dominant_emotion, makeup_style):
+    cv2.putText(frame, f'Emotion: {dominant_emotion}', (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+    cv2.putText(frame, f'Makeup: {makeup_style}', (30, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+
+    # Add instructions to the feed
+    cv2.putText(frame, "Press 1: Bright look", (30, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Press 2: Neutral look", (30, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Press 3: Smoky look", (30, 210), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Press 4: Shimmery look", (30, 240), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Press 0: Reset", (30, 270), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
+    cv2.putText(frame, "Press Q: Quit", (30, 300), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Emotion detection with makeup suggestions")
+    parser.add_argument("--source", default="0", help="camera index, video file or 'synthetic'")
+    parser.add_argument("--every-n", type=int, default=1, help="analyze at most every N captured frames")
+    parser.add_argument("--every-ms", type=float, default=0, help="analyze at most once per T milliseconds")
+    parser.add_argument("--frames", type=int, default=None, help="stop after N displayed frames")
+    parser.add_argument("--headless", action="store_true", help="no window; print the readout at the end")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
 
-# Check if the camera is opened successfully
-if not cap.isOpened():
-    print("Error: Could not access the camera. Ensure it is connected and authorized.")
-    exit()
+    # Initialize webcam (or the video file / synthetic source)
+    cap = open_source(args.source)
 
-# User preference
-custom_makeup_style = None
+    # Check if the camera is opened successfully
+    if not cap.isOpened():
+        print("Error: Could not access the camera. Ensure it is connected and authorized.")
+        return
 
-while True:
-    ret, frame = cap.read()
+    # Emotions are analyzed on a background worker; the loop below runs at camera rate.
+    # The worker tracks the face and only runs the emotion model on the cropped face.
+    is_file = not args.source.isdigit() and args.source != "synthetic"
+    fps = cap.get(cv2.CAP_PROP_FPS) if is_file else None  # Play video files back in real time
+    pipeline = EmotionPipeline(cap, analyze=TrackedEmotion(), every_n_frames=args.every_n,
+                               every_ms=args.every_ms, fps=fps)
+    pipeline.start()
 
-    if not ret:
-        print("Error: Failed to read frame from camera.")
-        break
+    # User preference
+    custom_makeup_style = None
+    last_emotion = None
+    last_error = None
+    index = -1
+    display = None  # Reused display buffer, so overlays never touch the frame being analyzed
+    shown = 0
 
-    try:
-        # Analyze emotions
-        analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
-        if isinstance(analysis, list):  # Handle list output if DeepFace returns multiple results
-            analysis = analysis[0]
+    while pipeline.running and (args.frames is None or shown < args.frames):
+        latest = pipeline.latest(index)
+        if latest is None:
+            continue
+        frame, index, dominant_emotion = latest
+        if display is None or display.shape != frame.shape:
+            display = np.empty_like(frame)
+        np.copyto(display, frame)
+        shown += 1
 
-        dominant_emotion = analysis.get('dominant_emotion', 'neutral')  # Default to 'neutral' if key missing
+        if pipeline.error and pipeline.error != last_error:
+            print(f"Error in emotion analysis: {pipeline.error}")
+        last_error = pipeline.error
 
-        # Use custom makeup style if set, otherwise use the detected style
-        makeup_style = custom_makeup_style if custom_makeup_style else get_makeup_style(dominant_emotion)
-        print(f"Emotion: {dominant_emotion} -> Makeup Style: {makeup_style}")
+        if dominant_emotion is None:
+            # No result yet, or no face in the last analyzed frame: nothing to base a style on
+            dominant_emotion = 'No face detected' if pipeline.frames_analyzed else 'Detecting...'
+            makeup_style = custom_makeup_style if custom_makeup_style else '-'
+        else:
+            # Use custom makeup style if set, otherwise use the detected style
+            makeup_style = custom_makeup_style if custom_makeup_style else get_makeup_style(dominant_emotion)
+        if dominant_emotion != last_emotion:
+            print(f"Emotion: {dominant_emotion} -> Makeup Style: {makeup_style}")
+            last_emotion = dominant_emotion
 
         # Display emotion and makeup style on video feed
-        cv2.putText(frame, f'Emotion: {dominant_emotion}', (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-        cv2.putText(frame, f'Makeup: {makeup_style}', (30, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
-
-        # Add instructions to the feed
-        cv2.putText(frame, "Press 1: Bright look", (30, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-        cv2.putText(frame, "Press 2: Neutral look", (30, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-        cv2.putText(frame, "Press 3: Smoky look", (30, 210), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-        cv2.putText(frame, "Press 4: Shimmery look", (30, 240), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-        cv2.putText(frame, "Press 0: Reset", (30, 270), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-        cv2.putText(frame, "Press Q: Quit", (30, 300), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2, cv2.LINE_AA)
-    except Exception as e:
-        print(f"Error in emotion analysis: {e}")
-
-    # Display the video feed
-    cv2.imshow('Emotion Detection with Makeup Suggestions', frame)
-
-    # Handle user input for custom makeup style
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('1'):
-        custom_makeup_style = 'Bright and radiant look with highlighter'
-        print("Custom Makeup: Bright and radiant look with highlighter")
-    elif key == ord('2'):
-        custom_makeup_style = 'Soft, neutral tones with minimal contour'
-        print("Custom Makeup: Soft, neutral tones with minimal contour")
-    elif key == ord('3'):
-        custom_makeup_style = 'Smoky eyes and bold eyeliner'
-        print("Custom Makeup: Smoky eyes and bold eyeliner")
-    elif key == ord('4'):
-        custom_makeup_style = 'Shimmery eyeshadow with a subtle glow'
-        print("Custom Makeup: Shimmery eyeshadow with a subtle glow")
-    elif key == ord('0'):
-        custom_makeup_style = None
-        print("Custom Makeup: Reset to emotion-based recommendations")
-    elif key == ord('q'):
-        break
-
-# Release resources
-cap.release()
-cv2.destroyAllWindows()
+        draw_overlay(display, dominant_emotion, makeup_style)
+        draw_readout(display, pipeline.stats())
+        if args.headless:
+            continue
+
+        # Display the video feed
+        cv2.imshow('Emotion Detection with Makeup Suggestions', display)
+
+        # Handle user input for custom makeup style
+        key = cv2.waitKey(1) & 0xFF
+        if key in custom_looks:
+            custom_makeup_style = custom_looks[key]
+            print(f"Custom Makeup: {custom_makeup_style}")
+        elif key == ord('0'):
+            custom_makeup_style = None
+            print("Custom Makeup: Reset to emotion-based recommendations")
+        elif key == ord('q'):
+            break
+
+    pipeline.stop()
+    for key, value in pipeline.stats().items():
+        print(f"{key}: {value}")
+
+    # Release resources
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+if __name__ == "__main__":
+    main()
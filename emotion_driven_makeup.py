@@ -1,7 +1,11 @@
+import argparse
+import tracemalloc
 import cv2
 import mediapipe as mp
 import numpy as np
-from deepface import DeepFace
+from emotion_pipeline import SyntheticFrameSource, open_source
+from face_tracking import FaceTracker, crop_face, face_emotion
+from frame_graph import FrameGraph, blend_polygon, print_report
 from tkinter import Tk, Label, Button
 from PIL import Image, ImageTk
 import os
@@ -20,10 +24,13 @@ product_recommendations = {
 mp_face_mesh = mp.solutions.face_mesh
 face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, refine_landmarks=True)
 
-# Function to apply makeup
-def apply_makeup(frame, landmarks, emotion):
-    h, w, _ = frame.shape
-    overlay = frame.copy()
+# Shared face tracker: the detector only runs again when tracking confidence drops
+face_tracker = FaceTracker()
+EMOTION_EVERY = 1  # Run the emotion model on every Nth frame
+
+# Function to apply makeup: tints the lips in place in the shared RGB buffer, within the lips' bounding box
+def apply_makeup(buffers, landmarks, emotion):
+    h, w, _ = buffers.rgb.shape
 
     # Define lip landmarks
     lip_indices = [61, 146, 91, 181, 84, 17, 314, 405, 321, 375, 291, 308, 324, 318]
@@ -32,13 +39,43 @@ def apply_makeup(frame, landmarks, emotion):
     # Apply lipstick (based on emotion)
     if lips:
         points = np.array(lips, np.int32)
-        color = (255, 0, 0) if emotion == 'happy' else (128, 0, 128)  # Example for happy and sad
-        cv2.fillPoly(overlay, [points], color)
-
-    # Blend overlay with frame
-    alpha = 0.5
-    frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
-    return frame
+        color = (255, 0, 0) if emotion == 'happy' else (128, 0, 128)  # BGR; example for happy and sad
+        blend_polygon(buffers, points, color[::-1], alpha=0.5)  # The buffer is RGB
+
+# Stage: convert the camera frame to RGB once, into the reusable buffer both MediaPipe and Tk use
+def convert_stage(context):
+    cv2.cvtColor(context.frame, cv2.COLOR_BGR2RGB, dst=context.buffers.rgb)
+
+# Stage: follow the face; the detector only runs when tracking is lost
+def track_stage(context):
+    context.box = face_tracker.update(context.frame)
+
+# Stage: emotion from the cropped face, every EMOTION_EVERY frames
+def emotion_stage(context):
+    if context.box is not None and context.index % EMOTION_EVERY == 0:
+        face = crop_face(context.frame, context.box)
+        if face is not None:  # A box drifting off the frame crops to nothing; keep the last emotion
+            context.emotion = face_emotion(face)
+
+# Stage: face landmarks from the shared RGB buffer (skipped while no face is tracked)
+def landmarks_stage(context):
+    if context.box is not None:
+        context.landmarks = face_mesh.process(context.buffers.rgb).multi_face_landmarks
+
+# Stage: lipstick, blended into the RGB buffer in place
+def makeup_stage(context):
+    for landmarks in context.landmarks or ():
+        apply_makeup(context.buffers, landmarks, context.emotion)
+
+# Function to build the per-frame processing graph
+def build_graph(trace_memory=False):
+    return FrameGraph([
+        ("convert", convert_stage),
+        ("track", track_stage),
+        ("emotion", emotion_stage),
+        ("landmarks", landmarks_stage),
+        ("makeup", makeup_stage),
+    ], trace_memory=trace_memory)
 
 # Function to save snapshots
 def take_snapshot(frame):
@@ -49,7 +86,7 @@ def take_snapshot(frame):
     print(f"Snapshot saved as {filename}")
 
 # Initialize the GUI
-def start_app():
+def start_app(source=0):
     root = Tk()
     root.title("Emotion-Driven Makeup App")
 
@@ -65,46 +102,37 @@ def start_app():
     recommendation_label = Label(root, text="Recommended Products:", font=("Helvetica", 14))
     recommendation_label.pack()
 
-    # Snapshot Button
-    snapshot_button = Button(root, text="Take Snapshot", font=("Helvetica", 14), command=lambda: take_snapshot(current_frame))
+    graph = build_graph()
+
+    # Snapshot Button (the shown image is RGB; it is converted back only when a snapshot is taken)
+    snapshot_button = Button(root, text="Take Snapshot", font=("Helvetica", 14),
+                             command=lambda: take_snapshot(cv2.cvtColor(graph.buffers.rgb, cv2.COLOR_RGB2BGR)))
     snapshot_button.pack()
 
     # Start webcam
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source)
 
     def update_frame():
-        global current_frame
         ret, frame = cap.read()
         if not ret:
             return
 
-        # Detect emotion
         try:
-            analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
-            emotion = analysis[0]['dominant_emotion'] if isinstance(analysis, list) else analysis['dominant_emotion']
-            emotion_label.config(text=f"Emotion: {emotion}")
-
-            # Get recommendations
-            recommendations = product_recommendations.get(emotion, [])
-            recommendation_label.config(text=f"Recommended Products: {', '.join(recommendations)}")
-
-            # Process face landmarks
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb_frame)
-
-            if results.multi_face_landmarks:
-                for landmarks in results.multi_face_landmarks:
-                    frame = apply_makeup(frame, landmarks, emotion)
-
-            # Convert frame for Tkinter
-            img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            imgtk = ImageTk.PhotoImage(image=img)
+            context = graph.run(frame)
+            if context.box is None:
+                emotion_label.config(text="Emotion: No face detected")
+            elif context.emotion:
+                emotion_label.config(text=f"Emotion: {context.emotion}")
+
+                # Get recommendations
+                recommendations = product_recommendations.get(context.emotion, [])
+                recommendation_label.config(text=f"Recommended Products: {', '.join(recommendations)}")
+
+            # Show the RGB buffer directly; no second conversion or copy of the frame
+            imgtk = ImageTk.PhotoImage(image=Image.fromarray(graph.buffers.rgb))
             video_label.imgtk = imgtk
             video_label.configure(image=imgtk)
 
-            # Save current frame for snapshot
-            current_frame = frame.copy()
-
         except Exception as e:
             emotion_label.config(text=f"Error: {str(e)}")
 
@@ -114,7 +142,46 @@ def start_app():
     update_frame()
     root.mainloop()
     cap.release()
-    cv2.destroyAllWindows()
+
+# Function to run the graph without the GUI and report per-stage cost
+def benchmark(source="synthetic", frames=200):
+    cap = open_source(source)
+    if isinstance(cap, SyntheticFrameSource):
+        cap.fps = 10000  # Do not wait for a simulated camera
+    recorded = []
+    while len(recorded) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        recorded.append(frame)
+    cap.release()
+    print(f"Benchmarking {len(recorded)} frames of {recorded[0].shape[1]}x{recorded[0].shape[0]}")
+
+    # Timing pass, then an allocation pass under tracemalloc (which slows things down)
+    graph = build_graph()
+    for frame in recorded:
+        graph.run(frame)
+    print_report(graph.report(), graph.frames)
+
+    tracemalloc.start()
+    graph = build_graph(trace_memory=True)
+    for frame in recorded:
+        graph.run(frame)
+    tracemalloc.stop()
+    print(f"\nWith allocation tracing (a full frame is {recorded[0].nbytes / 1024:.0f} KB):")
+    print_report(graph.report(), graph.frames)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Emotion-driven makeup")
+    parser.add_argument("--source", default="0", help="camera index, video file or 'synthetic'")
+    parser.add_argument("--benchmark", action="store_true", help="run without the GUI and report per-stage cost")
+    parser.add_argument("--frames", type=int, default=200, help="frames to benchmark")
+    return parser.parse_args()
 
 # Start the application
-start_app()
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        benchmark(args.source, args.frames)
+    else:
+        start_app(args.source)
@@ -0,0 +1,223 @@
+import time
+import threading
+from collections import deque
+import cv2
+import numpy as np
+
+
+class SyntheticFrameSource:
+    """
+    Stand-in for cv2.VideoCapture that draws a moving face-like shape, so the
+    pipeline can run without a camera. Frames are paced to `fps` and the
+    source ends after `frames` reads (None for no end).
+    """
+
+    def __init__(self, width=640, height=480, fps=30, frames=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = frames
+        self.count = 0
+        self._next = time.perf_counter()
+        yy, xx = np.mgrid[0:height, 0:width]
+        self._background = ((xx * 255 // max(width - 1, 1))[..., None] * [0.3, 0.4, 0.5]).astype(np.uint8)
+
+    def isOpened(self):
+        return self.frames is None or self.count < self.frames
+
+    def read(self):
+        if not self.isOpened():
+            return False, None
+        # Wait for the next frame slot, like a camera running at a fixed rate
+        self._next += 1 / self.fps
+        delay = self._next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self._next = time.perf_counter()
+        frame = self._background.copy()
+        center = (int(self.width / 2 + self.width / 6 * np.sin(self.count / 30)), self.height // 2)
+        axes = (self.width // 8, self.height // 5)
+        cv2.ellipse(frame, center, axes, 0, 0, 360, (150, 180, 220), -1)
+        cv2.circle(frame, (center[0] - axes[0] // 2, center[1] - axes[1] // 3), axes[0] // 6, (40, 40, 40), -1)
+        cv2.circle(frame, (center[0] + axes[0] // 2, center[1] - axes[1] // 3), axes[0] // 6, (40, 40, 40), -1)
+        cv2.ellipse(frame, (center[0], center[1] + axes[1] // 2), (axes[0] // 2, axes[1] // 8), 0, 0, 180, (60, 60, 170), -1)
+        self.count += 1
+        return True, frame
+
+    def release(self):
+        self.frames = self.count
+
+
+# Helper function to open a camera index, a video file or the synthetic source
+def open_source(source=0):
+    if source == "synthetic":
+        return SyntheticFrameSource()
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    return cv2.VideoCapture(source)
+
+# Helper function to run DeepFace emotion analysis on one frame
+def deepface_emotion(frame):
+    from deepface import DeepFace
+    analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
+    if isinstance(analysis, list):  # Handle list output if DeepFace returns multiple results
+        analysis = analysis[0]
+    return analysis.get('dominant_emotion', 'neutral')
+
+
+class LatestFrame:
+    """
+    Single-slot mailbox holding only the newest frame. Writers overwrite it,
+    so a slow reader skips stale frames instead of queueing them.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.frame = None
+        self.index = -1
+        self.captured_at = 0.0
+
+    def put(self, frame):
+        with self._condition:
+            self.frame = frame
+            self.index += 1
+            self.captured_at = time.perf_counter()
+            self._condition.notify_all()
+
+    def wait_newer(self, index, timeout=0.5):
+        """
+        Returns (frame, index, captured_at) for a frame newer than `index`, or None on timeout.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.index > index, timeout):
+                return None
+            return self.frame, self.index, self.captured_at
+
+
+class EmotionPipeline:
+    """
+    Capture, inference and display run at their own rates. A capture thread
+    reads frames into a LatestFrame slot; an inference worker takes the
+    newest frame when the cadence allows (every `every_n_frames` frames and at
+    most once per `every_ms` milliseconds) and publishes the emotion. The
+    display loop calls latest() at camera rate and draws the last known
+    emotion, so a slow model lowers the emotion refresh rate, not the FPS.
+    Pass `fps` to play a video file back in real time instead of as fast as
+    it decodes.
+    """
+
+    def __init__(self, source, analyze=deepface_emotion, every_n_frames=1, every_ms=0, fps=None, window=60):
+        self.source = source
+        self.fps = fps
+        self.analyze = analyze
+        self.every_n_frames = max(1, every_n_frames)
+        self.every_ms = every_ms
+        self.slot = LatestFrame()
+        self.emotion = None
+        self.error = None
+        self.frames_captured = 0
+        self.frames_analyzed = 0
+        self.frames_skipped = 0
+        self._capture_times = deque(maxlen=window)
+        self._inference_times = deque(maxlen=window)
+        self._display_times = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)  # Capture to emotion available, in seconds
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _capture_loop(self):
+        next_frame = time.perf_counter()
+        while not self._stop.is_set():
+            if self.fps:
+                next_frame += 1 / self.fps
+                self._stop.wait(max(0.0, next_frame - time.perf_counter()))
+            ret, frame = self.source.read()
+            if not ret:
+                break
+            self.slot.put(frame)
+            self.frames_captured += 1
+            self._capture_times.append(time.perf_counter())
+        self._stop.set()
+
+    def _inference_loop(self):
+        last_index = -self.every_n_frames
+        last_run = 0.0
+        while not self._stop.is_set():
+            # Wait out the time cadence first, then take whatever frame is newest
+            delay = last_run + self.every_ms / 1000 - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            newer = self.slot.wait_newer(last_index + self.every_n_frames - 1)
+            if newer is None:
+                continue
+            frame, index, captured_at = newer
+            self.frames_skipped += max(0, index - last_index - 1)
+            last_index, last_run = index, time.perf_counter()
+            try:
+                self.emotion = self.analyze(frame)
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+            done = time.perf_counter()
+            self.frames_analyzed += 1
+            self._inference_times.append(done)
+            self._latencies.append(done - captured_at)
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def latest(self, index=-1, timeout=0.5):
+        """
+        Waits for a frame newer than `index` and returns (frame, index, emotion), or None.
+        """
+        newer = self.slot.wait_newer(index, timeout)
+        if newer is None:
+            return None
+        self._display_times.append(time.perf_counter())
+        return newer[0], newer[1], self.emotion
+
+    # Helper function to turn a window of timestamps into a rate
+    @staticmethod
+    def _rate(times):
+        times = list(times)
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def stats(self):
+        latencies = np.array(self._latencies) * 1000
+        return {
+            "Capture FPS": round(self._rate(self._capture_times), 1),
+            "Display FPS": round(self._rate(self._display_times), 1),
+            "Inference FPS": round(self._rate(self._inference_times), 1),
+            "Latency ms": round(float(latencies.mean()), 1) if len(latencies) else None,
+            "Frames Captured": self.frames_captured,
+            "Frames Analyzed": self.frames_analyzed,
+            "Frames Skipped": self.frames_skipped,
+        }
+
+
+# Helper function to draw the FPS/latency readout in the corner of a frame
+def draw_readout(frame, stats):
+    latency = stats["Latency ms"]
+    text = (f"Display {stats['Display FPS']:.0f} fps | Emotion {stats['Inference FPS']:.1f} fps | "
+            f"Latency {latency:.0f} ms" if latency is not None else
+            f"Display {stats['Display FPS']:.0f} fps | Emotion pending")
+    cv2.putText(frame, text, (30, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2, cv2.LINE_AA)
@@ -0,0 +1,151 @@
+import cv2
+import numpy as np
+
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+
+# Helper function to find the largest face with OpenCV's Haar cascade; returns (x, y, w, h) or None
+def haar_detector(gray):
+    if not hasattr(haar_detector, "cascade"):
+        haar_detector.cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    faces = haar_detector.cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+    if len(faces) == 0:
+        return None
+    return tuple(int(v) for v in max(faces, key=lambda face: face[2] * face[3]))
+
+# Helper function to clip an (x, y, w, h) box to the frame
+def clip_box(box, width, height):
+    x, y, w, h = box
+    x0, y0 = max(0, int(x)), max(0, int(y))
+    x1, y1 = min(width, int(x + w)), min(height, int(y + h))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+def crop_face(frame, box, size=96, pad=0.15):
+    """
+    Cuts the face box (plus `pad` on each side) out of the frame and scales it
+    down to size x size. Only the face region is read, never the whole frame.
+    """
+    x, y, w, h = box
+    padded = clip_box((x - w * pad, y - h * pad, w * (1 + 2 * pad), h * (1 + 2 * pad)), frame.shape[1], frame.shape[0])
+    if padded is None:
+        return None
+    x, y, w, h = padded
+    return cv2.resize(frame[y:y + h, x:x + w], (size, size), interpolation=cv2.INTER_AREA)
+
+# Helper function to run the emotion model on an already cropped face, skipping DeepFace's own detector
+def face_emotion(face):
+    from deepface import DeepFace
+    analysis = DeepFace.analyze(face, actions=['emotion'], detector_backend='skip', enforce_detection=False)
+    if isinstance(analysis, list):
+        analysis = analysis[0]
+    return analysis.get('dominant_emotion', 'neutral')
+
+
+class FaceTracker:
+    """
+    Finds the face once with a detector, then follows it from frame to frame
+    by template matching in a small search window around the last box, on a
+    downscaled grayscale copy. The detector runs again only when the match
+    score drops below `min_confidence` or after `redetect_every` tracked
+    frames. update() returns the box in full-frame pixels, or None.
+    """
+
+    def __init__(self, detector=haar_detector, scale=0.5, min_confidence=0.6, search_margin=0.5, redetect_every=150):
+        self.detector = detector
+        self.scale = scale
+        self.min_confidence = min_confidence
+        self.search_margin = search_margin
+        self.redetect_every = redetect_every
+        self.box = None  # (x, y, w, h) in downscaled pixels
+        self.confidence = 0.0
+        self.template = None
+        self.tracked_frames = 0
+        self.detections = 0
+        self.tracks = 0
+        self._gray = None
+        self._small = None
+
+    def _small_gray(self, frame):
+        size = (max(1, int(frame.shape[1] * self.scale)), max(1, int(frame.shape[0] * self.scale)))
+        if self._gray is None or self._gray.shape != (size[1], size[0]) or self._small.shape[2:] != frame.shape[2:]:
+            self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+            self._small = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+        small = cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray) if small.ndim == 3 else small
+
+    def _detect(self, gray):
+        self.detections += 1
+        box = self.detector(gray)
+        self.tracked_frames = 0
+        if box is None:
+            self.box, self.template, self.confidence = None, None, 0.0
+            return
+        x, y, w, h = box
+        self.box, self.template, self.confidence = box, gray[y:y + h, x:x + w].copy(), 1.0
+
+    def _track(self, gray):
+        x, y, w, h = self.box
+        window = clip_box((x - w * self.search_margin, y - h * self.search_margin,
+                           w * (1 + 2 * self.search_margin), h * (1 + 2 * self.search_margin)),
+                          gray.shape[1], gray.shape[0])
+        if window is None or window[2] < w or window[3] < h:
+            self.confidence = 0.0
+            return
+        wx, wy, ww, wh = window
+        scores = cv2.matchTemplate(gray[wy:wy + wh, wx:wx + ww], self.template, cv2.TM_CCOEFF_NORMED)
+        _, self.confidence, _, (mx, my) = cv2.minMaxLoc(scores)
+        if self.confidence >= self.min_confidence:
+            self.tracks += 1
+            self.tracked_frames += 1
+            self.box = (wx + mx, wy + my, w, h)
+
+    def update(self, frame):
+        gray = self._small_gray(frame)
+        if self.box is not None and self.tracked_frames < self.redetect_every:
+            self._track(gray)
+        if self.box is None or self.confidence < self.min_confidence or self.tracked_frames >= self.redetect_every:
+            self._detect(gray)
+        return self.frame_box()
+
+    def frame_box(self):
+        if self.box is None:
+            return None
+        return tuple(int(round(v / self.scale)) for v in self.box)
+
+    def stats(self):
+        return {"Detections": self.detections, "Tracked Frames": self.tracks, "Confidence": round(float(self.confidence), 3)}
+
+
+class TrackedEmotion:
+    """
+    Emotion analyzer for a video stream: tracks the face and runs the
+    emotion model on the cropped, downscaled face only. Returns None while
+    no face is found.
+    """
+
+    def __init__(self, tracker=None, model=face_emotion, face_size=96):
+        self.tracker = tracker or FaceTracker()
+        self.model = model
+        self.face_size = face_size
+
+    def __call__(self, frame):
+        box = self.tracker.update(frame)
+        if box is None:
+            return None
+        face = crop_face(frame, box, self.face_size)
+        return self.model(face) if face is not None else None
+
+
+# Function to cut the face out of one still image (the whole image, downscaled, when no face is found)
+def image_face(image, detector=haar_detector, face_size=96):
+    tracker = FaceTracker(detector=detector, scale=min(1.0, 640 / max(image.shape[:2])))
+    box = tracker.update(image)
+    if box is None:
+        return cv2.resize(image, (face_size, face_size), interpolation=cv2.INTER_AREA)
+    return crop_face(image, box, face_size)
+
+# Function to analyze one still image: detect, crop and run the emotion model on the face only
+def image_emotion(image, detector=haar_detector, face_size=96):
+    return face_emotion(image_face(image, detector, face_size))
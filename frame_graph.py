@@ -0,0 +1,126 @@
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+
+class FrameBuffers:
+    """
+    Per-resolution buffers reused for every frame: the RGB conversion (also
+    used as the output image), a single-channel mask and a colour scratch
+    buffer for blending. They are reallocated only when the frame size changes.
+    """
+
+    def __init__(self):
+        self.shape = None
+        self.rgb = None
+        self.mask = None
+        self.scratch = None
+
+    def ensure(self, shape):
+        if shape != self.shape:
+            self.shape = shape
+            self.rgb = np.empty(shape, dtype=np.uint8)
+            self.mask = np.zeros(shape[:2], dtype=np.uint8)
+            self.scratch = np.empty(shape, dtype=np.uint8)
+        return self
+
+
+class FrameContext:
+    """
+    What the stages share for one frame; each stage reads earlier results
+    from it instead of recomputing them.
+    """
+
+    def __init__(self, frame, buffers, index):
+        self.frame = frame
+        self.buffers = buffers
+        self.index = index
+        self.box = None
+        self.emotion = None
+        self.landmarks = None
+
+
+class FrameGraph:
+    """
+    Runs named stages in order over each frame with one shared context and
+    one set of reusable buffers, and keeps per-stage timings. With
+    `trace_memory` on, it also records how many bytes each stage allocates
+    per frame (tracemalloc peak growth; numpy buffers are included).
+    """
+
+    def __init__(self, stages, trace_memory=False):
+        self.stages = stages  # [(name, function(context))]
+        self.trace_memory = trace_memory
+        self.buffers = FrameBuffers()
+        self.frames = 0
+        self.seconds = {name: 0.0 for name, _ in stages}
+        self.allocated = {name: 0 for name, _ in stages}
+        self.context = None
+        self._emotion = None
+
+    def run(self, frame):
+        context = FrameContext(frame, self.buffers.ensure(frame.shape), self.frames)
+        context.emotion = self._emotion  # Carried over for stages that do not run every frame
+        for name, stage in self.stages:
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            stage(context)
+            self.seconds[name] += time.perf_counter() - start
+            if self.trace_memory:
+                self.allocated[name] += tracemalloc.get_traced_memory()[1] - before
+        self.frames += 1
+        self._emotion = context.emotion
+        self.context = context
+        return context
+
+    def report(self):
+        """
+        Per-stage mean milliseconds and kilobytes allocated per frame.
+        """
+        frames = max(self.frames, 1)
+        rows = []
+        for name, _ in self.stages:
+            row = {"Stage": name, "ms/frame": round(self.seconds[name] * 1000 / frames, 3)}
+            if self.trace_memory:
+                row["KB allocated/frame"] = round(self.allocated[name] / 1024 / frames, 1)
+            rows.append(row)
+        return rows
+
+
+# Optional report columns, in print order, with their number format
+REPORT_COLUMNS = {"KB allocated/frame": "{:,.1f}", "Pixels/frame": "{:,}"}
+
+# Helper function to print a graph report as a table
+def print_report(rows, frames):
+    print(f"\n=== Per-stage cost over {frames} frames ===")
+    columns = [column for column in REPORT_COLUMNS if any(column in row for row in rows)]
+    print(f"{'Stage':<12} {'ms/frame':>10}" + "".join(f" {column:>18}" for column in columns))
+    for row in rows:
+        extra = "".join(f" {REPORT_COLUMNS[column].format(row[column]) if column in row else '-':>18}"
+                        for column in columns)
+        print(f"{row['Stage']:<12} {row['ms/frame']:>10.3f}{extra}")
+    total = sum(row["ms/frame"] for row in rows)
+    print(f"{'total':<12} {total:>10.3f} ({1000 / total:.0f} fps)" if total else "")
+
+def blend_polygon(buffers, points, color, alpha=0.5):
+    """
+    Tints the polygon in buffers.rgb in place. Only the polygon's bounding
+    rectangle is touched: the mask is drawn into the reusable mask buffer
+    and the tint into the scratch buffer, both as views of that rectangle.
+    """
+    height, width = buffers.mask.shape
+    x, y, w, h = cv2.boundingRect(points)
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, width), min(y + h, height)
+    if x1 <= x0 or y1 <= y0:
+        return
+    image = buffers.rgb[y0:y1, x0:x1]
+    mask = buffers.mask[y0:y1, x0:x1]
+    tint = buffers.scratch[y0:y1, x0:x1]
+    mask[:] = 0
+    cv2.fillPoly(mask, [points - np.array([x0, y0], dtype=points.dtype)], 1)
+    tint[:] = color
+    cv2.addWeighted(tint, alpha, image, 1 - alpha, 0, dst=tint)
+    np.copyto(image, tint, where=mask.view(bool)[..., None])
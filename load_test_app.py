@@ -0,0 +1,135 @@
+import argparse
+import io
+import os
+import time
+import threading
+import cv2
+import numpy as np
+os.environ.setdefault("EMOTION_WARM_UP", "0")  # Each run starts its own worker with the chosen model
+import app
+from batch_inference import BatchWorker, EmotionModel, SyntheticEmotionModel
+from emotion_pipeline import SyntheticFrameSource
+
+# Load test for app.py /analyze: concurrent clients upload face images while
+# the batching worker runs with different maximum batch sizes.
+CLIENTS = 32
+REQUESTS_PER_CLIENT = 10
+BATCH_SIZES = [1, 2, 4, 8, 16, 32]
+MAX_WAIT_MS = 10
+
+# Helper function to make a few JPEG uploads from the synthetic camera
+def make_images(count=8):
+    source = SyntheticFrameSource(fps=10000)
+    images = []
+    for _ in range(count):
+        _, frame = source.read()
+        images.append(cv2.imencode(".jpg", frame)[1].tobytes())
+        for _ in range(5):
+            source.read()  # Move the face along between uploads
+    return images
+
+def run(label, model, images, max_batch, max_queue=256):
+    worker = BatchWorker(model.predict_batch, max_batch=max_batch, max_wait_ms=MAX_WAIT_MS, max_queue=max_queue)
+    worker.start(warm_up=np.zeros((96, 96, 3), dtype=np.uint8))
+    app.emotion_worker = worker
+    client = app.app.test_client()
+    latencies = []
+    statuses = {}
+    failures = []  # An assert in a client thread would only end that thread, so failures are raised after join()
+    lock = threading.Lock()
+
+    def client_loop(seed):
+        for i in range(REQUESTS_PER_CLIENT):
+            upload = images[(seed + i) % len(images)]
+            start = time.perf_counter()
+            response = client.post("/analyze", data={"image": (io.BytesIO(upload), "face.jpg")},
+                                   content_type="multipart/form-data")
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code not in (200, 503):
+                    failures.append((response.status_code, response.get_json()))
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    worker.stop()
+    if failures:
+        raise AssertionError(f"{len(failures)} of {CLIENTS * REQUESTS_PER_CLIENT} requests failed, "
+                             f"first: {failures[0]}")
+
+    ms = np.array(latencies) * 1000
+    stats = worker.stats()
+    return {
+        "Run": label,
+        "Max Batch": max_batch,
+        "Requests/sec": round(len(latencies) / wall, 1),
+        "Mean Batch": stats["mean_batch"],
+        "p50 ms": round(float(np.percentile(ms, 50)), 1) if len(ms) else None,
+        "p99 ms": round(float(np.percentile(ms, 99)), 1) if len(ms) else None,
+        "Rejected (503)": statuses.get(503, 0),
+    }
+
+# Requests that wait past INFERENCE_TIMEOUT get a 504, and their still-queued faces are never run
+def check_timeouts(images, clients=8):
+    worker = BatchWorker(SyntheticEmotionModel(call_ms=200).predict_batch, max_batch=1, max_wait_ms=0)
+    worker.start()
+    app.emotion_worker = worker
+    timeout, app.INFERENCE_TIMEOUT = app.INFERENCE_TIMEOUT, 0.05
+    client = app.app.test_client()
+    statuses = []
+
+    def post(i):
+        response = client.post("/analyze", data={"image": (io.BytesIO(images[i % len(images)]), "face.jpg")},
+                               content_type="multipart/form-data")
+        statuses.append(response.status_code)
+
+    try:
+        threads = [threading.Thread(target=post, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        time.sleep(0.5)  # Let the worker reach the abandoned faces
+    finally:
+        app.INFERENCE_TIMEOUT = timeout
+        worker.stop()
+    stats = worker.stats()
+    assert statuses == [504] * clients, statuses
+    assert stats["cancelled"] > 0 and stats["items"] + stats["cancelled"] == clients, stats
+    print(f"Timeouts: {clients} slow requests got 504s; the model ran {stats['items']} of them, "
+          f"{stats['cancelled']} were dropped from the queue")
+
+def print_rows(rows):
+    print(f"\n{'Run':<10} {'Max Batch':>9} {'Requests/sec':>12} {'Mean Batch':>10} {'p50 ms':>8} {'p99 ms':>8} {'503s':>6}")
+    for row in rows:
+        print(f"{row['Run']:<10} {row['Max Batch']:>9} {row['Requests/sec']:>12} {row['Mean Batch']:>10} "
+              f"{row['p50 ms']!s:>8} {row['p99 ms']!s:>8} {row['Rejected (503)']:>6}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test for the batched /analyze endpoint")
+    parser.add_argument("--model", choices=["synthetic", "deepface"], default="synthetic",
+                        help="synthetic: fixed per-call + per-image cost; deepface: the real emotion CNN on CPU")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    model = EmotionModel() if args.model == "deepface" else SyntheticEmotionModel()
+    images = make_images()
+    print(f"{CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, {args.model} model, "
+          f"batches wait up to {MAX_WAIT_MS} ms")
+    rows = [run("batched", model, images, max_batch) for max_batch in BATCH_SIZES]
+
+    # Backpressure: a short queue sheds the excess with 503s instead of letting latency grow
+    rows.append(run("overload", model, images, max_batch=4, max_queue=4))
+    print_rows(rows)
+    check_timeouts(images)
+
+if __name__ == "__main__":
+    main()
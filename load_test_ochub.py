@@ -0,0 +1,65 @@
+import time
+import random
+import threading
+import numpy as np
+import ochub_app
+from market_data import SyntheticProvider
+from quote_service import QuoteService
+from indicator_store import IndicatorStore
+
+# Load test for ochub_app /analyze against a local stand-in provider.
+# A few popular tickers get most of the traffic, like a real watchlist.
+TICKERS = ["AAPL", "TSLA", "NVDA", "AMC", "GME", "F", "PLTR", "SNDL", "NOK", "BB",
+           "MSFT", "AMZN", "GOOGL", "META", "AMD", "INTC", "CCL", "AAL", "UAL", "SOFI"]
+CLIENTS = 32
+REQUESTS_PER_CLIENT = 25
+LATENCY = 0.08  # Seconds per simulated upstream .info call
+
+def run(label, service):
+    ochub_app.quotes = service
+    # Indicators are precomputed before the run, as they would be in a warm server
+    store = IndicatorStore(SyntheticProvider(), watchlist=TICKERS, refresh_interval=3600)
+    store.refresh()
+    ochub_app.indicator_store = store
+    client = ochub_app.app.test_client()
+    weights = 1 / np.arange(1, len(TICKERS) + 1)  # Zipf-like popularity
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(REQUESTS_PER_CLIENT):
+            ticker = rng.choices(TICKERS, weights=weights)[0]
+            start = time.perf_counter()
+            response = client.post("/analyze", data={"ticker": ticker})
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 200
+            with lock:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    stats = service.stats()
+    print(f"\n=== {label} ===")
+    print(f"Requests/sec: {len(latencies) / wall:.1f}")
+    print(f"p50 latency:  {np.percentile(ms, 50):.1f} ms")
+    print(f"p99 latency:  {np.percentile(ms, 99):.1f} ms")
+    print(f"Upstream calls: {stats['upstream_calls']} for {stats['requests']} requests "
+          f"(cache hits {stats['cache_hits']}, coalesced {stats['coalesced']})")
+
+def main():
+    print(f"{CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, {LATENCY * 1000:.0f} ms upstream latency")
+    run("Before: one upstream call per request",
+        QuoteService(SyntheticProvider(latency=LATENCY), cache=False, coalesce=False, workers=CLIENTS))
+    run("After: coalesced requests + 15 s quote cache",
+        QuoteService(SyntheticProvider(latency=LATENCY), ttl=15, workers=CLIENTS))
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,31 @@
-from flask import Flask, request, render_template_string
-import yfinance as yf
+from flask import Flask, request, render_template_string, jsonify
 import math
+import os
+import sys
+
+# Shared market-data helpers live next to the trading scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Smart Trading App"))
+from quote_service import QuoteService
+from indicator_store import IndicatorStore
+from bar_archive import BarArchive
+from market_data import YFinanceProvider
 
 app = Flask(__name__)
 
+# Quotes are cached for 15 seconds and concurrent requests for a ticker share one fetch
+quotes = QuoteService(ttl=15)
+
+# SMA/EMA/ATR/RSI are kept up to date in the background from daily bars,
+# seeded from the shared on-disk bar archive instead of a fresh download
+indicator_store = IndicatorStore(watchlist=["AAPL", "TSLA", "MSFT", "GOOGL", "AMZN", "NVDA"],
+                                 seed_provider=BarArchive(upstream=YFinanceProvider()))
+
+# Helper function to show an indicator value, or Pending while history is still loading
+def format_indicator(snapshot, name):
+    if snapshot is None or math.isnan(snapshot[name]):
+        return "Pending"
+    return round(snapshot[name], 2)
+
 @app.route("/")
 def home():
     return """
@@ -15,12 +37,14 @@ def home():
     </form>
     """
 
+# Each request still holds a server thread; the gain comes from the quote cache and shared fetches
 @app.route("/analyze", methods=["POST"])
 def analyze():
     ticker = request.form.get("ticker").strip().upper()
+    indicator_store.start()
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.info
+        data = quotes.get(ticker)
+        snapshot = indicator_store.get(ticker)
 
         # Extract relevant stock information
         current_price = data.get('regularMarketPrice') or data.get('bid') or data.get('ask') or data.get('previousClose', 'N/A')
@@ -31,16 +55,16 @@ def analyze():
         market_cap = data.get('marketCap', 'N/A')
         volume = data.get('regularMarketVolume', 'N/A')
 
-        # Calculate additional metrics
-        sma = data.get('fiftyDayAverage', 'N/A')
-        ema = data.get('twoHundredDayAverage', 'N/A')
-        atr = round(data.get('beta', 1) * 2, 2)  # Placeholder for ATR calculation
-        rsi = round((data.get('fiftyTwoWeekHigh', 1) - data.get('regularMarketPrice', 1)) * 10, 2)  # Placeholder for RSI calculation
+        # 14-day indicators from the background store
+        sma = format_indicator(snapshot, "SMA")
+        ema = format_indicator(snapshot, "EMA")
+        atr = format_indicator(snapshot, "ATR")
+        rsi = format_indicator(snapshot, "RSI")
 
         # Recommendation Logic
         recommendation = ""
         decision_summary = ""
-        if current_price != 'N/A' and isinstance(current_price, (int, float)):
+        if isinstance(current_price, (int, float)) and isinstance(sma, float) and isinstance(ema, float):
             if current_price < sma:
                 recommendation = "Buy (Undervalued)"
                 decision_summary = "The stock appears undervalued based on its SMA. Consider buying for potential upside."
@@ -54,6 +78,8 @@ def analyze():
         else:
             recommendation = "No recommendation available."
             decision_summary = "The stock data is insufficient for a clear recommendation."
+            if snapshot is None:
+                decision_summary += " Price history is still loading; try again in a moment."
 
         return render_template_string(f"""
         <h1>OCHub Stock Analysis Result</h1>
@@ -78,5 +104,9 @@ def analyze():
     except Exception as e:
         return f"<h1>Error</h1><p>{e}</p><a href='/'>Try Again</a>"
 
+@app.route("/metrics")
+def metrics():
+    return jsonify(quotes.stats())
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -1,72 +1,57 @@
-import yfinance as yf
-import pandas as pd
-import random
-import threading
+import os
+import sys
 from flask import Flask
 
+# Shared market-data helpers live next to the trading scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Smart Trading App"))
+from price_index import price_index
+from recommendation_log import recommendation_log
+from scan_scheduler import RecommendationStore, ScanScheduler
+from ticker_universe import universe
+
 app = Flask(__name__)
 
-latest_recommendation = "No recommendations yet. Please wait for the app to scan stocks."
+# Latest recommendation, published by the background scanner and read by the web route
+recommendations = RecommendationStore("No recommendations yet. Please wait for the app to scan stocks.")
 
 def save_recommendation(ticker, current_price, buy_price, sell_price, stop_loss):
-    global latest_recommendation
-    latest_recommendation = (
+    recommendation = (
         f"Recommended Stock: {ticker}<br>"
         f"Current Price: ${current_price:.2f}<br>"
         f"Buy Price: ${buy_price:.2f}<br>"
         f"Sell Price: ${sell_price:.2f}<br>"
         f"Stop Loss Price: ${stop_loss:.2f}<br>"
     )
-    data = {
-        "Ticker": [ticker],
-        "Current Price": [current_price],
-        "Buy Price": [buy_price],
-        "Sell Price": [sell_price],
-        "Stop Loss Price": [stop_loss],
-    }
-    df = pd.DataFrame(data)
-    df.to_csv("stock_recommendations.csv", mode="a", header=False, index=False)
-    print(latest_recommendation)
+    recommendation_log.append(ticker, current_price, buy_price, sell_price, stop_loss)
+    print(recommendation)
+    return recommendation
 
 def fetch_random_stock_under_5():
-    global latest_recommendation
-    try:
-        nasdaq_url = "https://datahub.io/core/nasdaq-listings/r/nasdaq-listed-symbols.csv"
-        tickers = pd.read_csv(nasdaq_url)["Symbol"].tolist()
-        random.shuffle(tickers)
-    except Exception as e:
-        latest_recommendation = f"Error fetching stock tickers: {e}"
-        return
-
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="5d")
-            if data.empty:
-                continue
+    """
+    Picks a random stock under $5 and returns the recommendation text.
+    Provider errors are raised so the scheduler can back off.
+    """
+    # Latest closes for the whole universe are refreshed in bulk, not probed one by one
+    price_index.refresh_if_stale(universe.symbols("nasdaq"))
+    picks = price_index.sample(1, max_price=5)
 
-            live_price = data["Close"].iloc[-1]
-            if live_price <= 5:
-                buy_price = live_price
-                sell_price = buy_price * 1.10  # 10% profit target
-                stop_loss_price = buy_price * 0.90  # 10% stop loss
+    if not picks:
+        return "No stocks under $5 found."
 
-                save_recommendation(ticker, live_price, buy_price, sell_price, stop_loss_price)
-                return
-        except Exception as e:
-            print(f"Error processing ticker {ticker}: {e}")
-            continue
+    ticker, live_price = picks[0]["Ticker"], picks[0]["Price"]
+    buy_price = live_price
+    sell_price = buy_price * 1.10  # 10% profit target
+    stop_loss_price = buy_price * 0.90  # 10% stop loss
 
-    latest_recommendation = "No stocks under $5 found."
+    return save_recommendation(ticker, live_price, buy_price, sell_price, stop_loss_price)
 
-def run_stock_app():
-    while True:
-        fetch_random_stock_under_5()
+# Rescan every 5 minutes while the market is open
+scanner = ScanScheduler(fetch_random_stock_under_5, recommendations, interval=300)
 
 @app.route('/')
 def home():
-    return latest_recommendation
+    return recommendations.latest().value
 
 if __name__ == "__main__":
-    threading.Thread(target=run_stock_app).start()
+    scanner.start()
     app.run(host="0.0.0.0", port=5000)